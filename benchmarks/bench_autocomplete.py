@@ -0,0 +1,182 @@
+"""
+Load test client for the autocomplete server of search_func.
+
+Sends searches at a fixed rate (open loop: a slow answer doesn't delay the
+next request) for a while, each on its own connection, and reports the
+latency percentiles of the complete answers. The search texts are the
+prefixes of city names as they would be typed, so identical searches and
+sessions replacing their own searches both happen.
+
+Without --port it starts the server itself, in another process:
+
+    python -m benchmarks.bench_autocomplete --qps 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from itertools import cycle
+from urllib.parse import urlencode
+
+from tdd.search_func.city_search import load_cities
+from tdd.search_func.server import DEFAULT_HOST
+
+DEFAULT_QPS = 100
+DEFAULT_DURATION = 5.0
+
+# Typists sending searches at the same time, each with its own session
+DEFAULT_SESSIONS = 8
+
+
+def make_searches(cities, sessions=DEFAULT_SESSIONS):
+    """
+    Build what the typists send: every prefix of two or more characters of
+    each city, one typist after another.
+
+    Returns:
+        list: (session, search text) pairs, in the order they are sent
+    """
+    typists = cycle(f"typist-{number}" for number in range(sessions))
+    return [
+        (session, city[:end])
+        for city, session in zip(cities, typists)
+        for end in range(2, len(city) + 1)
+    ]
+
+
+async def fetch(host, port, session, search_text):
+    """
+    Send one search and read the whole answer.
+
+    Returns:
+        tuple: (status code, NDJSON lines of the body)
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        query = urlencode({"q": search_text, "session": session})
+        writer.write(
+            f"GET /search?{query} HTTP/1.1\r\nHost: {host}\r\n"
+            "Connection: close\r\n\r\n".encode("ascii")
+        )
+        status = int((await reader.readline()).split()[1])
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass  # Headers
+        lines = []
+        while True:
+            size = int((await reader.readline()).strip() or b"0", 16)
+            if not size:
+                break
+            chunk = await reader.readexactly(size + 2)
+            lines.extend(chunk[:-2].decode("utf-8").splitlines())
+        return status, lines
+    finally:
+        writer.close()
+
+
+async def _timed(host, port, session, search_text, report):
+    """Fetch and add the outcome and its latency to the report."""
+    started = time.perf_counter()
+    try:
+        status, lines = await fetch(host, port, session, search_text)
+    except (OSError, ValueError, asyncio.IncompleteReadError):
+        report["errors"] += 1
+        return
+    report["latencies"].append(time.perf_counter() - started)
+    if status != 200:
+        report["errors"] += 1
+    elif lines == [json.dumps({"cancelled": True})]:
+        report["cancelled"] += 1
+
+
+async def run_load(host, port, searches, qps=DEFAULT_QPS, duration=DEFAULT_DURATION):
+    """
+    Send searches at qps requests per second for duration seconds.
+
+    Returns:
+        dict: requests, errors, cancelled, achieved qps, p50 and p99
+              latency in seconds
+    """
+    report = {"latencies": [], "errors": 0, "cancelled": 0}
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    requests = int(qps * duration)
+    tasks = []
+    for number, (session, search_text) in zip(range(requests), cycle(searches)):
+        await asyncio.sleep(max(0.0, started + number / qps - loop.time()))
+        tasks.append(
+            asyncio.create_task(_timed(host, port, session, search_text, report))
+        )
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+    report["p50"], report["p99"] = _percentiles(sorted(report.pop("latencies")))
+    report.update(requests=requests, qps=requests / elapsed if elapsed else 0.0)
+    return report
+
+
+def _percentiles(latencies):
+    """
+    Returns:
+        tuple: (p50, p99) of the latencies, None without latencies
+    """
+    if len(latencies) < 2:
+        return (latencies[0], latencies[0]) if latencies else (None, None)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return percentiles[49], percentiles[98]
+
+
+def _load_own_server(host, searches, qps, duration):
+    """
+    Start the server on a free port in another process and load test it.
+
+    Returns:
+        dict: The report of run_load
+    """
+    with subprocess.Popen(
+        [sys.executable, "-m", "tdd.search_func.server", "--host", host, "--port", "0"],
+        stdout=subprocess.PIPE,
+        text=True,
+    ) as process:
+        try:
+            # "Serving on http://<host>:<port>/search"
+            address = process.stdout.readline().split("//")[1].split("/")[0]
+            port = int(address.rsplit(":", 1)[1])
+            return asyncio.run(run_load(host, port, searches, qps, duration))
+        finally:
+            process.terminate()
+
+
+def main(argv=None):
+    """
+    Load test the autocomplete server from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, help="server to test, else start one")
+    parser.add_argument("--qps", type=float, default=DEFAULT_QPS)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    args = parser.parse_args(argv)
+
+    searches = make_searches(load_cities(), args.sessions)
+    if args.port is None:
+        report = _load_own_server(args.host, searches, args.qps, args.duration)
+    else:
+        report = asyncio.run(
+            run_load(args.host, args.port, searches, args.qps, args.duration)
+        )
+
+    print(
+        f"{report['requests']} requests at {report['qps']:.1f} qps,"
+        f" {report['errors']} errors, {report['cancelled']} cancelled"
+    )
+    if report["p50"] is not None:
+        print(f"p50 {report['p50'] * 1000:.2f} ms, p99 {report['p99'] * 1000:.2f} ms")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
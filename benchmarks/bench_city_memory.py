@@ -0,0 +1,131 @@
+"""
+Memory benchmark of the city storages for a large gazetteer.
+
+Measures how much the resident set size (RSS) of a fresh process grows
+when it keeps the generated place names of bench_city_search:
+
+- list: a list of str, what CITIES is by default
+- compact: CompactStrings, one UTF-8 blob and an array of offsets
+- indexed: the list with the CachedSearch searching it, what a loaded
+  database holds by default
+- compact-search: CompactCities, what it holds with COMPACT_CITIES
+
+Every storage is built in a process of its own, from names generated one
+at a time, so the compact ones never hold a list of the names. RSS is read
+from /proc/self/statm, so this only runs on Linux.
+
+Run it with:
+
+    python -m benchmarks.bench_city_memory --count 1000000
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+
+from benchmarks.bench_city_search import iter_cities
+from tdd.search_func.city_search import CachedSearch, CompactCities, CompactStrings
+
+DEFAULT_COUNT = 1_000_000
+
+STORAGES = {
+    "list": list,
+    "compact": CompactStrings,
+    "indexed": lambda cities: CachedSearch(list(cities)),
+    "compact-search": CompactCities,
+}
+
+
+def rss():
+    """
+    Returns:
+        int: Resident set size of this process, in bytes
+    """
+    with open("/proc/self/statm", encoding="ascii") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure_storage(storage, count):
+    """
+    Build one storage of count generated names in this process.
+
+    Returns:
+        dict: rss, growth of the resident set size once built, and peak,
+              growth of its high-water mark while building, in bytes
+    """
+    gc.collect()
+    before = rss()
+    peak_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    kept = STORAGES[storage](iter_cities(count))
+    gc.collect()
+    after = rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    del kept
+    return {"rss": after - before, "peak": max(peak - peak_before, after - before)}
+
+
+def run_storage(storage, count):
+    """
+    Measure one storage in a fresh process.
+
+    Returns:
+        dict: What measure_storage returned there
+    """
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            __spec__.name,
+            "--child",
+            storage,
+            "--count",
+            str(count),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main(argv=None):
+    """
+    Compare the memory of the city storages from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=DEFAULT_COUNT,
+        help="generated place names (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=STORAGES,
+        action="append",
+        help="only measure these storages",
+    )
+    parser.add_argument("--child", choices=STORAGES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure_storage(args.child, args.count)))
+        return 0
+
+    print(f"{'storage':<16} {'RSS':>10} {'peak':>10} {'per city':>10}")
+    for storage in args.storage or STORAGES:
+        result = run_storage(storage, args.count)
+        print(
+            f"{storage:<16} {result['rss'] / 2**20:>7.1f} MB"
+            f" {result['peak'] / 2**20:>7.1f} MB"
+            f" {result['rss'] / max(args.count, 1):>8.1f} B"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
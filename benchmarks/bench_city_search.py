@@ -0,0 +1,215 @@
+"""
+Benchmark of the city search over a large generated list of place names.
+
+Compares the bigram/trigram CityIndex with the linear scan it replaced
+(kept below as linear_search), for short, common search texts and for
+longer, rarer ones, with and without accents, plus the time it takes to
+build the index. The compact benchmarks scan the UTF-8 blob of
+CompactCities instead of using an index. The top benchmarks only ask for the best TOP_LIMIT
+cities, in list order or prefixes first.
+
+The fuzzy benchmarks look up misspelled names in the SymSpell deletion
+dictionary of FuzzyIndex, against measuring the edit distance to every
+name (linear_fuzzy_search), and time building the dictionary.
+
+The typing benchmarks replay autocomplete traffic, every prefix of some
+popular names as they are typed, straight on the index and through the
+results cache of CachedSearch.
+
+Run it with:
+
+    python -m benchmarks.bench_city_search --count 300000
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks import harness
+from tdd.search_func.city_search import (
+    FUZZY_MAX_DISTANCE,
+    RANK_PREFIX_FIRST,
+    CachedSearch,
+    CityIndex,
+    CompactCities,
+    FuzzyIndex,
+    _edit_distance,
+)
+
+DEFAULT_COUNT = 300_000
+
+# Search texts from common to rare in the generated names
+QUERIES = ("an", "ber", "Stad", "nova", "Kalin", "xq")
+
+# Cities an autocomplete box shows
+TOP_LIMIT = 10
+
+SEED = 2025
+
+_SYLLABLES = (
+    "an ber burg ca del dorf en fa gar ha in ka kalin la ma nova "
+    "o pol ra ri san stad ta tor u ville vo wa za"
+).split()
+
+
+def linear_search(cities, search_lower):
+    """
+    Search as it was before the index, lowercasing every city each time.
+    """
+    return [city for city in cities if search_lower in city.lower()]
+
+
+def linear_fuzzy_search(names, search, max_distance=FUZZY_MAX_DISTANCE):
+    """
+    Fuzzy search without the deletion dictionary, measuring every name.
+    """
+    return sorted(
+        (distance, position)
+        for position, name in enumerate(names)
+        if (distance := _edit_distance(search, name, max_distance)) <= max_distance
+    )
+
+
+def iter_cities(count=DEFAULT_COUNT, seed=SEED):
+    """
+    Generate place names of one to three words of two to four syllables,
+    one at a time.
+
+    Yields:
+        str: The generated names
+    """
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield " ".join(
+            "".join(rnd.choices(_SYLLABLES, k=rnd.randint(2, 4))).capitalize()
+            for _ in range(rnd.choice((1, 1, 1, 2, 3)))
+        )
+
+
+def make_cities(count=DEFAULT_COUNT, seed=SEED):
+    """
+    Returns:
+        list: The names of iter_cities
+    """
+    return list(iter_cities(count, seed))
+
+
+def make_typing(cities, names=100, popular=20, seed=SEED):
+    """
+    Every prefix of two or more characters of names, lowercased, as they
+    are typed. The names are picked from a few popular ones, so the same
+    prefixes come back again and again like in autocomplete traffic.
+
+    Returns:
+        list: The search texts, in the order they are typed
+    """
+    rnd = random.Random(seed)
+    return [
+        name[:end].lower()
+        for name in rnd.choices(rnd.sample(cities, popular), k=names)
+        for end in range(2, len(name) + 1)
+    ]
+
+
+def make_typos(cities, count=5, seed=SEED):
+    """
+    Misspell count of the names with one typo each: a character deleted,
+    replaced or inserted.
+
+    Returns:
+        list: The misspelled names, casefolded
+    """
+    rnd = random.Random(seed)
+    typos = []
+    for name in rnd.sample(cities, count):
+        name = name.casefold()
+        start = rnd.randrange(len(name))
+        end = start + rnd.choice((0, 1))
+        typos.append(name[:start] + rnd.choice(("", "x")) + name[end:])
+    return typos
+
+
+def _bench_typing(cities, typing):
+    """
+    Replay the typed search texts through a cache that starts empty.
+    """
+    search = CachedSearch(cities)
+
+    def bench():
+        search.clear()
+        for search_lower in typing:
+            search.find(search_lower)
+
+    return bench
+
+
+def make_benchmarks(count=DEFAULT_COUNT):
+    """
+    Build the index and the search benchmarks on the same names.
+
+    Returns:
+        dict: Benchmark name -> function to time
+    """
+    cities = make_cities(count)
+    index = CityIndex(cities)
+    compact = CompactCities(cities)
+    benchmarks = {
+        f"build-index/{count}": lambda: CityIndex(cities),
+        f"build-compact/{count}": lambda: CompactCities(cities),
+    }
+    for query in QUERIES:
+        search_lower = query.lower()
+        benchmarks[f"linear/{query}/{count}"] = (
+            lambda search_lower=search_lower: linear_search(cities, search_lower)
+        )
+        benchmarks[f"indexed/{query}/{count}"] = (
+            lambda search_lower=search_lower: index.find(search_lower)
+        )
+        benchmarks[f"accent-insensitive/{query}/{count}"] = (
+            lambda search_lower=search_lower: index.find(search_lower, True)
+        )
+        benchmarks[f"compact/{query}/{count}"] = (
+            lambda search_lower=search_lower: compact.find(search_lower)
+        )
+        benchmarks[f"top{TOP_LIMIT}-list/{query}/{count}"] = (
+            lambda search_lower=search_lower: index.find(search_lower, False, TOP_LIMIT)
+        )
+        benchmarks[f"top{TOP_LIMIT}-prefix-first/{query}/{count}"] = (
+            lambda search_lower=search_lower: index.find(
+                search_lower, False, TOP_LIMIT, RANK_PREFIX_FIRST
+            )
+        )
+    benchmarks[f"build-fuzzy-index/{count}"] = lambda: FuzzyIndex(index.stripped)
+    for number, typo in enumerate(make_typos(cities)):
+        benchmarks[f"fuzzy/typo{number}/{count}"] = (
+            lambda typo=typo: index.fuzzy.matches(typo)
+        )
+        benchmarks[f"linear-fuzzy/typo{number}/{count}"] = (
+            lambda typo=typo: linear_fuzzy_search(index.stripped, typo)
+        )
+    typing = make_typing(cities)
+    benchmarks[f"typing-indexed/{count}"] = lambda: [
+        index.find(search_lower) for search_lower in typing
+    ]
+    benchmarks[f"typing-cached/{count}"] = _bench_typing(cities, typing)
+    return benchmarks
+
+
+def main(argv=None):
+    """
+    Run the city search benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    harness.add_arguments(parser)
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=DEFAULT_COUNT,
+        help="generated place names (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    return harness.main(make_benchmarks(args.count), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
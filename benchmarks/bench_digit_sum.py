@@ -0,0 +1,100 @@
+"""
+Microbenchmark of the digits only fast path of the string calculator.
+
+Three ways to sum the same comma/newline separated numbers:
+
+- int-loop: the plain int(part) loop every version started from
+- token-scanner: v8 add_strings when the input needs the regex scanner
+  (a trailing "-0" doesn't change the sum, but isn't plain digits)
+- fast-path: v8 add_strings on plain digits and separators
+
+each on two inputs:
+
+- repeats: numbers up to 2000 as in bench_string_calc, so a big input
+  repeats every one of them many times
+- distinct: numbers up to a million that are all different
+
+int() is most of the cost, and int-loop already calls it in a tight loop,
+so moving that loop into C with map(int) gains nothing by itself. On
+distinct numbers the fast path runs about as fast as int-loop, and on a
+thousand numbers the set-up of add_strings makes it up to 25% slower. It
+only wins when it calls int() less often: big inputs that repeat their
+numbers are counted first (see Calculator._add_parts), about 1.1 to 1.6
+times faster than int-loop on a million numbers.
+
+Run it with:
+
+    python -m benchmarks.bench_digit_sum --sizes 1000 1000000
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks import harness
+from benchmarks.bench_string_calc import DEFAULT_SIZES, SEED, make_inputs
+from tdd.string_calculator.v8.string_calc import add_strings
+
+
+def int_loop(numbers):
+    """
+    Sum the numbers one int(part) call at a time, ignoring the big ones.
+    """
+    total = 0
+    for part in numbers.replace("\n", ",").split(","):
+        num = int(part)
+        if num <= 1000:
+            total += num
+    return total
+
+
+def distinct_input(size, seed=SEED):
+    """
+    Numbers up to a million separated by commas, none of them twice.
+    """
+    rnd = random.Random(seed)
+    return ",".join(map(str, rnd.sample(range(1_000_000), size)))
+
+
+def make_benchmarks(sizes=DEFAULT_SIZES):
+    """
+    Build the three benchmarks for every input of every size.
+
+    Returns:
+        dict: Benchmark name -> function to time
+    """
+    benchmarks = {}
+    for size in sizes:
+        _, repeats = make_inputs(size)["default"]
+        for case, numbers in (("repeats", repeats), ("distinct", distinct_input(size))):
+            scanned = numbers + ",-0"
+            name = f"{case}-{size}"
+            benchmarks[f"int-loop/{name}"] = lambda numbers=numbers: int_loop(numbers)
+            benchmarks[f"token-scanner/{name}"] = lambda numbers=scanned: add_strings(
+                numbers
+            )
+            benchmarks[f"fast-path/{name}"] = lambda numbers=numbers: add_strings(
+                numbers
+            )
+    return benchmarks
+
+
+def main(argv=None):
+    """
+    Run the digit sum benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    harness.add_arguments(parser)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="numbers per input (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    return harness.main(make_benchmarks(args.sizes), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
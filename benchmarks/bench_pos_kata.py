@@ -0,0 +1,120 @@
+"""
+Benchmark of the pos_kata basket total on million-item baskets.
+
+Compares the integer cents PriceCatalog with the dict of float prices it
+replaced (kept below as float_calculate_total), on baskets scanned from a
+catalog of generated products:
+
+- float: add up every float price, format the total
+- cents: add up the integer cents, counting the barcodes first in baskets
+  longer than twice the catalog, format the total
+
+Run it with:
+
+    python -m benchmarks.bench_pos_kata --items 1000 1000000
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks import harness
+from tdd.pos_kata.pos_kata import PriceCatalog, format_cents, parse_cents
+
+DEFAULT_ITEMS = (1000, 1_000_000)
+
+DEFAULT_PRODUCTS = 1000
+
+SEED = 2025
+
+
+def float_calculate_total(products, barcodes):
+    """
+    calculate_total as it was before the integer cents, on a dict of float
+    prices.
+    """
+    total = 0.0
+    for barcode in barcodes:
+        if barcode in products:
+            total += products[barcode]
+    return f"Total: ${total:.2f}"
+
+
+def make_prices(count=DEFAULT_PRODUCTS, seed=SEED):
+    """
+    Generate products with 13 digit barcodes and prices up to $999.99.
+
+    Returns:
+        dict: Barcode -> price, as written in the products file
+    """
+    rnd = random.Random(seed)
+    return {
+        f"{rnd.randrange(10**12, 10**13)}": f"{rnd.randrange(1, 100_000) / 100:.2f}"
+        for _ in range(count)
+    }
+
+
+def make_basket(barcodes, items, seed=SEED):
+    """
+    Scan items random barcodes, one in a hundred of them unknown.
+
+    Returns:
+        list: The scanned barcodes
+    """
+    rnd = random.Random(seed)
+    known = list(barcodes)
+    return [
+        rnd.choice(known) if rnd.random() >= 0.01 else "0000000000000"
+        for _ in range(items)
+    ]
+
+
+def make_benchmarks(items=DEFAULT_ITEMS, products=DEFAULT_PRODUCTS):
+    """
+    Build both benchmarks for every basket size, on the same products.
+
+    Returns:
+        dict: Benchmark name -> function to time
+    """
+    prices = make_prices(products)
+    floats = {barcode: float(price) for barcode, price in prices.items()}
+    catalog = PriceCatalog(
+        {barcode: parse_cents(price) for barcode, price in prices.items()}
+    )
+    benchmarks = {}
+    for size in items:
+        basket = make_basket(prices, size)
+        benchmarks[f"float/{size}"] = lambda basket=basket: float_calculate_total(
+            floats, basket
+        )
+        benchmarks[f"cents/{size}"] = (
+            lambda basket=basket: f"Total: {format_cents(catalog.total_cents(basket))}"
+        )
+    return benchmarks
+
+
+def main(argv=None):
+    """
+    Run the pos_kata benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    harness.add_arguments(parser)
+    parser.add_argument(
+        "--items",
+        type=int,
+        nargs="+",
+        default=DEFAULT_ITEMS,
+        help="items per basket (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--products",
+        type=int,
+        default=DEFAULT_PRODUCTS,
+        help="generated products (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    return harness.main(make_benchmarks(args.items, args.products), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
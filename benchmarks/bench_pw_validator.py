@@ -0,0 +1,132 @@
+"""
+Benchmark of pw_validator v5 validate_password over a password corpus.
+
+Compares the single pass version with the three pass one it replaced
+(kept below as three_pass_validate_password), and with the batch
+validate_passwords_array fed a pool at a time. The corpus cycles through
+a pool of up to 100k generated passwords, so 10M validations don't need
+10M strings in memory.
+
+Run it with:
+
+    python -m benchmarks.bench_pw_validator --count 10000000 --repeat 1
+"""
+
+import argparse
+import random
+import string
+import sys
+from collections import deque
+from itertools import cycle, islice
+
+from benchmarks import harness
+from tdd.pw_validator.batch import validate_passwords_array
+from tdd.pw_validator.v5.pw import validate_password
+
+# Passwords validated per benchmark call
+DEFAULT_COUNT = 10_000_000
+
+# Distinct passwords in the corpus, the rest repeats them
+POOL_SIZE = 100_000
+
+SEED = 2025
+
+_ALPHABET = string.ascii_letters + string.digits + "!@#$%&*._-"
+
+
+def three_pass_validate_password(password: str) -> dict:
+    """
+    validate_password as it was before the single pass version.
+    """
+    errors = []
+
+    # Requirement 1: Minimum length of 8 characters
+    if len(password) < 8:
+        errors.append("Password must be at least 8 characters")
+
+    # Requirement 2: Must contain at least 2 numbers
+    digit_count = sum(1 for char in password if char.isdigit())
+    if digit_count < 2:
+        errors.append("The password must contain at least 2 numbers")
+
+    # Requirement 3: Must contain at least one capital letter
+    if not any(char.isupper() for char in password):
+        errors.append("password must contain at least one capital letter")
+
+    # NEW Requirement 4: Must contain at least one special character
+    if not any(not char.isalnum() for char in password):
+        errors.append("password must contain at least one special character")
+
+    is_valid = len(errors) == 0
+
+    return {"is_valid": is_valid, "errors": errors}
+
+
+def make_pool(size=POOL_SIZE, seed=SEED):
+    """
+    Generate passwords of 4 to 20 characters, valid and not.
+
+    Returns:
+        list: The generated passwords
+    """
+    rnd = random.Random(seed)
+    return ["".join(rnd.choices(_ALPHABET, k=rnd.randint(4, 20))) for _ in range(size)]
+
+
+def _bench(validate, pool, count):
+    """
+    Validate count passwords from the pool, discarding the results.
+    """
+
+    def bench():
+        deque(map(validate, islice(cycle(pool), count)), maxlen=0)
+
+    return bench
+
+
+def _bench_batches(pool, count):
+    """
+    Validate count passwords from the pool in batches of the pool size.
+    """
+
+    def bench():
+        passwords = cycle(pool)
+        for start in range(0, count, len(pool)):
+            validate_passwords_array(islice(passwords, min(len(pool), count - start)))
+
+    return bench
+
+
+def make_benchmarks(count=DEFAULT_COUNT):
+    """
+    Build every benchmark on the same corpus.
+
+    Returns:
+        dict: Benchmark name -> function to time
+    """
+    pool = make_pool(min(count, POOL_SIZE))
+    return {
+        f"v5-three-pass/{count}": _bench(three_pass_validate_password, pool, count),
+        f"v5-single-pass/{count}": _bench(validate_password, pool, count),
+        f"v5-array/{count}": _bench_batches(pool, count),
+    }
+
+
+def main(argv=None):
+    """
+    Run the password validator benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    harness.add_arguments(parser)
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=DEFAULT_COUNT,
+        help="passwords validated per run (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    return harness.main(make_benchmarks(args.count), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Benchmarks for add_strings in every version of the string calculator.
+
+Each benchmark is named "vN/case-size", so the same input can be followed
+through the versions to see what each requirement costs:
+
+- default: numbers separated by commas and newlines
+- custom: a one character "//;" delimiter (version 5 and up)
+- custom-long: a three character "//***" delimiter (version 5 and up)
+- negatives: half of the numbers negative, an error from version 6 on
+
+Run it with:
+
+    python -m benchmarks.bench_string_calc --sizes 10 1000
+
+See benchmarks/harness.py for saving and comparing baselines.
+"""
+
+import argparse
+import importlib
+import random
+import sys
+
+from benchmarks import harness
+
+VERSIONS = range(1, 9)
+
+# How many numbers each generated input holds
+DEFAULT_SIZES = (10, 1_000, 1_000_000)
+
+# Same inputs on every run, so baselines stay comparable
+SEED = 2025
+
+
+def _numbers(size, rnd, negative_ratio=0.0):
+    """
+    Generate size random numbers, about negative_ratio of them negative.
+    """
+    numbers = []
+    for _ in range(size):
+        num = rnd.randint(0, 2000)
+        numbers.append(-num if rnd.random() < negative_ratio else num)
+    return numbers
+
+
+def _default_input(size, rnd):
+    """
+    Numbers separated by commas, with a newline every tenth number.
+    """
+    parts = []
+    for i, num in enumerate(_numbers(size, rnd)):
+        if i:
+            parts.append("\n" if i % 10 == 0 else ",")
+        parts.append(str(num))
+    return "".join(parts)
+
+
+def make_inputs(size, seed=SEED):
+    """
+    Build every input of the given size.
+
+    Returns:
+        dict: Case name -> (first version that supports it, input string)
+    """
+    rnd = random.Random(seed)
+    return {
+        "default": (1, _default_input(size, rnd)),
+        "custom": (5, "//;\n" + ";".join(map(str, _numbers(size, rnd)))),
+        "custom-long": (5, "//***\n" + "***".join(map(str, _numbers(size, rnd)))),
+        "negatives": (1, ",".join(map(str, _numbers(size, rnd, 0.5)))),
+    }
+
+
+def _bench(add, numbers):
+    """
+    Wrap one add_strings call, errors are part of what's measured.
+    """
+
+    def bench():
+        try:
+            add(numbers)
+        except ValueError:
+            pass
+
+    return bench
+
+
+def make_benchmarks(sizes=DEFAULT_SIZES, versions=VERSIONS):
+    """
+    Build the benchmark of every version on every input it supports.
+
+    Returns:
+        dict: Benchmark name -> function to time
+    """
+    benchmarks = {}
+    for size in sizes:
+        inputs = make_inputs(size)
+        for version in versions:
+            module = importlib.import_module(
+                f"tdd.string_calculator.v{version}.string_calc"
+            )
+            for case, (since, numbers) in inputs.items():
+                if version >= since:
+                    name = f"v{version}/{case}-{size}"
+                    benchmarks[name] = _bench(module.add_strings, numbers)
+    return benchmarks
+
+
+def main(argv=None):
+    """
+    Run the string calculator benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    harness.add_arguments(parser)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="numbers per input (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--versions",
+        type=int,
+        nargs="+",
+        default=VERSIONS,
+        help="versions to run (default: all)",
+    )
+    args = parser.parse_args(argv)
+    return harness.main(make_benchmarks(args.sizes, args.versions), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
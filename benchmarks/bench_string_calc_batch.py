@@ -0,0 +1,107 @@
+"""
+Benchmark of add_strings_many on large batches of short strings.
+
+Compares Calculator.add_many with the loop over evaluate it replaced (kept
+below as loop_add_many), on batches of generated rows:
+
+- plain: a few numbers each, separated by commas and newlines
+- mixed: the same with one row in ten a "//;" header, a negative number
+  or a trailing separator, which still go through evaluate
+
+Run it with:
+
+    python -m benchmarks.bench_string_calc_batch --rows 1000 100000
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks import harness
+from tdd.string_calculator.engine import Calculator
+
+DEFAULT_ROWS = (1_000, 100_000)
+
+SEED = 2025
+
+
+def loop_add_many(calculator, batch):
+    """
+    Calculator.add_many as it was before the bulk route, evaluate on every
+    string.
+    """
+    results = []
+    for numbers in batch:
+        total, error = calculator.evaluate(numbers)
+        results.append(total if error is None else error)
+    return results
+
+
+def _plain_row(rnd):
+    """One to five numbers up to 2000, separated by commas and newlines."""
+    numbers = [str(rnd.randint(0, 2000)) for _ in range(rnd.randint(1, 5))]
+    return "".join(
+        (rnd.choice(",,\n") if i else "") + number for i, number in enumerate(numbers)
+    )
+
+
+def make_batch(rows, other_ratio=0.0, seed=SEED):
+    """
+    Generate rows strings, about other_ratio of them not plain numbers.
+
+    Returns:
+        list: The strings of the batch
+    """
+    rnd = random.Random(seed)
+    others = ("//;\n{}", "{},-7", "{},")
+    batch = []
+    for _ in range(rows):
+        row = _plain_row(rnd)
+        if rnd.random() < other_ratio:
+            row = rnd.choice(others).format(row.replace("\n", ","))
+            if row.startswith("//"):
+                row = row.replace(",", ";")
+        batch.append(row)
+    return batch
+
+
+def make_benchmarks(rows=DEFAULT_ROWS):
+    """
+    Build the loop and add_many benchmarks of every batch.
+
+    Returns:
+        dict: Benchmark name -> function to time
+    """
+    calculator = Calculator()
+    benchmarks = {}
+    for size in rows:
+        for case, other_ratio in (("plain", 0.0), ("mixed", 0.1)):
+            batch = make_batch(size, other_ratio)
+            benchmarks[f"loop/{case}-{size}"] = lambda batch=batch: loop_add_many(
+                calculator, batch
+            )
+            benchmarks[f"add_many/{case}-{size}"] = (
+                lambda batch=batch: calculator.add_many(batch)
+            )
+    return benchmarks
+
+
+def main(argv=None):
+    """
+    Run the add_strings_many benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    harness.add_arguments(parser)
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=DEFAULT_ROWS,
+        help="strings per batch (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    return harness.main(make_benchmarks(args.rows), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
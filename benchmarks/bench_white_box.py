@@ -0,0 +1,106 @@
+"""
+Microbenchmark of white_box class_exercises.validate_password.
+
+Compares the compiled single match() version with the four re.search
+calls it replaced (kept below as four_search_validate_password), for
+passwords of several lengths:
+
+- valid: the required characters only show up at the end, so every
+  check has to walk the whole password
+- no-special: no special character anywhere, the password is invalid
+
+Run it with:
+
+    python -m benchmarks.bench_white_box --lengths 8 64 1024 16384
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+
+from benchmarks import harness
+from white_box.class_exercises import validate_password
+
+DEFAULT_LENGTHS = (8, 64, 1024, 16384)
+
+SEED = 2025
+
+
+def four_search_validate_password(password):
+    """
+    validate_password as it was before the compiled pattern.
+    """
+    # Check length
+    if len(password) < 8:
+        return False
+
+    # Check for at least one uppercase letter, one lowercase letter,
+    # one digit, and one special character.
+    if (
+        not re.search(r"[A-Z]", password)
+        or not re.search(r"[a-z]", password)
+        or not re.search(r"\d", password)
+        or not re.search(r"[!@#$%&]", password)
+    ):
+        return False
+
+    return True
+
+
+def make_passwords(length, seed=SEED):
+    """
+    Build a valid and an invalid password of the given length (at least 4).
+
+    Returns:
+        dict: Kind of password -> password
+    """
+    rnd = random.Random(seed)
+    return {
+        "valid": "".join(rnd.choices(string.ascii_lowercase, k=length - 3)) + "A1!",
+        "no-special": "".join(
+            rnd.choices(string.ascii_letters + string.digits, k=length)
+        ),
+    }
+
+
+def make_benchmarks(lengths=DEFAULT_LENGTHS):
+    """
+    Build both benchmarks for every kind and length of password.
+
+    Returns:
+        dict: Benchmark name -> function to time
+    """
+    benchmarks = {}
+    for length in lengths:
+        for kind, password in make_passwords(length).items():
+            for name, validate in (
+                ("four-search", four_search_validate_password),
+                ("compiled", validate_password),
+            ):
+                benchmarks[f"{name}/{kind}/{length}"] = (
+                    lambda validate=validate, password=password: validate(password)
+                )
+    return benchmarks
+
+
+def main(argv=None):
+    """
+    Run the white box password benchmarks from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    harness.add_arguments(parser)
+    parser.add_argument(
+        "--lengths",
+        type=int,
+        nargs="+",
+        default=DEFAULT_LENGTHS,
+        help="password lengths (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    return harness.main(make_benchmarks(args.lengths), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
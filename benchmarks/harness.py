@@ -0,0 +1,157 @@
+"""
+Small benchmark harness shared by the bench_*.py scripts.
+
+pytest-benchmark isn't part of the toolchain here, so this covers the
+parts we use with the standard library only: time every benchmark with
+timeit, save the results as a JSON baseline and compare a later run
+against it, failing when something got slower than the threshold allows.
+
+Usage of any suite built on it:
+
+    python -m benchmarks.bench_string_calc --save baseline.json
+    python -m benchmarks.bench_string_calc --compare baseline.json
+
+Baselines only mean something on the machine that recorded them, so they
+aren't committed.
+"""
+
+import json
+import platform
+import timeit
+
+# Slowdown allowed against the baseline before the run fails (10%)
+DEFAULT_THRESHOLD = 0.10
+
+# Times each benchmark is repeated, the best run is the one reported
+DEFAULT_REPEAT = 5
+
+
+def measure(func, repeat=DEFAULT_REPEAT):
+    """
+    Time a function that takes no arguments.
+
+    The number of calls per run is picked by timeit so that a run lasts at
+    least 0.2 seconds, slow benchmarks are called once per run.
+
+    Returns:
+        float: Best time of a single call, in seconds
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(benchmarks, repeat=DEFAULT_REPEAT, select=None, out=None):
+    """
+    Time every benchmark whose name contains select (all if None).
+
+    Returns:
+        dict: Benchmark name -> seconds per call
+    """
+    results = {}
+    for name, func in benchmarks.items():
+        if select and select not in name:
+            continue
+        results[name] = measure(func, repeat)
+        print(f"{name:<50} {format_time(results[name]):>12}", file=out)
+    return results
+
+
+def format_time(seconds):
+    """
+    Show a duration with a unit that keeps it readable.
+    """
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.2f} ns"
+
+
+def save(results, path):
+    """
+    Write the results as a JSON baseline.
+    """
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def load(path):
+    """
+    Read the results back from a JSON baseline.
+
+    Returns:
+        dict: Benchmark name -> seconds per call
+    """
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Find the benchmarks that got slower than the baseline allows.
+
+    Benchmarks missing from either side are ignored.
+
+    Returns:
+        list: (name, baseline_seconds, seconds) of every regression
+    """
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is not None and seconds > before * (1 + threshold):
+            regressions.append((name, before, seconds))
+    return regressions
+
+
+def add_arguments(parser):
+    """
+    Add the options every suite shares to an argparse parser.
+    """
+    parser.add_argument("--save", metavar="PATH", help="write a JSON baseline")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="fail on regressions against a baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown as a fraction (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="runs per benchmark (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-k", dest="select", help="only run benchmarks whose name contains this"
+    )
+
+
+def main(benchmarks, args, out=None):
+    """
+    Run a suite with the options from add_arguments.
+
+    Returns:
+        int: Exit code, 1 if anything regressed
+    """
+    results = run(benchmarks, args.repeat, args.select, out)
+    if args.save:
+        save(results, args.save)
+
+    if not args.compare:
+        return 0
+    regressions = compare(results, load(args.compare), args.threshold)
+    for name, before, seconds in regressions:
+        print(
+            f"REGRESSION {name}: {format_time(before)} -> {format_time(seconds)}"
+            f" ({seconds / before - 1:+.0%})",
+            file=out,
+        )
+    return 1 if regressions else 0
@@ -0,0 +1,292 @@
+"""
+benchmark harness testing script
+"""
+
+import asyncio
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks import harness
+from benchmarks.bench_autocomplete import make_searches, run_load
+from benchmarks.bench_city_memory import run_storage
+from benchmarks.bench_city_search import (
+    linear_fuzzy_search,
+    linear_search,
+    make_cities,
+    make_typing,
+    make_typos,
+)
+from benchmarks.bench_pos_kata import (
+    make_basket,
+)
+from benchmarks.bench_pos_kata import make_benchmarks as make_pos_benchmarks
+from benchmarks.bench_pw_validator import make_pool, three_pass_validate_password
+from benchmarks.bench_string_calc import main as bench_string_calc
+from benchmarks.bench_string_calc import make_benchmarks, make_inputs
+from benchmarks.bench_string_calc_batch import make_batch
+from benchmarks.bench_string_calc_batch import make_benchmarks as make_batch_benchmarks
+from benchmarks.bench_white_box import four_search_validate_password, make_passwords
+from tdd.pw_validator.v5.pw import validate_password
+from tdd.search_func.city_search import (
+    CachedSearch,
+    CityIndex,
+    CompactCities,
+    FuzzyIndex,
+)
+from tdd.search_func.server import AutocompleteServer
+from white_box import class_exercises
+
+
+class TestHarness(unittest.TestCase):
+    """Timing, baselines and regression checks"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "baseline.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_measure_returns_time_per_call(self):
+        """Test that measuring gives a positive time"""
+        self.assertGreater(harness.measure(lambda: None, repeat=1), 0)
+
+    def test_save_and_load_round_trip(self):
+        """Test that a saved baseline loads back the same results"""
+        harness.save({"a": 0.5, "b": 1e-6}, self.path)
+        self.assertEqual(harness.load(self.path), {"a": 0.5, "b": 1e-6})
+
+    def test_compare_finds_regressions_over_threshold(self):
+        """Test that only slowdowns over the threshold are regressions"""
+        baseline = {"same": 1.0, "slower": 1.0, "bit_slower": 1.0, "faster": 1.0}
+        results = {"same": 1.0, "slower": 1.5, "bit_slower": 1.05, "faster": 0.5}
+        self.assertEqual(
+            harness.compare(results, baseline, 0.10), [("slower", 1.0, 1.5)]
+        )
+
+    def test_compare_ignores_new_benchmarks(self):
+        """Test that benchmarks missing from the baseline don't fail"""
+        self.assertEqual(harness.compare({"new": 1.0}, {"old": 1.0}), [])
+
+    def test_format_time_units(self):
+        """Test that durations get a readable unit"""
+        self.assertEqual(harness.format_time(2), "2.00 s")
+        self.assertEqual(harness.format_time(0.0025), "2.50 ms")
+        self.assertEqual(harness.format_time(3e-6), "3.00 us")
+        self.assertEqual(harness.format_time(4e-9), "4.00 ns")
+
+
+class TestStringCalcBenchmarks(unittest.TestCase):
+    """The string calculator suite builds and runs"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "baseline.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_inputs_have_requested_size(self):
+        """Test that every input holds the requested amount of numbers"""
+        inputs = make_inputs(10)
+        self.assertEqual(inputs["default"][1].replace("\n", ",").count(","), 9)
+        self.assertEqual(inputs["custom"][1].split("\n", 1)[1].count(";"), 9)
+        self.assertEqual(inputs["custom-long"][1].split("\n", 1)[1].count("***"), 9)
+        self.assertEqual(inputs["negatives"][1].count(","), 9)
+
+    def test_custom_delimiters_only_from_version_five(self):
+        """Test that versions without requirement 5 skip custom delimiters"""
+        names = make_benchmarks(sizes=[10])
+        self.assertIn("v4/default-10", names)
+        self.assertNotIn("v4/custom-10", names)
+        self.assertIn("v5/custom-10", names)
+        self.assertEqual(len(names), 8 * 2 + 4 * 2)
+
+    def test_save_then_compare_passes(self):
+        """Test a full run that saves a baseline and a generous comparison"""
+        out = io.StringIO()
+        argv = ["--sizes", "10", "--versions", "8", "--repeat", "1", "-k", "custom-10"]
+        with patch("sys.stdout", out):
+            self.assertEqual(bench_string_calc(argv + ["--save", self.path]), 0)
+            self.assertEqual(
+                bench_string_calc(
+                    argv + ["--compare", self.path, "--threshold", "1000"]
+                ),
+                0,
+            )
+        with open(self.path, encoding="utf-8") as file:
+            self.assertIn("v8/custom-10", json.load(file)["results"])
+        self.assertIn("v8/custom-10", out.getvalue())
+
+
+class TestStringCalcBatchBenchmarks(unittest.TestCase):
+    """The add_strings_many suite compares equal results"""
+
+    def test_add_many_matches_loop(self):
+        """Test that both paths give the same results"""
+        benchmarks = make_batch_benchmarks(rows=(500,))
+        for case in ("plain", "mixed"):
+            with self.subTest(case=case):
+                self.assertEqual(
+                    [str(result) for result in benchmarks[f"add_many/{case}-500"]()],
+                    [str(result) for result in benchmarks[f"loop/{case}-500"]()],
+                )
+
+    def test_mixed_batch_has_other_rows(self):
+        """Test that the mixed batch isn't all plain numbers"""
+        batch = make_batch(500, 0.1)
+        self.assertEqual(len(batch), 500)
+        self.assertTrue(any(numbers.startswith("//") for numbers in batch))
+        self.assertTrue(any("-" in numbers for numbers in batch))
+
+
+class TestPwValidatorBenchmarks(unittest.TestCase):
+    """The password validator suite compares equivalent versions"""
+
+    def test_single_pass_matches_three_pass(self):
+        """Test that both versions give the same result on the corpus"""
+        for password in make_pool(2000) + ["", "\u24b6b12cdefg", "Ab\u0661\u0662!xyz"]:
+            expected = three_pass_validate_password(password)
+            result = validate_password(password)
+            self.assertEqual(result["is_valid"], expected["is_valid"])
+            self.assertEqual(list(result["errors"]), expected["errors"])
+
+
+class TestWhiteBoxBenchmarks(unittest.TestCase):
+    """The white box password suite compares equivalent versions"""
+
+    def test_compiled_matches_four_searches(self):
+        """Test both versions on random and benchmark passwords"""
+        rnd = random.Random(16)
+        passwords = [
+            "".join(rnd.choices("aZ1!\n\u0661#x", k=rnd.randint(0, 12)))
+            for _ in range(2000)
+        ]
+        for length in (8, 64):
+            passwords.extend(make_passwords(length).values())
+        for password in passwords:
+            self.assertEqual(
+                class_exercises.validate_password(password),
+                four_search_validate_password(password),
+                password,
+            )
+
+    def test_passwords_have_requested_length(self):
+        """Test that the benchmark passwords are as long as asked"""
+        for kind, password in make_passwords(100).items():
+            self.assertEqual(len(password), 100, kind)
+
+
+class TestCitySearchBenchmarks(unittest.TestCase):
+    """The city search suite compares equivalent searches"""
+
+    def test_index_matches_linear_search(self):
+        """Test the index against the linear scan on generated names"""
+        cities = make_cities(2000)
+        index = CityIndex(cities)
+        for query in ("an", "ber", "stad", "nova", "kalin", "xq", "a b"):
+            self.assertEqual(index.find(query), linear_search(cities, query))
+
+    def test_cached_typing_matches_index(self):
+        """Test that the cache gives what the index does while typing"""
+        cities = make_cities(2000)
+        index = CityIndex(cities)
+        search = CachedSearch(cities, maxsize=8)
+        for search_lower in make_typing(cities, names=30, popular=5):
+            self.assertEqual(search.find(search_lower), index.find(search_lower))
+        info = search.info()
+        self.assertGreater(info.hits, 0)
+        self.assertGreater(info.filtered, 0)
+
+    def test_fuzzy_index_matches_linear_fuzzy_search(self):
+        """Test the deletion dictionary against measuring every name"""
+        cities = [city.casefold() for city in make_cities(2000)]
+        index = FuzzyIndex(cities)
+        for typo in make_typos(cities, count=20):
+            self.assertEqual(index.matches(typo), linear_fuzzy_search(cities, typo))
+
+
+class TestCityMemoryBenchmark(unittest.TestCase):
+    """The memory suite measures every storage in a process of its own"""
+
+    def test_compact_matches_list(self):
+        """Test that the compact storage holds the generated names"""
+        cities = make_cities(2000)
+        compact = CompactCities(iter(cities))
+        self.assertEqual(list(compact.cities), cities)
+        self.assertEqual(compact.find("an"), linear_search(cities, "an"))
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "RSS is read from /proc")
+    def test_run_storage_reports_growth(self):
+        """Test a small measurement in a child process"""
+        result = run_storage("compact", 20000)
+        self.assertEqual(set(result), {"rss", "peak"})
+        self.assertGreaterEqual(result["peak"], result["rss"])
+
+
+class TestPosKataBenchmarks(unittest.TestCase):
+    """The pos_kata suite compares equal totals"""
+
+    def test_cents_total_matches_float_total(self):
+        """Test that both paths show the same total"""
+        benchmarks = make_pos_benchmarks(items=(2000,), products=50)
+        self.assertEqual(benchmarks["cents/2000"](), benchmarks["float/2000"]())
+
+    def test_basket_has_requested_size(self):
+        """Test the basket size and its unknown barcodes"""
+        basket = make_basket(["1", "2"], 5000)
+        self.assertEqual(len(basket), 5000)
+        self.assertIn("0000000000000", basket)
+
+
+class TestAutocompleteBenchmark(unittest.TestCase):
+    """The autocomplete load test reports on every request it sends"""
+
+    def test_searches_are_typed_prefixes(self):
+        """Test the typists and what they type"""
+        searches = make_searches(["Rome", "Oslo", "Lima"], sessions=2)
+        self.assertEqual(
+            searches,
+            [
+                ("typist-0", "Ro"),
+                ("typist-0", "Rom"),
+                ("typist-0", "Rome"),
+                ("typist-1", "Os"),
+                ("typist-1", "Osl"),
+                ("typist-1", "Oslo"),
+                ("typist-0", "Li"),
+                ("typist-0", "Lim"),
+                ("typist-0", "Lima"),
+            ],
+        )
+
+    def test_run_load_against_server(self):
+        """Test a short load test against a server in the same process"""
+
+        async def load():
+            autocomplete = AutocompleteServer()
+            server = await autocomplete.start(port=0)
+            try:
+                port = server.sockets[0].getsockname()[1]
+                searches = make_searches(make_cities(50))
+                return await run_load("127.0.0.1", port, searches, 200, 0.1)
+            finally:
+                server.close()
+                await server.wait_closed()
+                autocomplete.close()
+
+        report = asyncio.run(load())
+        self.assertEqual(report["requests"], 20)
+        self.assertEqual(report["errors"], 0)
+        self.assertGreater(report["qps"], 0)
+        self.assertLessEqual(report["p50"], report["p99"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,16 +2,127 @@
 Point of Sale (POS) Kata
 
 Implements a simple barcode-based price lookup system with total calculation.
+
+Prices are parsed once, when the products are loaded, into integer cents,
+so totals are exact integer sums however large the basket; they only
+become "$12.50" strings when shown.
 """
 
 import os
+from array import array
+from collections import Counter
+from collections.abc import Sized
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, Mapping, Optional
 
 # Get current directory and data file path
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 PRODUCTS_FILE = os.path.join(MODULE_DIR, "products.txt")
 
+# Baskets longer than this many times the catalog are counted before adding
+COUNT_RATIO = 2
+
+
+def parse_cents(price: str) -> int:
+    """
+    Parse a price like "12.50" into integer cents, exactly.
+
+    Returns:
+        The price in cents
+
+    Raises:
+        ValueError: If price isn't a number or has a fraction of a cent
+    """
+    try:
+        cents = Decimal(price.strip()) * 100
+    except InvalidOperation as e:
+        raise ValueError(f"Invalid price: {price!r}") from e
+    if not cents.is_finite() or cents != cents.to_integral_value():
+        raise ValueError(f"Price isn't a whole number of cents: {price!r}")
+    return int(cents)
+
+
+def format_cents(cents: int) -> str:
+    """
+    Returns:
+        The amount of cents as dollars, like "$12.50"
+    """
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), 100)
+    return f"${sign}{dollars}.{cents:02d}"
+
+
+class PriceCatalog(Mapping[str, float]):
+    """
+    Prices by barcode, kept as integer cents.
+
+    Every barcode gets an ID, its position in the cents array('q'). As a
+    mapping it reads like the old dict of float prices, catalog["12345"]
+    == 7.25; the *_cents methods give the exact prices and totals.
+    """
+
+    def __init__(self, prices: Optional[Mapping[str, int]] = None):
+        self.ids: Dict[str, int] = {}
+        self.cents = array("q")
+        for barcode, cents in (prices or {}).items():
+            self.add(barcode, cents)
+
+    def add(self, barcode: str, cents: int):
+        """Set the price of a barcode, replacing the one it had."""
+        barcode_id = self.ids.get(barcode)
+        if barcode_id is None:
+            self.ids[barcode] = len(self.cents)
+            self.cents.append(cents)
+        else:
+            self.cents[barcode_id] = cents
+
+    def __getitem__(self, barcode: str) -> float:
+        return self.cents[self.ids[barcode]] / 100
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
 
-def load_products() -> dict:
+    def __contains__(self, barcode) -> bool:
+        return barcode in self.ids
+
+    def price_cents(self, barcode: str) -> Optional[int]:
+        """
+        Returns:
+            The price of the barcode in cents, None if it's unknown
+        """
+        barcode_id = self.ids.get(barcode)
+        return None if barcode_id is None else self.cents[barcode_id]
+
+    def total_cents(self, barcodes: Iterable[str]) -> int:
+        """
+        Add up the prices of the barcodes, ignoring the unknown ones.
+
+        A basket more than COUNT_RATIO times longer than the catalog has to
+        repeat barcodes, so it's counted first and every distinct barcode is
+        looked up once however often it was scanned. Anything shorter, the
+        usual basket, is cheaper to add up item by item than to count.
+
+        Returns:
+            The exact total in cents
+        """
+        ids, cents = self.ids, self.cents
+        if isinstance(barcodes, Sized) and len(barcodes) > COUNT_RATIO * len(ids):
+            return sum(
+                cents[ids[barcode]] * count
+                for barcode, count in Counter(barcodes).items()
+                if barcode in ids
+            )
+        total = 0
+        for barcode in barcodes:
+            if barcode in ids:
+                total += cents[ids[barcode]]
+        return total
+
+
+def load_products() -> PriceCatalog:
     """
     Load product barcodes and prices from a file.
     File format:
@@ -19,8 +130,12 @@ def load_products() -> dict:
     Example:
         12345,7.25
         23456,12.50
+
+    Raises:
+        FileNotFoundError: If the products file doesn't exist
+        ValueError: If a price isn't a whole number of cents
     """
-    products = {}
+    products = PriceCatalog()
     if not os.path.exists(PRODUCTS_FILE):
         raise FileNotFoundError(f"Products file '{PRODUCTS_FILE}' not found")
 
@@ -29,7 +144,7 @@ def load_products() -> dict:
             parts = line.strip().split(",")
             if len(parts) == 2:
                 barcode, price = parts
-                products[barcode.strip()] = float(price.strip())
+                products.add(barcode.strip(), parse_cents(price))
     return products
 
 
@@ -37,7 +152,7 @@ def load_products() -> dict:
 try:
     PRODUCTS = load_products()
 except FileNotFoundError:
-    PRODUCTS = {}
+    PRODUCTS = PriceCatalog()
 
 
 def scan(barcode: str) -> str:
@@ -53,18 +168,15 @@ def scan(barcode: str) -> str:
     if not barcode:
         return "Error: empty barcode"
 
-    if barcode in PRODUCTS:
-        return f"${PRODUCTS[barcode]:.2f}"
+    cents = PRODUCTS.price_cents(barcode)
+    if cents is not None:
+        return format_cents(cents)
 
     return "Error: barcode not found"
 
 
-def calculate_total(barcodes: list[str]) -> str:
+def calculate_total(barcodes: Iterable[str]) -> str:
     """
     Calculate the total price for a list of scanned barcodes.
     """
-    total = 0.0
-    for barcode in barcodes:
-        if barcode in PRODUCTS:
-            total += PRODUCTS[barcode]
-    return f"Total: ${total:.2f}"
+    return f"Total: {format_cents(PRODUCTS.total_cents(barcodes))}"
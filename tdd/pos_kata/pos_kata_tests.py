@@ -2,9 +2,20 @@
 Data-driven tests for the Point of Sale Kata
 """
 
+import random
+from decimal import Decimal
+
 import pytest
 
-from tdd.pos_kata.pos_kata import PRODUCTS, calculate_total, scan
+from tdd.pos_kata import pos_kata
+from tdd.pos_kata.pos_kata import (
+    PRODUCTS,
+    PriceCatalog,
+    calculate_total,
+    format_cents,
+    parse_cents,
+    scan,
+)
 
 
 class TestPOSKata:
@@ -46,3 +57,78 @@ class TestPOSKata:
         """Test total calculation with a mix of valid and invalid barcodes"""
         barcodes = ["12345", "99999", "23456"]
         assert calculate_total(barcodes) == "Total: $19.75"
+
+
+class TestIntegerCents:
+    """Prices parsed once into integer cents, formatted only when shown"""
+
+    @pytest.mark.parametrize(
+        "price,cents",
+        [
+            ("7.25", 725),
+            ("12.50", 1250),
+            (" 3 ", 300),
+            ("0.1", 10),
+            ("0.30", 30),
+            ("90071992547409.93", 9007199254740993),  # Past float precision
+        ],
+    )
+    def test_parse_cents(self, price, cents):
+        """Test exact parsing of prices"""
+        assert parse_cents(price) == cents
+
+    @pytest.mark.parametrize("price", ["7.255", "abc", "", "nan", "inf"])
+    def test_parse_invalid_price(self, price):
+        """Test that prices that aren't whole cents are refused"""
+        with pytest.raises(ValueError):
+            parse_cents(price)
+
+    @pytest.mark.parametrize(
+        "cents,expected",
+        [(0, "$0.00"), (5, "$0.05"), (1250, "$12.50"), (-150, "$-1.50")],
+    )
+    def test_format_cents(self, cents, expected):
+        """Test formatting like the float prices were"""
+        assert format_cents(cents) == expected
+
+    def test_catalog_reads_like_dict_of_floats(self):
+        """Test the mapping view of the catalog"""
+        catalog = PriceCatalog({"1": 725, "2": 1250})
+        catalog.add("1", 730)
+        assert dict(catalog) == {"1": 7.30, "2": 12.50}
+        assert "1" in catalog and "3" not in catalog
+        assert list(catalog.cents) == [730, 1250]
+        assert catalog.price_cents("3") is None
+
+    def test_total_is_exact(self, monkeypatch):
+        """Test a total that floats can't hold"""
+        catalog = PriceCatalog({"1": parse_cents("90071992547409.93"), "2": 1})
+        monkeypatch.setattr(pos_kata, "PRODUCTS", catalog)
+        assert calculate_total(["1", "2", "9"]) == "Total: $90071992547409.94"
+        assert scan("1") == "$90071992547409.93"
+
+    def test_random_baskets_match_decimal(self):
+        """Test totals against adding Decimal prices one by one"""
+        rnd = random.Random(25)
+        prices = {
+            str(code): f"{rnd.randrange(0, 100_000) / 100:.2f}" for code in range(50)
+        }
+        catalog = PriceCatalog(
+            {code: parse_cents(price) for code, price in prices.items()}
+        )
+        for _ in range(50):
+            basket = rnd.choices(list(prices) + ["unknown"], k=rnd.randint(0, 500))
+            expected = sum(
+                (Decimal(prices[code]) for code in basket if code in prices),
+                Decimal(0),
+            )
+            assert catalog.total_cents(basket) == expected * 100
+
+    @pytest.mark.parametrize("items", [0, 1, 5, 6, 7, 100])
+    def test_counted_total_matches_itemized(self, items):
+        """Test long baskets, counted first, against adding item by item"""
+        catalog = PriceCatalog({"1": 725, "2": 1250, "3": 1})
+        basket = (["1", "2", "3", "9"] * items)[:items]
+        expected = sum(catalog.price_cents(code) or 0 for code in basket)
+        assert catalog.total_cents(basket) == expected
+        assert catalog.total_cents(iter(basket)) == expected
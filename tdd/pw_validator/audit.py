@@ -0,0 +1,194 @@
+"""
+Bulk audit of password files with the pw_validator v5 rules.
+
+audit_file runs validate_password over every line of a newline separated
+password file and adds up what failed. The file is memory-mapped and cut
+into chunks at line ends, each chunk is validated by a worker process
+that maps the file on its own, so neither the parent nor the workers ever
+hold more than a chunk of it in memory.
+
+    python -m tdd.pw_validator.audit dump.txt --offsets failing.txt
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from tdd.pw_validator.v5.pw import validate_password
+
+# Bytes of the file validated by each task
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def _chunk_bounds(data, chunk_size):
+    """
+    Cut the mapped file into pieces of about chunk_size bytes.
+
+    Every cut is right after a newline, so no line is split.
+
+    Returns:
+        generator: (start, end) byte positions of each piece
+    """
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start + chunk_size) + 1
+        if end == 0:
+            end = len(data)
+        yield start, end
+        start = end
+
+
+def _lines(chunk, encoding):
+    """
+    Split a chunk into passwords, with the byte offset of each one.
+
+    Lines that aren't valid in encoding are decoded with replacement
+    characters. A "\\r" before the newline isn't part of the password.
+
+    Returns:
+        generator: (offset_in_chunk, password) of every line
+    """
+    offset = 0
+    parts = chunk.split(b"\n")
+    if not parts[-1]:
+        parts.pop()  # Nothing after the last newline
+    for line in parts:
+        yield offset, line.decode(encoding, "replace").removesuffix("\r")
+        offset += len(line) + 1
+
+
+def _audit_chunk(path, start, end, encoding, want_offsets):
+    """
+    Validate the lines between two byte positions of the file.
+
+    Runs in the worker processes of audit_file.
+
+    Returns:
+        tuple: (lines, invalid, error_counts, failing_offsets),
+               failing_offsets is None unless want_offsets
+    """
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        chunk = data[start:end]
+
+    lines = invalid = 0
+    counts = Counter()
+    offsets = array("Q") if want_offsets else None
+    for offset, password in _lines(chunk, encoding):
+        lines += 1
+        errors = validate_password(password)["errors"]
+        if errors:
+            invalid += 1
+            counts.update(errors)
+            if want_offsets:
+                offsets.append(start + offset)
+    return lines, invalid, counts, offsets
+
+
+def _audit_chunks(path, bounds, args, pool, in_flight):
+    """
+    Run _audit_chunk over every piece, with at most in_flight submitted
+    but not yet merged (so finished results can't pile up in memory).
+
+    Returns:
+        generator: The results of the pieces, in file order
+    """
+    window = deque()
+    for start, end in bounds:
+        window.append(pool.submit(_audit_chunk, path, start, end, *args))
+        if len(window) >= in_flight:
+            yield window.popleft().result()
+    while window:
+        yield window.popleft().result()
+
+
+def _results(path, chunk_size, args, workers):
+    """
+    Audit the file piece by piece, in this process if there's just one.
+
+    Returns:
+        generator: What _audit_chunk returns for every piece, in file order
+    """
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return  # An empty file can't be mapped, and has no lines anyway
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            bounds = list(_chunk_bounds(data, chunk_size))
+
+    if len(bounds) == 1:
+        yield _audit_chunk(path, *bounds[0], *args)
+        return
+    in_flight = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from _audit_chunks(path, bounds, args, pool, in_flight)
+
+
+def audit_file(
+    path,
+    offsets_path=None,
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    encoding="utf-8",
+):
+    """
+    Validate every password in a newline separated file.
+
+    Files up to chunk_size bytes are audited in this process, bigger ones
+    by a ProcessPoolExecutor with the given number of workers. If
+    offsets_path is given, the byte offset of every failing line is
+    written there, one per line and in file order.
+
+    Returns:
+        dict: {"lines": int, "valid": int, "invalid": int,
+               "errors": {error_message: count}}
+    """
+    lines = invalid = 0
+    counts = Counter()
+    args = (encoding, offsets_path is not None)
+    with open(
+        os.devnull if offsets_path is None else offsets_path, "w", encoding="ascii"
+    ) as offsets_file:
+        for result in _results(path, chunk_size, args, workers):
+            chunk_lines, chunk_invalid, chunk_counts, offsets = result
+            lines += chunk_lines
+            invalid += chunk_invalid
+            counts.update(chunk_counts)
+            if offsets:
+                offsets_file.write("".join(f"{offset}\n" for offset in offsets))
+
+    return {
+        "lines": lines,
+        "valid": lines - invalid,
+        "invalid": invalid,
+        "errors": dict(counts),
+    }
+
+
+def main(argv=None):
+    """
+    Audit a password file from the command line and print the counts.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="newline separated password file")
+    parser.add_argument("--offsets", help="write the failing line offsets here")
+    parser.add_argument("--workers", type=int, help="worker processes")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="bytes per task (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    report = audit_file(args.path, args.offsets, args.workers, args.chunk_size)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
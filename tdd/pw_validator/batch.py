@@ -0,0 +1,165 @@
+"""
+Batch validation of passwords with the pw_validator v5 rules.
+
+validate_passwords_array works column by column instead of password by
+password: every rule is evaluated for the whole batch with C level
+operations (str.join, bytes.translate, map over builtins), and the usual
+{"is_valid", "errors"} dicts are only built for the passwords that are
+looked at.
+
+ASCII passwords are joined into one buffer, which bytes.translate turns
+into a buffer of just the digits, just the capitals and so on, so the
+per password work is a few len() calls. Passwords with other characters,
+or with a newline (the separator in the buffer), go through the same per
+character loop as v5.
+"""
+
+from itertools import repeat
+
+from tdd.pw_validator.rules import V5_RULES
+from tdd.pw_validator.v5.pw import ERRORS, RESULTS
+
+
+def _deleting_all_but(keep):
+    """Table for bytes.translate that deletes every byte but keep and newlines."""
+    return bytes(byte for byte in range(256) if not keep(chr(byte)) and byte != 10)
+
+
+# What has to go for the rest of an ASCII buffer to be one kind of character
+_DELETE = (
+    _deleting_all_but(str.isdigit),
+    _deleting_all_but(str.isupper),
+    _deleting_all_but(lambda char: not char.isalnum()),
+)
+
+
+def _classify(password):
+    """
+    Count the digits, capitals and special characters like v5 does.
+
+    Returns:
+        tuple: (digits, capitals, specials)
+    """
+    digits = capitals = specials = 0
+    for char in password:
+        if char.isdigit():
+            digits += 1
+        else:
+            if char.isupper():
+                capitals += 1
+            if not char.isalnum():
+                specials += 1
+    return digits, capitals, specials
+
+
+def _ascii_columns(passwords):
+    """
+    Count each kind of character of ASCII passwords without newlines.
+
+    The passwords are joined into one buffer. Deleting every other kind of
+    character from it leaves one line per password, as long as its count.
+
+    Returns:
+        tuple: (digit counts, capital counts, special counts)
+    """
+    buffer = "\n".join(passwords).encode("ascii")
+    return tuple(
+        list(map(len, buffer.translate(None, delete).split(b"\n")))
+        for delete in _DELETE
+    )
+
+
+def _columns(passwords):
+    """
+    Count each kind of character of every password, in bulk where possible.
+
+    Returns:
+        tuple: (digit counts, capital counts, special counts)
+    """
+    joined = "\n".join(passwords)
+    if joined.isascii() and joined.count("\n") == len(passwords) - 1:
+        return _ascii_columns(passwords)
+
+    plain = list(
+        map(
+            bool.__gt__,
+            map(str.isascii, passwords),
+            map(str.__contains__, passwords, repeat("\n")),
+        )
+    )
+    columns = _ascii_columns([p for p, fast in zip(passwords, plain) if fast])
+    others = iter(map(_classify, [p for p, fast in zip(passwords, plain) if not fast]))
+    fast_rows = zip(*columns)
+    return tuple(
+        map(list, zip(*(next(fast_rows if fast else others) for fast in plain)))
+    )
+
+
+class PasswordBatch:
+    """
+    Results of validate_passwords_array.
+
+    Each rule has a mask with one bool per password, True where the
+    password passes it. batch[i] is what validate_password returns for
+    the i-th password, looked up when asked for.
+    """
+
+    def __init__(self, length_ok, digits_ok, capital_ok, special_ok):
+        self.length_ok = length_ok
+        self.digits_ok = digits_ok
+        self.capital_ok = capital_ok
+        self.special_ok = special_ok
+        # The masks with the error of each rule, in the order v5 reports them
+        self.masks = tuple(
+            zip(
+                ERRORS,
+                (length_ok, digits_ok, capital_ok, special_ok),
+            )
+        )
+        self.is_valid = list(
+            map(all, zip(length_ok, digits_ok, capital_ok, special_ok))
+        )
+
+    def __len__(self):
+        return len(self.is_valid)
+
+    def __getitem__(self, index):
+        if self.is_valid[index]:  # Raises IndexError like a list
+            return RESULTS[0]
+        return RESULTS[
+            sum(1 << bit for bit, (_, mask) in enumerate(self.masks) if not mask[index])
+        ]
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def errors(self, index):
+        """
+        Returns:
+            tuple: The errors of the password at index, in v5 order
+        """
+        return self[index]["errors"]
+
+    def invalid_indexes(self):
+        """
+        Returns:
+            list: Positions of the passwords that break at least one rule
+        """
+        return [index for index, valid in enumerate(self.is_valid) if not valid]
+
+
+def validate_passwords_array(passwords):
+    """
+    Validate a batch of passwords against the v5 rules, rule by rule.
+
+    Returns:
+        PasswordBatch: Per rule masks, and the usual dicts on demand
+    """
+    passwords = list(passwords)
+    if not passwords:
+        return PasswordBatch([], [], [], [])
+    counts = (list(map(len, passwords)), *_columns(passwords))
+    # Every v5 rule asks for at least rule.limit of something
+    return PasswordBatch(
+        *(list(map(rule.limit.__le__, count)) for rule, count in zip(V5_RULES, counts))
+    )
@@ -0,0 +1,231 @@
+"""
+Declarative password rules for the Password input field validation
+exercise from the tddmanifesto.com
+
+v1 to v5 hard-code their rules, one more per version. A RuleSet takes the
+rules as data instead and compiles them into a single check that looks at
+every character once, whatever the rules. Adding a rule doesn't add a
+pass over the password, and each tenant can have its own policy:
+
+    policy = RuleSet.from_config({"min_length": 12, "max_repeats": 2})
+    policy.validate("StrongPass12!")
+"""
+
+from typing import NamedTuple
+
+# What each kind of rule limits, as an index into the stats of _scan
+_STAT = {
+    "min_length": 0,
+    "min_digits": 1,
+    "min_uppercase": 2,
+    "min_special": 3,
+    "max_repeats": 4,
+}
+
+RULE_KINDS = tuple(_STAT)
+
+
+class Rule(NamedTuple):
+    """One password rule: what it limits, the limit and the error message"""
+
+    kind: str
+    limit: int
+    message: str
+
+
+def _how_many(limit, singular, plural):
+    """'one capital letter', '2 capital letters' and so on."""
+    return f"one {singular}" if limit == 1 else f"{limit} {plural}"
+
+
+def min_length(limit=8, message=None):
+    """Rule: the password has at least limit characters."""
+    return Rule(
+        "min_length", limit, message or f"Password must be at least {limit} characters"
+    )
+
+
+def min_digits(limit=2, message=None):
+    """Rule: the password has at least limit digits."""
+    return Rule(
+        "min_digits",
+        limit,
+        message or f"The password must contain at least {limit} numbers",
+    )
+
+
+def min_uppercase(limit=1, message=None):
+    """Rule: the password has at least limit capital letters."""
+    return Rule(
+        "min_uppercase",
+        limit,
+        message
+        or "password must contain at least "
+        + _how_many(limit, "capital letter", "capital letters"),
+    )
+
+
+def min_special(limit=1, message=None):
+    """Rule: the password has at least limit characters that aren't alphanumeric."""
+    return Rule(
+        "min_special",
+        limit,
+        message
+        or "password must contain at least "
+        + _how_many(limit, "special character", "special characters"),
+    )
+
+
+def max_repeats(limit=2, message=None):
+    """Rule: no character appears more than limit times in a row."""
+    return Rule(
+        "max_repeats",
+        limit,
+        message
+        or f"password must not repeat a character more than {limit} times in a row",
+    )
+
+
+_RULE_FACTORIES = {
+    "min_length": min_length,
+    "min_digits": min_digits,
+    "min_uppercase": min_uppercase,
+    "min_special": min_special,
+    "max_repeats": max_repeats,
+}
+
+# The rules of v5, in the order it reports them
+V5_RULES = (min_length(), min_digits(), min_uppercase(), min_special())
+
+
+def _length(password):
+    """Stats of _scan when only the length is needed."""
+    return (len(password),)
+
+
+def _scan(password):
+    """
+    Classify every character of the password in one pass.
+
+    Returns:
+        tuple: (length, digits, capital letters, special characters)
+    """
+    digits = upper = special = 0
+    for char in password:
+        if char.isdigit():
+            digits += 1
+        else:
+            if char.isupper():
+                upper += 1
+            if not char.isalnum():
+                special += 1
+    return len(password), digits, upper, special
+
+
+def _scan_repeats(password):
+    """
+    _scan that also measures the longest run of one repeated character.
+
+    Returns:
+        tuple: (length, digits, capital letters, special characters,
+                longest run)
+    """
+    digits = upper = special = 0
+    longest = run = 0
+    previous = None
+    for char in password:
+        if char == previous:
+            run += 1
+        else:
+            longest = max(longest, run)
+            previous = char
+            run = 1
+        if char.isdigit():
+            digits += 1
+        else:
+            if char.isupper():
+                upper += 1
+            if not char.isalnum():
+                special += 1
+    return len(password), digits, upper, special, max(longest, run)
+
+
+def _compile(rules):
+    """
+    Fuse the rules into a single check function.
+
+    The scanner is the cheapest one that gives every stat the rules need,
+    the rules then only compare numbers.
+
+    Returns:
+        function: password -> list of the error messages of failed rules
+    """
+    needed = max((_STAT[rule.kind] for rule in rules), default=0)
+    scan = _length if needed == 0 else _scan if needed < 4 else _scan_repeats
+    checks = tuple(
+        (_STAT[rule.kind], rule.kind.startswith("max_"), rule.limit, rule.message)
+        for rule in rules
+    )
+
+    def check(password):
+        stats = scan(password)
+        return [
+            message
+            for index, at_most, limit, message in checks
+            if (stats[index] > limit if at_most else stats[index] < limit)
+        ]
+
+    return check
+
+
+class RuleSet:
+    """
+    An ordered set of password rules, checked in a single pass.
+
+    The errors of validate come in the order the rules were given.
+    """
+
+    def __init__(self, rules=V5_RULES):
+        rules = tuple(Rule(*rule) for rule in rules)
+        unknown = sorted({rule.kind for rule in rules}.difference(_STAT))
+        if unknown:
+            raise ValueError(f"Unknown rule kind(s): {unknown}")
+        self.rules = rules
+        self._check = _compile(rules)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a rule set from {kind: limit}, in the order of the mapping.
+
+        Every rule gets its default error message, e.g. for a policy loaded
+        from a tenant's JSON settings.
+
+        Raises:
+            ValueError: If a kind isn't one of RULE_KINDS
+        """
+        unknown = sorted(set(config).difference(_RULE_FACTORIES))
+        if unknown:
+            raise ValueError(f"Unknown rule kind(s): {unknown}")
+        return cls(_RULE_FACTORIES[kind](limit) for kind, limit in config.items())
+
+    def __repr__(self):
+        config = ", ".join(f"{rule.kind}={rule.limit}" for rule in self.rules)
+        return f"RuleSet({config})"
+
+    def errors(self, password):
+        """
+        Returns:
+            list: The messages of the rules the password breaks, in order
+        """
+        return self._check(password)
+
+    def validate(self, password: str) -> dict:
+        """
+        Validate the given password against every rule of the set.
+
+        Returns:
+            dict: A dictionary with 'is_valid' (bool) and 'errors' (list of str).
+        """
+        errors = self._check(password)
+        return {"is_valid": not errors, "errors": errors}
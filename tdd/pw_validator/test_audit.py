@@ -0,0 +1,132 @@
+"""
+Password file audit testing script
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from tdd.pw_validator.audit import audit_file
+from tdd.pw_validator.v5.pw import validate_password
+
+PASSWORDS = [
+    "StrongPass12!",
+    "short",
+    "nocapital12!",
+    "",
+    "CaféCrème12!",
+    "ValidPass12",
+    "Another12#Ok",
+]
+
+SHORT = "Password must be at least 8 characters"
+NUMBERS = "The password must contain at least 2 numbers"
+CAPITAL = "password must contain at least one capital letter"
+SPECIAL = "password must contain at least one special character"
+
+
+class TestAuditFile(unittest.TestCase):
+    """Bulk validation of newline separated password files"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "passwords.txt")
+        self.offsets = os.path.join(self.tmp, "offsets.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, data):
+        """Write the password file as raw bytes"""
+        with open(self.path, "wb") as file:
+            file.write(data)
+
+    def expected(self, passwords):
+        """Audit the passwords one by one, the slow way"""
+        errors = {}
+        invalid = 0
+        for password in passwords:
+            result = validate_password(password)
+            invalid += not result["is_valid"]
+            for error in result["errors"]:
+                errors[error] = errors.get(error, 0) + 1
+        return {
+            "lines": len(passwords),
+            "valid": len(passwords) - invalid,
+            "invalid": invalid,
+            "errors": errors,
+        }
+
+    def test_counts_per_error(self):
+        """Test the totals and the count of every error"""
+        self.write("\n".join(PASSWORDS).encode() + b"\n")
+        report = audit_file(self.path)
+        self.assertEqual(report, self.expected(PASSWORDS))
+        self.assertEqual(report["valid"], 3)
+        self.assertEqual(report["errors"][SHORT], 2)
+        self.assertEqual(report["errors"][SPECIAL], 3)
+
+    def test_empty_file(self):
+        """Test that an empty file has no lines"""
+        self.write(b"")
+        self.assertEqual(
+            audit_file(self.path), {"lines": 0, "valid": 0, "invalid": 0, "errors": {}}
+        )
+
+    def test_last_line_without_newline(self):
+        """Test that the last password counts without a newline after it"""
+        self.write(b"StrongPass12!\nshort")
+        self.assertEqual(audit_file(self.path)["lines"], 2)
+
+    def test_windows_line_ends(self):
+        """Test that "\\r\\n" line ends aren't part of the passwords"""
+        self.write(b"StrongPass12!\r\nValidPass12\r\n")
+        report = audit_file(self.path)
+        self.assertEqual(report["valid"], 1)
+        self.assertEqual(report["errors"], {SPECIAL: 1})
+
+    def test_undecodable_bytes(self):
+        """Test that bytes that aren't UTF-8 don't stop the audit"""
+        self.write(b"Strong\xffPass12\nshort\n")
+        report = audit_file(self.path)
+        self.assertEqual(report["lines"], 2)
+        self.assertEqual(report["valid"], 1)  # The replacement is special
+
+    def test_failing_offsets(self):
+        """Test that the offsets point at the start of every failing line"""
+        data = "\n".join(PASSWORDS).encode() + b"\n"
+        self.write(data)
+        audit_file(self.path, offsets_path=self.offsets)
+        with open(self.offsets, encoding="ascii") as file:
+            offsets = [int(line) for line in file]
+
+        failing = [
+            line.decode()
+            for line in data.split(b"\n")[:-1]
+            if not validate_password(line.decode())["is_valid"]
+        ]
+        self.assertEqual(
+            [data[offset:].split(b"\n", 1)[0].decode() for offset in offsets], failing
+        )
+
+    def test_chunks_in_process_pool(self):
+        """Test tiny chunks audited by several processes against one pass"""
+        passwords = PASSWORDS * 50
+        data = "\r\n".join(passwords).encode()
+        self.write(data)
+        single = audit_file(self.path, offsets_path=self.offsets)
+        with open(self.offsets, encoding="ascii") as file:
+            single_offsets = file.read()
+
+        pooled = audit_file(
+            self.path, offsets_path=self.offsets, workers=2, chunk_size=40
+        )
+        with open(self.offsets, encoding="ascii") as file:
+            self.assertEqual(file.read(), single_offsets)
+        self.assertEqual(pooled, single)
+        self.assertEqual(pooled, self.expected(passwords))
+
+
+if __name__ == "__main__":
+    unittest.main()
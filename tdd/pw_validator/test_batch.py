@@ -0,0 +1,76 @@
+"""
+Batch password validation testing script
+"""
+
+import random
+import unittest
+
+from tdd.pw_validator.batch import validate_passwords_array
+from tdd.pw_validator.v5.pw import validate_password
+
+PASSWORDS = [
+    "StrongPass12!",
+    "short",
+    "nocapital12!",
+    "",
+    "ValidPass12",
+    "Another12#Ok",
+]
+
+
+class TestValidatePasswordsArray(unittest.TestCase):
+    """Rule by rule validation of many passwords at once"""
+
+    def test_masks_per_rule(self):
+        """Test the mask of every rule"""
+        batch = validate_passwords_array(PASSWORDS)
+        self.assertEqual(batch.length_ok, [True, False, True, False, True, True])
+        self.assertEqual(batch.digits_ok, [True, False, True, False, True, True])
+        self.assertEqual(batch.capital_ok, [True, False, False, False, True, True])
+        self.assertEqual(batch.special_ok, [True, False, True, False, False, True])
+        self.assertEqual(batch.is_valid, [True, False, False, False, False, True])
+        self.assertEqual(batch.invalid_indexes(), [1, 2, 3, 4])
+
+    def test_dicts_match_validate_password(self):
+        """Test the dicts of the batch against validate_password"""
+        batch = validate_passwords_array(PASSWORDS)
+        self.assertEqual(len(batch), len(PASSWORDS))
+        self.assertEqual(list(batch), [validate_password(p) for p in PASSWORDS])
+        self.assertEqual(batch[-1], validate_password(PASSWORDS[-1]))
+        self.assertRaises(IndexError, batch.__getitem__, len(PASSWORDS))
+
+    def test_results_are_shared_with_validate_password(self):
+        """Test that the batch hands out the results validate_password does"""
+        batch = validate_passwords_array(PASSWORDS)
+        for index, password in enumerate(PASSWORDS):
+            self.assertIs(batch[index], validate_password(password))
+        self.assertEqual(batch.errors(1), validate_password("short")["errors"])
+
+    def test_empty_batch(self):
+        """Test a batch without passwords"""
+        batch = validate_passwords_array(iter([]))
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(list(batch), [])
+
+    def test_passwords_outside_ascii(self):
+        """Test Unicode digits, capitals and specials, and newlines"""
+        passwords = ["CaféCrème12!", "Ⓐbcdefg12", "١٢Password!", "Pass\nword12", ""]
+        batch = validate_passwords_array(passwords)
+        self.assertEqual(list(batch), [validate_password(p) for p in passwords])
+
+    def test_random_mixed_batches(self):
+        """Test batches mixing the bulk path and the per character one"""
+        rnd = random.Random(14)
+        for _ in range(50):
+            passwords = [
+                "".join(rnd.choices("aA1!é\nⅫ Ⓐ٢\r", k=rnd.randint(0, 12)))
+                for _ in range(rnd.randint(1, 50))
+            ]
+            self.assertEqual(
+                list(validate_passwords_array(passwords)),
+                [validate_password(p) for p in passwords],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Declarative password rules testing script
+"""
+
+import random
+import unittest
+
+from tdd.pw_validator.rules import (
+    V5_RULES,
+    RuleSet,
+    max_repeats,
+    min_length,
+    min_special,
+    min_uppercase,
+)
+from tdd.pw_validator.v1.pw import validate_password as validate_v1
+from tdd.pw_validator.v2.pw import validate_password as validate_v2
+from tdd.pw_validator.v4.pw import validate_password as validate_v4
+from tdd.pw_validator.v5.pw import validate_password as validate_v5
+
+PASSWORDS = [
+    "",
+    "short",
+    "StrongPass12!",
+    "nocapital12!",
+    "NoNumbers!",
+    "ValidPass12",
+    "CaféCrème12!",
+    "Ⓐbcdefg12",  # Both a capital letter and a special character
+    "١٢Password!",  # Arabic-Indic digits
+    "aaaBBB111!!!",
+]
+
+
+class TestRuleSet(unittest.TestCase):
+    """Rule sets built from declared rules"""
+
+    def test_same_results_as_every_version(self):
+        """Test the rules of each version against its validate_password"""
+        versions = [(validate_v1, 1), (validate_v2, 2), (validate_v4, 3)]
+        versions.append((validate_v5, 4))
+        rnd = random.Random(5)
+        passwords = PASSWORDS + [
+            "".join(rnd.choices("aA1!é Ⅻ", k=rnd.randint(0, 12))) for _ in range(500)
+        ]
+        for validate, count in versions:
+            rule_set = RuleSet(V5_RULES[:count])
+            for password in passwords:
+                with self.subTest(rules=count, password=password):
+                    expected = validate(password)
+                    result = rule_set.validate(password)
+                    self.assertEqual(result["is_valid"], expected["is_valid"])
+                    self.assertEqual(result["errors"], list(expected["errors"]))
+
+    def test_default_is_v5(self):
+        """Test that the default rules are those of v5"""
+        self.assertEqual(RuleSet().rules, V5_RULES)
+
+    def test_no_rules(self):
+        """Test that without rules every password is valid"""
+        self.assertEqual(RuleSet([]).validate(""), {"is_valid": True, "errors": []})
+
+    def test_errors_in_rule_order(self):
+        """Test that the errors follow the order of the rules"""
+        rule_set = RuleSet([min_special(), min_length(10)])
+        self.assertEqual(
+            rule_set.errors("short"),
+            [
+                "password must contain at least one special character",
+                "Password must be at least 10 characters",
+            ],
+        )
+
+    def test_max_repeats(self):
+        """Test the longest run of a repeated character"""
+        rule_set = RuleSet([max_repeats(2)])
+        self.assertTrue(rule_set.validate("aabbaa")["is_valid"])
+        self.assertEqual(
+            rule_set.errors("abbb"),
+            ["password must not repeat a character more than 2 times in a row"],
+        )
+        self.assertEqual(rule_set.errors("aaab"), rule_set.errors("abbb"))
+
+    def test_counts_above_one(self):
+        """Test limits that need more than one character of a kind"""
+        rule_set = RuleSet([min_uppercase(2), min_special(2, "need 2 specials")])
+        self.assertEqual(
+            rule_set.errors("Ab!"),
+            ["password must contain at least 2 capital letters", "need 2 specials"],
+        )
+        self.assertEqual(rule_set.errors("ABc!?"), [])
+
+    def test_rules_as_plain_tuples(self):
+        """Test that rules can be declared as (kind, limit, message)"""
+        rule_set = RuleSet([("min_length", 3, "too short")])
+        self.assertEqual(rule_set.errors("ab"), ["too short"])
+
+    def test_unknown_rule_kind_raises_error(self):
+        """Test that a rule kind the set can't check is rejected"""
+        with self.assertRaises(ValueError) as context:
+            RuleSet([("min_emoji", 1, "no emoji")])
+        self.assertEqual(str(context.exception), "Unknown rule kind(s): ['min_emoji']")
+
+
+class TestRuleSetFromConfig(unittest.TestCase):
+    """Policies loaded from plain settings"""
+
+    def test_config_keeps_order_and_limits(self):
+        """Test a tenant policy built from a mapping"""
+        policy = RuleSet.from_config({"min_length": 12, "max_repeats": 2})
+        self.assertEqual(repr(policy), "RuleSet(min_length=12, max_repeats=2)")
+        self.assertEqual(
+            policy.errors("Passsword1!"),
+            [
+                "Password must be at least 12 characters",
+                "password must not repeat a character more than 2 times in a row",
+            ],
+        )
+
+    def test_unknown_config_key_raises_error(self):
+        """Test that a misspelt setting isn't silently ignored"""
+        with self.assertRaises(ValueError) as context:
+            RuleSet.from_config({"min_lenght": 12})
+        self.assertEqual(str(context.exception), "Unknown rule kind(s): ['min_lenght']")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,30 +4,58 @@ the tddmanifesto.com
 
 """
 
+from types import MappingProxyType
 
-def validate_password(password: str) -> dict:
+ERRORS = (
+    # Requirement 1: Minimum length of 8 characters
+    "Password must be at least 8 characters",
+    # Requirement 2: Must contain at least 2 numbers
+    "The password must contain at least 2 numbers",
+    # Requirement 3: Must contain at least one capital letter
+    "password must contain at least one capital letter",
+    # NEW Requirement 4: Must contain at least one special character
+    "password must contain at least one special character",
+)
+
+
+def _result(failures):
     """
-    Validate the given password according to the specified rules.
+    Build the read-only result for a bitmask of failed requirements.
     """
-    errors = []
+    errors = tuple(
+        message for bit, message in enumerate(ERRORS) if failures & (1 << bit)
+    )
+    return MappingProxyType({"is_valid": not errors, "errors": errors})
 
-    # Requirement 1: Minimum length of 8 characters
-    if len(password) < 8:
-        errors.append("Password must be at least 8 characters")
 
-    # Requirement 2: Must contain at least 2 numbers
-    digit_count = sum(1 for char in password if char.isdigit())
-    if digit_count < 2:
-        errors.append("The password must contain at least 2 numbers")
-
-    # Requirement 3: Must contain at least one capital letter
-    if not any(char.isupper() for char in password):
-        errors.append("password must contain at least one capital letter")
+# Every possible result, shared by all the calls. Bit n - 1 of the index is
+# set when requirement n fails.
+RESULTS = tuple(_result(failures) for failures in range(1 << len(ERRORS)))
 
-    # NEW Requirement 4: Must contain at least one special character
-    if not any(not char.isalnum() for char in password):
-        errors.append("password must contain at least one special character")
 
-    is_valid = len(errors) == 0
+def validate_password(password: str) -> MappingProxyType:
+    """
+    Validate the given password according to the specified rules.
 
-    return {"is_valid": is_valid, "errors": errors}
+    The result is one of RESULTS, a read-only mapping with the errors as a
+    tuple, so nothing is allocated for it and callers can't change it.
+    """
+    # One pass over the password classifies every character once
+    digit_count = 0
+    has_capital = False
+    has_special = False
+    for char in password:
+        if char.isdigit():
+            digit_count += 1
+        else:
+            if char.isupper():
+                has_capital = True
+            if not char.isalnum():
+                has_special = True
+
+    return RESULTS[
+        (len(password) < 8)
+        | (digit_count < 2) << 1
+        | (not has_capital) << 2
+        | (not has_special) << 3
+    ]
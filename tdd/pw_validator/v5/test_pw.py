@@ -2,9 +2,10 @@
 Password input field validation testing script
 """
 
+import tracemalloc
 import unittest
 
-from tdd.pw_validator.v5.pw import validate_password
+from tdd.pw_validator.v5.pw import RESULTS, validate_password
 
 
 class TestPasswordValidator(unittest.TestCase):
@@ -200,3 +201,62 @@ class TestPasswordValidator(unittest.TestCase):
         self.assertIn(
             "password must contain at least one special character", result["errors"]
         )
+
+    # Single pass classification
+    def test_non_ascii_digits_count_as_numbers(self):
+        """Test that digits from other scripts count, as str.isdigit says"""
+        result = validate_password("Password\u0661\u0662!")
+        self.assertTrue(result["is_valid"])
+
+    def test_capital_that_is_also_special(self):
+        """Test a character that is both uppercase and not alphanumeric"""
+        result = validate_password("password12\u24b6")  # Circled capital A
+        self.assertTrue(result["is_valid"])
+
+    def test_errors_keep_their_order(self):
+        """Test that the errors come in requirement order"""
+        result = validate_password("")
+        self.assertEqual(
+            result["errors"],
+            (
+                "Password must be at least 8 characters",
+                "The password must contain at least 2 numbers",
+                "password must contain at least one capital letter",
+                "password must contain at least one special character",
+            ),
+        )
+
+
+class TestSharedResults(unittest.TestCase):
+    """Results are shared, read-only and cost no allocation"""
+
+    PASSWORDS = ["StrongPass12!", "short", "", "nocapital12!", "CaféCrème12!"]
+
+    def test_one_result_per_combination_of_errors(self):
+        """Test that passwords failing the same way share the result"""
+        self.assertIs(validate_password("short"), validate_password("tiny"))
+        self.assertIs(validate_password("StrongPass12!"), RESULTS[0])
+        self.assertEqual(len({id(result) for result in RESULTS}), 16)
+
+    def test_results_are_read_only(self):
+        """Test that a caller can't change the shared results"""
+        result = validate_password("short")
+        with self.assertRaises(TypeError):
+            result["is_valid"] = True  # type: ignore[index]
+        self.assertIsInstance(result["errors"], tuple)
+
+    def test_no_allocation_per_call(self):
+        """Test with tracemalloc that keeping 5000 results costs no memory"""
+        passwords = self.PASSWORDS * 1000
+        results = [None] * len(passwords)
+        for password in self.PASSWORDS:
+            validate_password(password)  # Nothing left to set up lazily
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            results[:] = map(validate_password, passwords)
+            allocated = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(allocated, 0)
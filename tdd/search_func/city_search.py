@@ -3,16 +3,62 @@ City Search Functionality Module
 
 This module provides a search function to find cities from a database file
 based on various search criteria.
+
+The file is only read on the first search (or the first use of CITIES),
+not on import. After that, a search at least RELOAD_CHECK_INTERVAL
+seconds after the last check looks at the file again, and if it changed
+the new cities and their index replace the old ones in one go.
 """
 
 import os
-from typing import List
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import cached_property
+from itertools import islice, repeat
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 # Get the directory where this module is located
 MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 # File path for the cities database - now using absolute path
 CITIES_FILE = os.path.join(MODULE_DIR, "cities.txt")
 
+# How many distinct search texts keep their results around
+SEARCH_CACHE_SIZE = 1024
+
+# Seconds between two checks of the cities file for changes
+RELOAD_CHECK_INTERVAL = 1.0
+
+# Orders of the results of search_city: the order of the city list, or the
+# cities starting with the search text first, then the ones with a word
+# starting with it, then the rest
+RANK_LIST = "list"
+RANK_PREFIX_FIRST = "prefix-first"
+RANKS = (RANK_LIST, RANK_PREFIX_FIRST)
+
+# Most typos fuzzy_search_city forgives, in edits of one character
+FUZZY_MAX_DISTANCE = 2
+
+# Characters at the start of every name that the deletions are taken from
+FUZZY_PREFIX_LENGTH = 7
+
+# Keep the cities in CompactCities instead of lists of str and an index:
+# a fraction of the memory for large gazetteers, but every search scans
+# all the names
+COMPACT_CITIES = False
+
 
 def load_cities() -> List[str]:
     """
@@ -33,24 +79,783 @@ def load_cities() -> List[str]:
     return cities
 
 
-# Load cities when module is imported
-try:
-    CITIES = load_cities()
-except FileNotFoundError:
-    # Fallback to empty list if file doesn't exist
-    CITIES = []
+def strip_accents(text: str) -> str:
+    """
+    Remove the accents and other combining marks from text.
+
+    Characters are decomposed first (NFKD), so "ã" becomes "a" and the
+    ligature "ﬁ" becomes "fi". The result of a piece of a text is always a
+    piece of the result of the whole text.
+
+    Returns:
+        The text without combining marks
+    """
+    if text.isascii():
+        return text  # Nothing to decompose
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+
+
+def _grams(text: str, size: int):
+    """
+    Returns:
+        set: Every substring of text that is size characters long
+    """
+    return {text[start : start + size] for start in range(len(text) - size + 1)}
+
+
+def _match_rank(name: str, search: str, start: int) -> int:
+    """
+    Rank a name that contains search, first found at start.
+
+    Returns:
+        0 if the name starts with search, 1 if a word of the name does,
+        2 otherwise
+    """
+    if not start:
+        return 0
+    while start > 0:
+        if not name[start - 1].isalnum():
+            return 1
+        start = name.find(search, start + 1)
+    return 2
+
+
+def _top_ranked(candidates: Iterable[int], names, search: str, limit: int):
+    """
+    Pick the limit best of the candidate positions whose name contains
+    search, by _match_rank, in the order of the candidates within a rank.
+
+    At most limit positions of every rank are kept, and the candidates stop
+    being looked at as soon as limit names starting with search are found,
+    since nothing further down can beat them.
+
+    Returns:
+        list: The positions picked, best first
+    """
+    ranks: Tuple[List[int], ...] = ([], [], [])
+    starting = ranks[0]
+    if limit:
+        for position in candidates:
+            name = names[position]
+            start = name.find(search)
+            if start < 0:
+                continue
+            found = ranks[_match_rank(name, search, start)]
+            if len(found) < limit:
+                found.append(position)
+                if len(starting) == limit:
+                    break
+    return (starting + ranks[1] + ranks[2])[:limit]
+
+
+def _deletes(text: str, count: int):
+    """
+    Returns:
+        set: Every string left after deleting up to count characters of text
+    """
+    found = frontier = {text}
+    for _ in range(count):
+        frontier = {
+            word[:start] + word[start + 1 :]
+            for word in frontier
+            for start in range(len(word))
+        }
+        found = found | frontier
+    return found
+
+
+def _edit_distance(first: str, second: str, limit: int) -> int:
+    """
+    Returns:
+        The Levenshtein distance of the strings, limit + 1 if it's more
+    """
+    if first == second:
+        return 0
+    if limit <= 0 or abs(len(first) - len(second)) > limit:
+        return limit + 1
+    start, end = 0, min(len(first), len(second))
+    while start < end and first[start] == second[start]:
+        start += 1  # Equal characters never cost an edit, skip them
+    first, second = first[start:], second[start:]
+    if not first or not second:
+        return len(first) + len(second)
+    # Replace, delete or insert the first character, whatever costs least
+    best = limit + 1
+    for rest_first, rest_second in (
+        (first[1:], second[1:]),
+        (first[1:], second),
+        (first, second[1:]),
+    ):
+        best = min(best, 1 + _edit_distance(rest_first, rest_second, best - 2))
+    return best
+
+
+class FuzzyIndex:
+    """
+    SymSpell deletion dictionary of names, for searches that forgive typos.
+
+    Every string left after deleting up to max_distance characters of the
+    first prefix_length characters of a name points to that prefix, and
+    every prefix to the names starting with it, by length. The prefixes of
+    two names within max_distance edits of each other always share such a
+    string, so a search only measures its edit distance to the names it
+    finds through the deletions of its own prefix, and only to those within
+    max_distance characters of its length, not to every name.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        max_distance: int = FUZZY_MAX_DISTANCE,
+        prefix_length: int = FUZZY_PREFIX_LENGTH,
+    ):
+        self.names = names
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        prefixes: Dict[str, Dict[int, List[int]]] = {}
+        for position, name in enumerate(names):
+            lengths = prefixes.setdefault(name[:prefix_length], {})
+            lengths.setdefault(len(name), []).append(position)
+        # Names sharing a prefix share its deletions too, found only once
+        self.deletes: Dict[str, List[str]] = {}
+        for prefix in prefixes:
+            for deleted in _deletes(prefix, max_distance):
+                self.deletes.setdefault(deleted, []).append(prefix)
+        self.prefixes = {
+            prefix: {length: array("I", found) for length, found in lengths.items()}
+            for prefix, lengths in prefixes.items()
+        }
+
+    def matches(
+        self, search: str, max_distance: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Find the names within max_distance edits (insertions, deletions or
+        replacements of a character) of search, the index's own maximum if
+        None.
+
+        Returns:
+            A list of (distance, position) of the names, closest first and
+            in the order of the list within a distance
+
+        Raises:
+            ValueError: If max_distance is negative or above the index's
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if not 0 <= max_distance <= self.max_distance:
+            raise ValueError(
+                f"max_distance must be between 0 and {self.max_distance},"
+                f" got {max_distance}"
+            )
+        prefixes = {
+            prefix
+            for deleted in _deletes(search[: self.prefix_length], max_distance)
+            for prefix in self.deletes.get(deleted, ())
+        }
+        lengths = range(len(search) - max_distance, len(search) + max_distance + 1)
+        found = []
+        for prefix in prefixes:
+            by_length = self.prefixes[prefix]
+            for length in lengths:
+                for position in by_length.get(length, ()):
+                    distance = _edit_distance(
+                        search, self.names[position], max_distance
+                    )
+                    if distance <= max_distance:
+                        found.append((distance, position))
+        found.sort()
+        return found
+
+
+class CityIndex:
+    """
+    Bigram and trigram index of city names, for substring searches.
+
+    Every city is casefolded, and casefolded without accents, once when the
+    index is built. The bigrams and trigrams come from the forms without
+    accents: a text found in a casefolded name is found in that name without
+    accents too, so the same index serves accent sensitive searches. A
+    search only checks the cities that contain the rarest bigram or trigram
+    of the search text, in the order of the city list.
+    """
+
+    def __init__(self, cities: List[str]):
+        self.cities = tuple(cities)  # Positions stay valid if the list changes
+        self.folded = [city.casefold() for city in cities]
+        # Names without accents share the folded string, no extra memory
+        self.stripped = list(map(strip_accents, self.folded))
+        grams: Dict[str, List[int]] = {}
+        for position, city in enumerate(self.stripped):
+            for gram in _grams(city, 2) | _grams(city, 3):
+                grams.setdefault(gram, []).append(position)
+        # Positions go up, so candidates come out in the order of the list
+        self.grams = {gram: array("I", found) for gram, found in grams.items()}
+
+    @cached_property
+    def fuzzy(self) -> FuzzyIndex:
+        """
+        The deletion dictionary of the names without accents, built on the
+        first fuzzy search so that plain searches don't pay for it.
+        """
+        return FuzzyIndex(self.stripped)
+
+    def _candidates(self, search_folded: str, candidates, accent_insensitive):
+        """
+        Pick what to check for search_folded: the cities with its rarest
+        bigram or trigram, or the given candidate positions if there are
+        fewer.
+
+        Returns:
+            tuple: (positions to check, text to look for, names to look in)
+        """
+        search_stripped = strip_accents(search_folded)
+        if len(search_stripped) < 2:
+            rarest = range(len(self.cities))  # Single characters aren't indexed
+        else:
+            rarest = min(
+                map(
+                    self.grams.get,
+                    _grams(search_stripped, min(len(search_stripped), 3)),
+                    repeat(()),
+                ),
+                key=len,
+            )
+        if candidates is not None and len(candidates) < len(rarest):
+            rarest = candidates
+        if accent_insensitive:
+            return rarest, search_stripped, self.stripped
+        return rarest, search_folded, self.folded
+
+    def positions(
+        self,
+        search_folded: str,
+        candidates=None,
+        accent_insensitive=False,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Find where the cities whose casefolded name contains search_folded are.
+
+        With accent_insensitive, the accents of both the names and
+        search_folded are ignored. Only the cities with the rarest bigram or
+        trigram of search_folded are checked, or the given candidate
+        positions if there are fewer. With a limit, the search stops at the
+        first limit cities found.
+
+        Returns:
+            A list of positions in the city list, in increasing order
+        """
+        rarest, search, names = self._candidates(
+            search_folded, candidates, accent_insensitive
+        )
+        if limit is None:
+            return [position for position in rarest if search in names[position]]
+        found = (position for position in rarest if search in names[position])
+        return list(islice(found, limit))
+
+    def ranked(
+        self,
+        search_folded: str,
+        limit: Optional[int] = None,
+        candidates=None,
+        accent_insensitive=False,
+    ) -> List[int]:
+        """
+        Find the limit best cities whose casefolded name contains
+        search_folded: the ones starting with it, then the ones with a word
+        starting with it, then the rest, in the order of the city list
+        within each rank.
+
+        The search stops as soon as limit cities starting with
+        search_folded are found, see _top_ranked.
+
+        Returns:
+            A list of positions in the city list
+        """
+        rarest, search, names = self._candidates(
+            search_folded, candidates, accent_insensitive
+        )
+        if limit is None:
+            limit = len(rarest)
+        return _top_ranked(rarest, names, search, limit)
+
+    def find(
+        self,
+        search_folded: str,
+        accent_insensitive=False,
+        limit: Optional[int] = None,
+        rank: str = RANK_LIST,
+    ) -> List[str]:
+        """
+        Find the cities whose casefolded name contains search_folded.
+
+        Returns:
+            A list of at most limit city names, in the order of rank
+        """
+        if rank == RANK_PREFIX_FIRST:
+            positions = self.ranked(search_folded, limit, None, accent_insensitive)
+        else:
+            positions = self.positions(search_folded, None, accent_insensitive, limit)
+        return list(map(self.cities.__getitem__, positions))
+
+
+class SearchCacheInfo(NamedTuple):
+    """Counters of the search results cache, see search_cache_info"""
+
+    hits: int
+    # Searches answered by filtering the results of a cached prefix
+    filtered: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the searches that didn't need the index, 0.0 before any."""
+        searches = self.hits + self.filtered + self.misses
+        return (self.hits + self.filtered) / searches if searches else 0.0
+
+
+class CachedSearch:
+    """
+    CityIndex behind an LRU cache of results.
+
+    The results are kept as tuples of positions in the city list. A search
+    text that isn't cached but starts with one that is can only match the
+    cities its prefix matched, so those are the only ones it checks if
+    they are fewer than what the index would check.
+
+    Threads can share it: the cache and its counters are only looked at
+    and changed under lock, the searches of the index run outside it.
+    """
+
+    def __init__(self, cities: List[str], maxsize: int = SEARCH_CACHE_SIZE):
+        self.index = CityIndex(cities)
+        self.maxsize = maxsize
+        # (accent_insensitive, search_folded) -> positions of the cities
+        self.results: "OrderedDict[Tuple[bool, str], Tuple[int, ...]]" = OrderedDict()
+        self.hits = self.filtered = self.misses = 0
+        self.lock = threading.Lock()  # Held around every use of results
+
+    def clear(self):
+        """Forget every result and reset the counters."""
+        with self.lock:
+            self.results.clear()
+            self.hits = self.filtered = self.misses = 0
+
+    def info(self) -> SearchCacheInfo:
+        """
+        Returns:
+            SearchCacheInfo: The counters and sizes of the cache
+        """
+        with self.lock:
+            return SearchCacheInfo(
+                self.hits, self.filtered, self.misses, self.maxsize, len(self.results)
+            )
+
+    def _cached(self, key: Tuple[bool, str]) -> Optional[Tuple[int, ...]]:
+        """
+        Look key up and make it the most recently used, with the lock held.
+
+        Returns:
+            The cached results of key, or None
+        """
+        results = self.results.get(key)
+        if results is not None:
+            self.results.move_to_end(key)
+        return results
+
+    def _cached_prefix(
+        self, search_folded: str, accent_insensitive: bool
+    ) -> Optional[Tuple[int, ...]]:
+        """
+        Look up the prefixes of search_folded, with the lock held.
+
+        Returns:
+            The results of the longest cached prefix of search_folded, or None
+        """
+        for end in range(len(search_folded) - 1, 1, -1):
+            results = self._cached((accent_insensitive, search_folded[:end]))
+            if results is not None:
+                return results
+        return None
+
+    def _candidates(
+        self, search_folded: str, accent_insensitive: bool
+    ) -> Tuple[bool, Optional[Tuple[int, ...]]]:
+        """
+        Look up search_folded, then its prefixes, and count what was found.
+
+        Returns:
+            tuple: (True if search_folded itself was cached, the cached
+                   results found or None)
+        """
+        with self.lock:
+            results = self._cached((accent_insensitive, search_folded))
+            if results is not None:
+                self.hits += 1
+                return True, results
+            results = self._cached_prefix(search_folded, accent_insensitive)
+            if results is None:
+                self.misses += 1
+            else:
+                self.filtered += 1
+            return False, results
+
+    def _positions(
+        self, search_folded: str, accent_insensitive: bool
+    ) -> Tuple[int, ...]:
+        """
+        Returns:
+            The cached positions of the matching cities, found if need be
+        """
+        cached, results = self._candidates(search_folded, accent_insensitive)
+        if cached:
+            return results
+
+        results = tuple(
+            self.index.positions(search_folded, results, accent_insensitive)
+        )
+        if self.maxsize > 0:
+            with self.lock:
+                self.results[(accent_insensitive, search_folded)] = results
+                if len(self.results) > self.maxsize:
+                    self.results.popitem(last=False)
+        return results
+
+    def _limited(
+        self, search_folded: str, accent_insensitive: bool, limit: int, rank: str
+    ) -> List[int]:
+        """
+        Find the limit best matches, starting from the cached results of
+        search_folded or of its longest cached prefix. The results of a
+        limited search are incomplete, so they aren't cached.
 
+        Returns:
+            The positions of the matching cities, in the order of rank
+        """
+        cached, candidates = self._candidates(search_folded, accent_insensitive)
+        if cached and rank == RANK_LIST:
+            return list(candidates[:limit])
+        if rank == RANK_PREFIX_FIRST:
+            return self.index.ranked(
+                search_folded, limit, candidates, accent_insensitive
+            )
+        return self.index.positions(
+            search_folded, candidates, accent_insensitive, limit
+        )
 
-def search_city(search_text: str) -> List[str]:
+    def find(
+        self,
+        search_folded: str,
+        accent_insensitive=False,
+        limit: Optional[int] = None,
+        rank: str = RANK_LIST,
+    ) -> List[str]:
+        """
+        Find the cities whose casefolded name contains search_folded.
+
+        Returns:
+            A new list of at most limit city names, in the order of rank
+        """
+        if limit is not None:
+            positions = self._limited(search_folded, accent_insensitive, limit, rank)
+        else:
+            positions = self._positions(search_folded, accent_insensitive)
+            if rank == RANK_PREFIX_FIRST:
+                positions = self.index.ranked(
+                    search_folded, None, positions, accent_insensitive
+                )
+        return list(map(self.index.cities.__getitem__, positions))
+
+    @property
+    def fuzzy(self) -> FuzzyIndex:
+        """The deletion dictionary of the index, see CityIndex.fuzzy"""
+        return self.index.fuzzy
+
+
+class CompactStrings(Sequence[str]):
+    """
+    Read-only sequence of strings kept as one UTF-8 blob.
+
+    A list of str costs a pointer and a whole str object, some 50 to 80
+    bytes on top of the characters, per string. Here every string costs
+    its UTF-8 bytes, a separator and a 4 byte offset, and is decoded again
+    when it's read.
+    """
+
+    def __init__(self, strings: Iterable[str]):
+        blob = bytearray()
+        starts = array("I")
+        for string in strings:
+            starts.append(len(blob))
+            blob += string.encode("utf-8")
+            blob += b"\n"
+        # One more, so that every string ends one byte before the next start
+        starts.append(len(blob))
+        self.blob = bytes(blob)
+        self.offsets = starts
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactStrings index out of range")
+        return self.blob[self.offsets[index] : self.offsets[index + 1] - 1].decode(
+            "utf-8"
+        )
+
+    def positions(self, text: str):
+        """
+        Find the strings that contain text, with bytes.find over the blob.
+
+        Yields:
+            int: The positions of the strings, in increasing order
+        """
+        if not text:
+            yield from range(len(self))
+            return
+        needle = text.encode("utf-8")
+        blob, offsets = self.blob, self.offsets
+        start = blob.find(needle)
+        while start >= 0:
+            position = bisect_right(offsets, start) - 1
+            end = offsets[position + 1] - 1
+            if start + len(needle) <= end:
+                yield position
+                start = blob.find(needle, end + 1)  # The next string
+            else:  # Runs into the next string
+                start = blob.find(needle, start + 1)
+
+
+class CompactCities:
+    """
+    The cities as CompactStrings, searched like CachedSearch without an
+    index or a results cache, see COMPACT_CITIES.
+
+    The casefolded names are kept in a second blob, searched straight with
+    bytes.find, and the names without accents in a third one only if they
+    differ from the casefolded ones.
+    """
+
+    def __init__(self, cities: Iterable[str]):
+        self.cities = CompactStrings(cities)
+        self.folded = CompactStrings(city.casefold() for city in self.cities)
+        self.stripped = self.folded
+        if not self.folded.blob.isascii():
+            stripped = CompactStrings(map(strip_accents, self.folded))
+            if stripped.blob != self.folded.blob:
+                self.stripped = stripped
+
+    def clear(self):
+        """Nothing is cached, nothing to forget."""
+
+    def info(self) -> SearchCacheInfo:
+        """
+        Returns:
+            SearchCacheInfo: All zeros, there is no cache
+        """
+        return SearchCacheInfo(0, 0, 0, 0, 0)
+
+    def find(
+        self,
+        search_folded: str,
+        accent_insensitive=False,
+        limit: Optional[int] = None,
+        rank: str = RANK_LIST,
+    ) -> List[str]:
+        """
+        Find the cities whose casefolded name contains search_folded.
+
+        Returns:
+            A new list of at most limit city names, in the order of rank
+        """
+        names = self.folded
+        if accent_insensitive:
+            search_folded, names = strip_accents(search_folded), self.stripped
+        found = names.positions(search_folded)
+        if rank == RANK_PREFIX_FIRST:
+            if limit is None:
+                limit = len(names)
+            positions = _top_ranked(found, names, search_folded, limit)
+        else:
+            positions = list(islice(found, limit))
+        return list(map(self.cities.__getitem__, positions))
+
+    @cached_property
+    def fuzzy(self) -> FuzzyIndex:
+        """
+        The deletion dictionary of the names without accents, built on the
+        first fuzzy search.
+        """
+        return FuzzyIndex(self.stripped)
+
+
+def _file_version() -> Optional[Tuple[int, int]]:
+    """
+    Returns:
+        The modification time and size of the cities file, None if missing
+    """
+    try:
+        stat = os.stat(CITIES_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _CityDatabase(NamedTuple):
+    """The cities and their search, replaced as a whole on reload"""
+
+    cities: Sequence[str]
+    search: Union[CachedSearch, CompactCities]
+    # What _file_version said before the cities were read
+    version: Optional[Tuple[int, int]]
+
+
+def _new_database(cities: List[str], version) -> _CityDatabase:
+    """
+    Returns:
+        The cities and their search, compact if COMPACT_CITIES says so
+    """
+    if COMPACT_CITIES:
+        search = CompactCities(cities)
+        return _CityDatabase(search.cities, search, version)
+    return _CityDatabase(cities, CachedSearch(cities), version)
+
+
+class _Loader:
+    """Loads the cities on first use and again when the file changes"""
+
+    def __init__(self):
+        self.database: Optional[_CityDatabase] = None
+        self.checked_at = -RELOAD_CHECK_INTERVAL
+        self.lock = threading.Lock()  # One thread reads the file at a time
+
+    def load(self) -> _CityDatabase:
+        """
+        Read the file and swap in the new cities and index.
+
+        Raises:
+            FileNotFoundError: If cities.txt file doesn't exist
+        """
+        version = _file_version()
+        database = _new_database(load_cities(), version)
+        # Searches that already got the old database finish with it
+        self.database = database
+        return database
+
+    def _check(self) -> _CityDatabase:
+        """Load the file if it changed since it was last read."""
+        with self.lock:
+            self.checked_at = time.monotonic()
+            database = self.database
+            if database is not None and database.version == _file_version():
+                return database
+            try:
+                return self.load()
+            except FileNotFoundError:
+                # Fallback to empty list if file doesn't exist
+                database = _new_database([], None)
+                self.database = database
+                return database
+
+    def get(self) -> _CityDatabase:
+        """
+        Returns:
+            The current cities and their search, checked for changes if due
+        """
+        database = self.database
+        if (
+            database is None
+            or time.monotonic() - self.checked_at >= RELOAD_CHECK_INTERVAL
+        ):
+            database = self._check()
+        return database
+
+
+_LOADER = _Loader()
+
+# Not assigned here: __getattr__ serves the current cities, loading them first
+CITIES: Sequence[str]
+
+
+def __getattr__(name):
+    """Load CITIES on first use, and serve the current ones after a reload."""
+    if name == "CITIES":
+        return _LOADER.get().cities
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def reload_cities() -> Sequence[str]:
+    """
+    Read the cities file again and search the new cities from now on.
+
+    The new cities get a new index and an empty results cache. A list of
+    CITIES taken before keeps the old cities.
+
+    Returns:
+        The new city names, a list or CompactStrings with COMPACT_CITIES
+
+    Raises:
+        FileNotFoundError: If cities.txt file doesn't exist
+    """
+    with _LOADER.lock:
+        return _LOADER.load().cities
+
+
+def search_cache_info() -> SearchCacheInfo:
+    """
+    Report how well the search results cache is doing.
+
+    The counters start again from zero whenever the cities are reloaded.
+
+    Returns:
+        SearchCacheInfo: hits, filtered, misses, maxsize, currsize and
+        hit_rate of the cache
+    """
+    return _LOADER.get().search.info()
+
+
+def clear_search_cache():
+    """
+    Drop every cached search result and reset the counters.
+    """
+    _LOADER.get().search.clear()
+
+
+def search_city(
+    search_text: str,
+    accent_insensitive: bool = False,
+    limit: Optional[int] = None,
+    rank: str = RANK_LIST,
+) -> List[str]:
     """
     Search for cities matching the given search text.
 
     Args:
         search_text: The text to search for in city names
+        accent_insensitive: Ignore accents, so "sao" finds "São Paulo"
+        limit: Return at most this many cities, the search stops early
+        rank: RANK_LIST keeps the order of the city list, RANK_PREFIX_FIRST
+            puts the cities starting with the search text first, then the
+            ones with a word starting with it, then the rest
 
     Returns:
         A list of city names that match the search criteria
 
+    Raises:
+        ValueError: If limit is negative or rank isn't one of RANKS
+
     Rules:
         1. If search text has fewer than 2 characters, return empty list
         2. If search text has 2+ characters, return cities containing the text
@@ -58,18 +863,60 @@ def search_city(search_text: str) -> List[str]:
         4. Search text can match any part of the city name
         5. If search text is "*", return all cities
     """
+    if limit is not None and limit < 0:
+        raise ValueError(f"limit must not be negative, got {limit}")
+    if rank not in RANKS:
+        raise ValueError(f"Unknown rank {rank!r}, expected one of {RANKS}")
+
+    database = _LOADER.get()
+
     # Rule 5: Return all cities if search text is "*"
     if search_text == "*":
-        return CITIES.copy()
+        return database.cities[:limit]
 
     # Rule 1: Return empty list if search text is fewer than 2 characters
     if len(search_text) < 2:
         return []
 
     # Rule 3: Case-insensitive search
-    search_lower = search_text.lower()
+    search_folded = search_text.casefold()
 
     # Rule 2 & 4: Find cities that contain the search text
-    results = [city for city in CITIES if search_lower in city.lower()]
+    results = database.search.find(search_folded, accent_insensitive, limit, rank)
 
     return results
+
+
+def fuzzy_search_city(
+    search_text: str, max_distance: int = FUZZY_MAX_DISTANCE
+) -> List[str]:
+    """
+    Search for the cities whose name is at most max_distance typos away
+    from the given search text.
+
+    A typo is a character inserted, deleted or replaced. Case and accents
+    are ignored, so "zurich" finds "Zürich", and "Amsterdm" "Amsterdam".
+
+    Args:
+        search_text: The whole city name, possibly misspelled
+        max_distance: Typos forgiven, from 0 to FUZZY_MAX_DISTANCE
+
+    Returns:
+        A list of city names, the closest first, in the order of the city
+        list within a distance; empty for fewer than 2 characters
+
+    Raises:
+        ValueError: If max_distance is negative or above FUZZY_MAX_DISTANCE
+    """
+    if not 0 <= max_distance <= FUZZY_MAX_DISTANCE:
+        raise ValueError(
+            f"max_distance must be between 0 and {FUZZY_MAX_DISTANCE},"
+            f" got {max_distance}"
+        )
+    if len(search_text) < 2:
+        return []
+    database = _LOADER.get()
+    matches = database.search.fuzzy.matches(
+        strip_accents(search_text.casefold()), max_distance
+    )
+    return [database.cities[position] for _, position in matches]
@@ -5,9 +5,54 @@ This module contains parameterized tests to thoroughly validate the city search
 function against all requirements using a data-driven testing approach.
 """
 
+import os
+import random
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
-from tdd.search_func.city_search import CITIES, search_city
+from tdd.search_func import city_search
+from tdd.search_func.city_search import (
+    CITIES,
+    FUZZY_MAX_DISTANCE,
+    RANK_PREFIX_FIRST,
+    RANKS,
+    CachedSearch,
+    CityIndex,
+    CompactCities,
+    CompactStrings,
+    FuzzyIndex,
+    clear_search_cache,
+    fuzzy_search_city,
+    reload_cities,
+    search_cache_info,
+    search_city,
+    strip_accents,
+)
+
+
+@pytest.fixture
+def cities_file(tmp_path, monkeypatch):
+    """
+    Search a cities file of the test's own instead of the usual one.
+
+    Returns:
+        function: write(content) puts content in the file, reloads the
+                  cities from it and returns the path of the file
+    """
+    path = tmp_path / "cities.txt"
+
+    def write(content):
+        path.write_text(content, encoding="utf-8")
+        monkeypatch.setattr(city_search, "CITIES_FILE", str(path))
+        reload_cities()
+        return path
+
+    yield write
+    monkeypatch.undo()
+    reload_cities()
 
 
 class TestCitySearchDataDriven:
@@ -217,6 +262,479 @@ class TestCitySearchIntegration:
         assert len(search_city("*")) == len(CITIES)
 
 
+class TestCityIndex:
+    """The n-gram index finds what the linear scan found, in the same order"""
+
+    NAMES = [
+        "Amsterdam",
+        "Rotterdam",
+        "Damascus",
+        "New York City",
+        "İstanbul",
+        "ADAMSTOWN",
+        "Ad",
+        "São Paulo",
+        "Straße",
+    ]
+
+    @pytest.mark.parametrize(
+        "search_text",
+        ["am", "dam", "AMS", "Damascus", "k c", "İs", "ad", "zz", "Ad", "SS", "ão"],
+    )
+    def test_same_results_as_linear_scan(self, search_text):
+        """Order and content match casefolding and scanning every name"""
+        search_folded = search_text.casefold()
+        expected = [name for name in self.NAMES if search_folded in name.casefold()]
+        assert CityIndex(self.NAMES).find(search_folded) == expected
+
+    def test_index_of_loaded_cities(self):
+        """Every search of the module goes through the index of CITIES"""
+        for city in CITIES:
+            expected = [
+                other for other in CITIES if city.casefold() in other.casefold()
+            ]
+            assert search_city(city) == expected
+
+    def test_random_names_in_both_modes(self):
+        """Accents, ligatures and combining marks against a plain scan"""
+        rnd = random.Random(20)
+        alphabet = "aAãÃeé\u0301ßsSﬁfiİ "
+        names = [
+            "".join(rnd.choices(alphabet, k=rnd.randint(1, 8))) for _ in range(300)
+        ]
+        index = CityIndex(names)
+        for _ in range(300):
+            search_folded = "".join(
+                rnd.choices(alphabet, k=rnd.randint(1, 4))
+            ).casefold()
+            stripped = strip_accents(search_folded)
+            assert index.find(search_folded) == [
+                name for name in names if search_folded in name.casefold()
+            ]
+            assert index.find(search_folded, accent_insensitive=True) == [
+                name for name in names if stripped in strip_accents(name.casefold())
+            ]
+
+    def test_empty_index(self):
+        """No cities, no results"""
+        assert not CityIndex([]).find("am")
+
+
+class TestSearchCache:
+    """Repeated and extended searches are served from the results cache"""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        """Every test starts with an empty cache and zeroed counters"""
+        clear_search_cache()
+        yield
+        clear_search_cache()
+
+    def test_repeated_search_is_a_hit(self):
+        """The same search, in any case, is looked up once"""
+        first = search_city("am")
+        assert search_city("AM") == first
+        info = search_cache_info()
+        assert (info.hits, info.filtered, info.misses) == (1, 0, 1)
+        assert info.currsize == 1
+        assert info.hit_rate == 0.5
+
+    def test_extended_search_filters_cached_prefix(self):
+        """Typing more letters filters the results of the shorter search"""
+        search_city("Ro")
+        assert search_city("Rot") == ["Rotterdam"]
+        assert search_city("Rome") == ["Rome"]
+        assert search_cache_info().filtered == 2
+        clear_search_cache()
+        assert search_city("Rot") == ["Rotterdam"]
+        assert search_cache_info().misses == 1
+
+    def test_returned_list_is_a_copy(self):
+        """Changing the results doesn't change what the cache holds"""
+        search_city("Pa").append("Atlantis")
+        assert search_city("Pa") == ["Paris"]
+
+    def test_least_recently_used_is_evicted(self):
+        """A full cache drops the search that was used the longest ago"""
+        cache = CachedSearch(CITIES, maxsize=2)
+        cache.find("pa")
+        cache.find("ro")
+        cache.find("pa")
+        cache.find("va")
+        assert list(cache.results) == [(False, "pa"), (False, "va")]
+
+    def test_shared_between_threads(self):
+        """Threads evicting each other's results never see a missing key"""
+        cache = CachedSearch(CITIES, maxsize=4)
+        searches = ["pa", "par", "ro", "rot", "va", "am", "ams", "ba"]
+        expected = {text: cache.find(text) for text in searches}
+        cache.clear()
+
+        def search(offset):
+            for i in range(5000):
+                text = searches[(i + offset) % len(searches)]
+                assert cache.find(text, limit=None if i % 2 else 3) == (
+                    expected[text] if i % 2 else expected[text][:3]
+                )
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                for future in [executor.submit(search, n) for n in range(8)]:
+                    future.result()
+        finally:
+            sys.setswitchinterval(interval)
+        info = cache.info()
+        assert info.hits + info.filtered + info.misses == 8 * 5000
+        assert info.currsize <= 4
+
+    def test_no_info_before_any_search(self):
+        """The hit rate of an unused cache is zero"""
+        assert search_cache_info().hit_rate == 0.0
+
+    def test_reload_drops_cached_results(self, cities_file):
+        """Cities read again from the file are searched right away"""
+        assert search_city("Par") == ["Paris"]
+        cities_file("Paris\nParma\n")
+        assert city_search.CITIES == ["Paris", "Parma"]
+        assert search_city("Par") == ["Paris", "Parma"]
+        assert search_cache_info().currsize == 1
+
+
+class TestAccentInsensitiveSearch:
+    """Accents are ignored only when asked for"""
+
+    @pytest.fixture(autouse=True)
+    def accented_cities(self, cities_file):
+        """Cities with accents, searched instead of the usual ones"""
+        cities_file("São Paulo\nZürich\nStraße\nParis\n")
+
+    def test_strip_accents(self):
+        """Decomposed characters lose their marks, ASCII stays the same"""
+        assert strip_accents("são paulo") == "sao paulo"
+        assert strip_accents("ﬁnal") == "final"
+        assert strip_accents("Zürich") == "Zurich"
+        assert strip_accents("plain") == "plain"
+
+    def test_accents_matter_by_default(self):
+        """Without the option "sao" isn't "São" """
+        assert not search_city("sao")
+        assert search_city("SÃO") == ["São Paulo"]
+
+    def test_accent_insensitive_search(self):
+        """With the option both spellings find the city"""
+        assert search_city("sao", accent_insensitive=True) == ["São Paulo"]
+        assert search_city("São", accent_insensitive=True) == ["São Paulo"]
+        assert search_city("zur", accent_insensitive=True) == ["Zürich"]
+
+    def test_modes_are_cached_apart(self):
+        """A cached result of one mode isn't served to the other"""
+        assert search_city("sa", accent_insensitive=True) == ["São Paulo"]
+        assert not search_city("sa")
+
+    def test_casefold(self):
+        """Casefolding matches "ss" with "ß" """
+        assert search_city("STRASSE") == ["Straße"]
+
+
+class TestRankedSearch:
+    """The best few matches, prefixes first, without finding them all"""
+
+    @pytest.fixture(autouse=True)
+    def ranked_cities(self, cities_file):
+        """Cities matching "san" in every way, searched instead of the usual ones"""
+        cities_file(
+            "Pisana\nLos Santos\nSantiago\nCasanova\nSan José\nSão Paulo\n"
+            "Santa Cruz\nPort-Sancy\nSandy\n"
+        )
+
+    @staticmethod
+    def reference(cities, search_text, limit=None):
+        """Every match sorted by rank, in list order within a rank"""
+        search = search_text.casefold()
+
+        def rank(city):
+            name = city.casefold()
+            if name.startswith(search):
+                return 0
+            starts = [i for i in range(len(name)) if name.startswith(search, i)]
+            return 1 if any(not name[i - 1].isalnum() for i in starts) else 2
+
+        return sorted((c for c in cities if search in c.casefold()), key=rank)[:limit]
+
+    def test_prefix_first(self):
+        """Prefixes, then word starts, then the rest"""
+        assert search_city("san", rank=RANK_PREFIX_FIRST) == [
+            "Santiago",
+            "San José",
+            "Santa Cruz",
+            "Sandy",
+            "Los Santos",
+            "Port-Sancy",
+            "Pisana",
+            "Casanova",
+        ]
+
+    def test_limit(self):
+        """Only the best ones are returned"""
+        assert search_city("san", limit=5, rank=RANK_PREFIX_FIRST) == [
+            "Santiago",
+            "San José",
+            "Santa Cruz",
+            "Sandy",
+            "Los Santos",
+        ]
+        assert search_city("san", limit=2, rank=RANK_PREFIX_FIRST) == [
+            "Santiago",
+            "San José",
+        ]
+        assert not search_city("san", limit=0, rank=RANK_PREFIX_FIRST)
+
+    def test_limit_keeps_list_order_by_default(self):
+        """Without a rank the first matches of the list are returned"""
+        assert search_city("san", limit=3) == ["Pisana", "Los Santos", "Santiago"]
+        assert search_city("*", limit=2) == ["Pisana", "Los Santos"]
+
+    def test_accent_insensitive(self):
+        """Ranking works on the names without accents too"""
+        assert search_city("sa", True, 3, RANK_PREFIX_FIRST) == [
+            "Santiago",
+            "San José",
+            "São Paulo",
+        ]
+
+    def test_limited_search_uses_but_does_not_fill_cache(self):
+        """A limited search starts from cached results, but isn't cached"""
+        clear_search_cache()
+        search_city("sa", limit=2, rank=RANK_PREFIX_FIRST)
+        assert search_cache_info().currsize == 0
+        search_city("sa")
+        assert search_city("san", limit=2) == ["Pisana", "Los Santos"]
+        assert search_city("sa", limit=1, rank=RANK_PREFIX_FIRST) == ["Santiago"]
+        info = search_cache_info()
+        assert (info.hits, info.filtered, info.misses, info.currsize) == (1, 1, 2, 1)
+
+    @pytest.mark.parametrize("limit, rank", [(-1, RANK_PREFIX_FIRST), (3, "best")])
+    def test_bad_arguments(self, limit, rank):
+        """A negative limit or an unknown rank is refused"""
+        with pytest.raises(ValueError):
+            search_city("san", limit=limit, rank=rank)
+
+    def test_random_matches_reference(self):
+        """Random names and limits give what sorting every match does"""
+        rnd = random.Random(22)
+        cities = ["".join(rnd.choices("ab -", k=rnd.randint(1, 8))) for _ in range(300)]
+        index = CityIndex(cities)
+        cached = CachedSearch(cities, maxsize=4)
+        for _ in range(300):
+            search = "".join(rnd.choices("ab", k=rnd.randint(2, 3)))
+            limit = rnd.choice([None, 0, 1, 3, 10, 100])
+            expected = self.reference(cities, search, limit)
+            assert index.find(search, False, limit, RANK_PREFIX_FIRST) == expected
+            assert cached.find(search, False, limit, RANK_PREFIX_FIRST) == expected
+            assert index.find(search, False, limit) == index.find(search)[:limit]
+
+
+class TestFuzzySearch:
+    """Misspelled city names still find the city"""
+
+    @staticmethod
+    def levenshtein(first, second):
+        """Edit distance the textbook way, against every name"""
+        previous = list(range(len(second) + 1))
+        for row, char in enumerate(first, 1):
+            current = [row]
+            for column, other in enumerate(second, 1):
+                current.append(
+                    min(
+                        previous[column] + 1,
+                        current[column - 1] + 1,
+                        previous[column - 1] + (char != other),
+                    )
+                )
+            previous = current
+        return previous[-1]
+
+    @pytest.mark.parametrize(
+        "search_text, expected",
+        [
+            ("Amsterdam", ["Amsterdam"]),  # No typo
+            ("Amsterdm", ["Amsterdam"]),  # Deleted
+            ("Budapesst", ["Budapest"]),  # Inserted
+            ("Bankok", ["Bangkok"]),
+            ("vena", ["Vienna"]),  # Two typos
+            ("SIDNEY", ["Sydney"]),  # Any case
+            ("new yrok city", ["New York City"]),  # Swapped letters are two
+            ("Amtrdm", []),  # Three typos
+        ],
+    )
+    def test_typos(self, search_text, expected):
+        """Up to two typos are forgiven by default"""
+        assert fuzzy_search_city(search_text) == expected
+
+    def test_max_distance(self):
+        """Fewer typos forgiven when asked"""
+        assert fuzzy_search_city("Amsterdm", max_distance=1) == ["Amsterdam"]
+        assert not fuzzy_search_city("vena", max_distance=1)
+        assert fuzzy_search_city("rome", max_distance=0) == ["Rome"]
+        assert not fuzzy_search_city("Rom", max_distance=0)
+
+    def test_closest_first(self):
+        """Names are ordered by distance, then as in the list"""
+        index = FuzzyIndex(["rone", "rome", "roma", "ram", "rome"])
+        assert index.matches("rome") == [(0, 1), (0, 4), (1, 0), (1, 2), (2, 3)]
+
+    def test_accents_ignored(self, cities_file):
+        """Accents don't count as typos"""
+        cities_file("Zürich\nSão Paulo\n")
+        assert fuzzy_search_city("zurich") == ["Zürich"]
+        assert fuzzy_search_city("Sao Pablo") == ["São Paulo"]
+
+    @pytest.mark.parametrize("search_text", ["", "R"])
+    def test_short_search_text(self, search_text):
+        """Fewer than 2 characters find nothing, like search_city"""
+        assert not fuzzy_search_city(search_text)
+
+    @pytest.mark.parametrize("max_distance", [-1, FUZZY_MAX_DISTANCE + 1])
+    def test_max_distance_out_of_range(self, max_distance):
+        """Only the distances the index was built for can be searched"""
+        with pytest.raises(ValueError):
+            fuzzy_search_city("Rome", max_distance)
+
+    def test_random_matches_every_name(self):
+        """Random names give what measuring every name does"""
+        rnd = random.Random(23)
+        names = ["".join(rnd.choices("abc", k=rnd.randint(0, 9))) for _ in range(400)]
+        # A short prefix, so that most names are longer than it
+        index = FuzzyIndex(names, max_distance=2, prefix_length=3)
+        for _ in range(200):
+            search = "".join(rnd.choices("abc", k=rnd.randint(0, 9)))
+            max_distance = rnd.randint(0, 2)
+            expected = sorted(
+                (distance, position)
+                for position, name in enumerate(names)
+                if (distance := self.levenshtein(search, name)) <= max_distance
+            )
+            assert index.matches(search, max_distance) == expected
+
+
+class TestCompactCities:
+    """Names kept in one UTF-8 blob are searched like the indexed lists"""
+
+    def test_compact_strings_sequence(self):
+        """Reading back, by position, from the end and by slice"""
+        strings = CompactStrings(["Rome", "", "São Paulo", "東京"])
+        assert len(strings) == 4
+        assert list(strings) == ["Rome", "", "São Paulo", "東京"]
+        assert strings[-1] == "東京"
+        assert strings[1:3] == ["", "São Paulo"]
+        assert "São Paulo" in strings
+        with pytest.raises(IndexError):
+            strings[4]  # pylint: disable=pointless-statement
+        assert not CompactStrings([])
+
+    def test_matches_do_not_span_two_names(self):
+        """A text made of the end of a name and the start of the next isn't found"""
+        strings = CompactStrings(["ab", "cd", "abcd", "dab"])
+        assert list(strings.positions("bc")) == [2]
+        assert list(strings.positions("ab")) == [0, 2, 3]
+        assert list(strings.positions("")) == [0, 1, 2, 3]
+        assert not list(strings.positions("b\nc"))
+
+    def test_accents_kept_apart_only_when_needed(self):
+        """Names without accents don't get a blob of their own"""
+        plain = CompactCities(["Rome", "Oslo"])
+        assert plain.stripped is plain.folded
+        accented = CompactCities(["Zürich"])
+        assert list(accented.stripped) == ["zurich"]
+
+    def test_random_matches_city_index(self):
+        """Random names give what the index does, in every mode"""
+        rnd = random.Random(24)
+        cities = [
+            "".join(rnd.choices("aAbé -ß", k=rnd.randint(0, 8))) for _ in range(300)
+        ]
+        index = CityIndex(cities)
+        compact = CompactCities(cities)
+        assert list(compact.cities) == cities
+        for _ in range(300):
+            search = "".join(rnd.choices("abe -ss", k=rnd.randint(1, 3)))
+            limit = rnd.choice([None, 0, 1, 5])
+            rank = rnd.choice(RANKS)
+            accent_insensitive = rnd.random() < 0.5
+            assert compact.find(search, accent_insensitive, limit, rank) == (
+                index.find(search, accent_insensitive, limit, rank)
+            )
+
+    def test_compact_database(self, monkeypatch):
+        """With COMPACT_CITIES the searches run on the blobs"""
+        monkeypatch.setattr(city_search, "COMPACT_CITIES", True)
+        try:
+            reload_cities()
+            assert isinstance(city_search.CITIES, CompactStrings)
+            assert search_city("*") == list(CITIES)
+            assert search_city("am") == ["Rotterdam", "Amsterdam"]
+            assert search_city("on", limit=2, rank=RANK_PREFIX_FIRST) == [
+                "London",
+                "Hong Kong",
+            ]
+            assert fuzzy_search_city("Amsterdm") == ["Amsterdam"]
+            assert search_cache_info().hit_rate == 0.0
+        finally:
+            monkeypatch.undo()
+            reload_cities()
+        assert isinstance(city_search.CITIES, list)
+
+
+class TestCityDatabaseLoading:
+    """The cities are read on first use and again when the file changes"""
+
+    @pytest.fixture
+    def watched_file(self, cities_file, monkeypatch):
+        """A cities file of the test's own, checked on every search"""
+        monkeypatch.setattr(city_search, "RELOAD_CHECK_INTERVAL", 0)
+        return cities_file("Paris\n")
+
+    def test_import_does_not_read_the_file(self):
+        """Nothing is loaded until the first search"""
+        code = (
+            "from tdd.search_func import city_search as c\n"
+            "assert c._LOADER.database is None\n"
+            "assert c.search_city('Pa') == ['Paris']\n"
+            "assert c._LOADER.database is not None\n"
+        )
+        root = os.path.dirname(os.path.dirname(city_search.MODULE_DIR))
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
+
+    def test_changed_file_is_picked_up(self, watched_file):
+        """A search after the file changed sees the new cities"""
+        assert search_city("Par") == ["Paris"]
+        watched_file.write_text("Paris\nParma\n", encoding="utf-8")
+        assert search_city("Par") == ["Paris", "Parma"]
+        assert city_search.CITIES == ["Paris", "Parma"]
+
+    def test_no_check_before_interval(self, watched_file, monkeypatch):
+        """Between two checks the file isn't looked at"""
+        search_city("Par")
+        monkeypatch.setattr(city_search, "RELOAD_CHECK_INTERVAL", 3600)
+        watched_file.write_text("Paris\nParma\n", encoding="utf-8")
+        assert search_city("Par") == ["Paris"]
+
+    def test_missing_file_then_created(self, watched_file):
+        """No file means no cities, until the file shows up"""
+        watched_file.unlink()
+        assert not search_city("*")
+        watched_file.write_text("Rome\n", encoding="utf-8")
+        assert search_city("*") == ["Rome"]
+
+    def test_reload_of_missing_file_raises_error(self, watched_file):
+        """Reloading on purpose reports a missing file"""
+        watched_file.unlink()
+        with pytest.raises(FileNotFoundError):
+            reload_cities()
+
+
 if __name__ == "__main__":
     # Run tests with verbose output
     pytest.main([__file__, "-v", "--tb=short"])
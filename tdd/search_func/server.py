@@ -0,0 +1,299 @@
+"""
+Autocomplete HTTP server around search_city
+
+A small asyncio HTTP/1.1 server for typeahead, using only the standard
+library:
+
+    GET /search?q=<text>[&session=<id>][&accent_insensitive=1]
+
+answers with the matching cities as NDJSON, one {"city": name} object per
+line, streamed in chunks as they are written.
+
+- Identical searches that arrive while one is running share its result
+  instead of searching again.
+- Every search of a session replaces the one before: a search that is
+  still waiting, or still streaming, when a newer one of the same session
+  arrives ends with a {"cancelled": true} line instead of its results.
+- The searches run one at a time in a worker thread, so a big result
+  doesn't stall the other connections.
+
+Run it with:
+
+    python -m tdd.search_func.server --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from tdd.search_func.city_search import search_city
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Cities written to the connection at a time, between checks for staleness
+STREAM_BATCH_SIZE = 256
+
+# Most header lines read from a request before giving up on it
+MAX_HEADERS = 100
+
+_CANCELLED_LINE = b'{"cancelled": true}\n'
+
+
+class _BadRequest(Exception):
+    """A request the server can't answer, with the status to answer with"""
+
+    def __init__(self, status: HTTPStatus):
+        super().__init__(status.phrase)
+        self.status = status
+
+
+class _Lookup:
+    """A search in the worker thread with the requests waiting for it"""
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+
+def _chunk(data: bytes) -> bytes:
+    """Frame data as one chunk of a chunked HTTP body."""
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+def _head(status: HTTPStatus, keep_alive: bool, chunked: bool) -> bytes:
+    """
+    Returns:
+        The status line and headers of a response
+    """
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    if chunked:
+        lines += ["Content-Type: application/x-ndjson", "Transfer-Encoding: chunked"]
+    else:
+        lines.append("Content-Length: 0")
+    lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("ascii")
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """
+    Read the request line and headers of the next request.
+
+    Returns:
+        tuple: (method, target, keep_alive), None at the end of the connection
+
+    Raises:
+        _BadRequest: If the request isn't HTTP/1.x
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError as e:
+        raise _BadRequest(HTTPStatus.BAD_REQUEST) from e
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        raise _BadRequest(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED)
+
+    keep_alive = version == "HTTP/1.1"
+    for _ in range(MAX_HEADERS):
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            return method, target, keep_alive
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "connection":
+            keep_alive = value.strip().lower() == "keep-alive"
+    raise _BadRequest(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+
+def _parse_search(method: str, target: str) -> Tuple[str, bool, str]:
+    """
+    Returns:
+        tuple: (search text, accent_insensitive, session) of a search request
+
+    Raises:
+        _BadRequest: If it isn't a GET of /search with a q parameter
+    """
+    url = urlsplit(target)
+    if url.path != "/search":
+        raise _BadRequest(HTTPStatus.NOT_FOUND)
+    if method != "GET":
+        raise _BadRequest(HTTPStatus.METHOD_NOT_ALLOWED)
+    params = parse_qs(url.query, keep_blank_values=True)
+    if "q" not in params:
+        raise _BadRequest(HTTPStatus.BAD_REQUEST)
+    accent_insensitive = params.get("accent_insensitive", ["0"])[0] in ("1", "true")
+    return params["q"][0], accent_insensitive, params.get("session", [""])[0]
+
+
+class AutocompleteServer:
+    """
+    Serves search over HTTP, sharing identical searches and dropping stale
+    ones. search(text, accent_insensitive) defaults to search_city.
+    """
+
+    def __init__(self, search=search_city):
+        self.search = search
+        # One thread: searches hold the GIL, more wouldn't answer any sooner
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.lookups: Dict[Tuple[str, bool], _Lookup] = {}
+        # The latest search of every session still being answered
+        self.sessions: Dict[str, asyncio.Task] = {}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT) -> asyncio.Server:
+        """
+        Start listening, port 0 picks a free port.
+
+        Returns:
+            The asyncio server
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        """Stop the worker thread once the running search is done."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def results(self, search_text: str, accent_insensitive: bool):
+        """
+        Search, or wait for the same search if it's already running.
+
+        The search is dropped if every request waiting for it gets
+        cancelled before it starts.
+
+        Returns:
+            list: The cities found
+        """
+        key = (search_text, accent_insensitive)
+        lookup = self.lookups.get(key)
+        if lookup is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, self.search, search_text, accent_insensitive
+            )
+            lookup = self.lookups[key] = _Lookup(future)
+            future.add_done_callback(lambda _: self._forget(key, lookup))
+        lookup.waiters += 1
+        try:
+            return await asyncio.shield(lookup.future)
+        finally:
+            lookup.waiters -= 1
+            if not lookup.waiters and not lookup.future.done():
+                lookup.future.cancel()
+                self._forget(key, lookup)
+
+    def _forget(self, key, lookup: _Lookup):
+        """Let the next identical search start over, unless it already did."""
+        if self.lookups.get(key) is lookup:
+            del self.lookups[key]
+
+    async def _stream(self, writer, cities, task: asyncio.Task, session: str):
+        """Write the cities as NDJSON chunks until done or made stale."""
+        for start in range(0, len(cities), STREAM_BATCH_SIZE):
+            if session and self.sessions.get(session) is not task:
+                writer.write(_chunk(_CANCELLED_LINE))
+                break
+            lines = "".join(
+                json.dumps({"city": city}) + "\n"
+                for city in cities[start : start + STREAM_BATCH_SIZE]
+            )
+            writer.write(_chunk(lines.encode("utf-8")))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+
+    async def _search(self, search_text, accent_insensitive, session):
+        """
+        Wait for the results, replacing the session's previous search.
+
+        Returns:
+            tuple: (cities, lookup task), cities is None if made stale
+        """
+        task = asyncio.ensure_future(self.results(search_text, accent_insensitive))
+        if session:
+            previous = self.sessions.get(session)
+            self.sessions[session] = task
+            if previous is not None:
+                previous.cancel()
+        try:
+            return await task, task
+        except asyncio.CancelledError:
+            if session and self.sessions.get(session) is not task:
+                return None, task  # A newer search of the session replaced it
+            raise  # The connection itself is going away
+
+    async def respond(self, writer, method: str, target: str, keep_alive: bool):
+        """Answer one request."""
+        search_text, accent_insensitive, session = _parse_search(method, target)
+        cities, task = await self._search(search_text, accent_insensitive, session)
+        try:
+            writer.write(_head(HTTPStatus.OK, keep_alive, chunked=True))
+            if cities is None:
+                writer.write(_chunk(_CANCELLED_LINE) + b"0\r\n\r\n")
+            else:
+                await self._stream(writer, cities, task, session)
+            await writer.drain()
+        finally:
+            if session and self.sessions.get(session) is task:
+                del self.sessions[session]
+
+    async def handle(self, reader, writer):
+        """Answer the requests of one connection, in order."""
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request[2]
+                    await self.respond(writer, *request)
+                except _BadRequest as e:
+                    keep_alive = False
+                    writer.write(_head(e.status, False, chunked=False))
+                    await writer.drain()
+        except ConnectionError:
+            pass  # The client left, nobody to answer to
+        finally:
+            writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Serve search_city until cancelled, announcing the address on stdout.
+    """
+    autocomplete = AutocompleteServer()
+    server = await autocomplete.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving on http://{address[0]}:{address[1]}/search", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        autocomplete.close()
+
+
+def main(argv=None):
+    """
+    Run the autocomplete server from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="0 picks a free port (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Tests for the autocomplete server around search_city
+
+Every test starts the server on a free port, talks HTTP to it over real
+connections and stops it again.
+"""
+
+import asyncio
+import json
+import threading
+import unittest
+from urllib.parse import urlencode
+
+from tdd.search_func import server
+from tdd.search_func.city_search import search_city
+from tdd.search_func.server import AutocompleteServer
+
+
+async def _request(reader, writer, target, method="GET", keep_alive=False):
+    """
+    Send one request and read its response.
+
+    Returns:
+        tuple: (status, headers, decoded NDJSON lines of the body)
+    """
+    connection = "keep-alive" if keep_alive else "close"
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: test\r\n"
+        f"Connection: {connection}\r\n\r\n".encode("ascii")
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.lower()] = value.strip()
+    body = b""
+    if headers.get("transfer-encoding") == "chunked":
+        while size := int((await reader.readline()).strip(), 16):
+            body += (await reader.readexactly(size + 2))[:-2]
+        await reader.readline()
+    return status, headers, [json.loads(line) for line in body.splitlines()]
+
+
+async def _get(port, target, method="GET"):
+    """Send one request on a connection of its own."""
+    reader, writer = await asyncio.open_connection(server.DEFAULT_HOST, port)
+    try:
+        return await _request(reader, writer, target, method)
+    finally:
+        writer.close()
+
+
+def _serve(test, search=search_city):
+    """
+    Run test(autocomplete, port) against a server started for it.
+
+    Returns:
+        What the test returns
+    """
+
+    async def run():
+        autocomplete = AutocompleteServer(search)
+        listening = await autocomplete.start(port=0)
+        try:
+            return await test(autocomplete, listening.sockets[0].getsockname()[1])
+        finally:
+            listening.close()
+            await listening.wait_closed()
+            autocomplete.close()
+
+    return asyncio.run(run())
+
+
+def _city_lines(cities):
+    """The NDJSON lines answering with the cities, decoded"""
+    return [{"city": city} for city in cities]
+
+
+class _GatedSearch:
+    """A search that blocks until opened and counts its calls"""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def __call__(self, search_text, accent_insensitive=False):
+        self.calls.append(search_text)
+        self.gate.wait(5)
+        return [f"{search_text} City {number}" for number in range(3)]
+
+
+class _Writer:
+    """Takes what a response writes, like a StreamWriter would send it"""
+
+    def write(self, data):
+        """Drop the data."""
+
+    async def drain(self):
+        """Nothing to wait for."""
+
+
+class TestAutocompleteServer(unittest.TestCase):
+    """Searching over HTTP"""
+
+    def test_results_match_search_city(self):
+        """Test that the NDJSON lines hold the cities of search_city"""
+        for search_text in ["a", "Va", "ams", "Zzz", "Москва"]:
+
+            async def test(_, port, search_text=search_text):
+                return await _get(port, "/search?" + urlencode({"q": search_text}))
+
+            with self.subTest(search_text=search_text):
+                status, headers, lines = _serve(test)
+                self.assertEqual(status, 200)
+                self.assertEqual(headers["content-type"], "application/x-ndjson")
+                self.assertEqual(lines, _city_lines(search_city(search_text)))
+
+    def test_accent_insensitive_parameter(self):
+        """Test that accent_insensitive is passed on to the search"""
+        calls = []
+
+        def search(search_text, accent_insensitive=False):
+            calls.append((search_text, accent_insensitive))
+            return []
+
+        async def test(_, port):
+            await _get(port, "/search?q=Sao")
+            await _get(port, "/search?q=Sao&accent_insensitive=1")
+
+        _serve(test, search)
+        self.assertEqual(calls, [("Sao", False), ("Sao", True)])
+
+    def test_bad_requests(self):
+        """Test the status of requests that aren't searches"""
+        for method, target, status in [
+            ("GET", "/", 404),
+            ("GET", "/cities?q=va", 404),
+            ("POST", "/search?q=va", 405),
+            ("GET", "/search", 400),
+            ("GET", "/search?session=1", 400),
+        ]:
+
+            async def test(_, port, method=method, target=target):
+                return await _get(port, target, method)
+
+            with self.subTest(method=method, target=target):
+                self.assertEqual(_serve(test)[0], status)
+
+    def test_keep_alive(self):
+        """Test several searches on one connection"""
+
+        async def test(_, port):
+            reader, writer = await asyncio.open_connection(server.DEFAULT_HOST, port)
+            try:
+                first = await _request(reader, writer, "/search?q=Va", keep_alive=True)
+                second = await _request(reader, writer, "/search?q=Ro")
+                return first, second, await reader.read()
+            finally:
+                writer.close()
+
+        first, second, rest = _serve(test)
+        self.assertEqual(first[1]["connection"], "keep-alive")
+        self.assertEqual(first[2], _city_lines(search_city("Va")))
+        self.assertEqual(second[1]["connection"], "close")
+        self.assertEqual(second[2], _city_lines(search_city("Ro")))
+        self.assertEqual(rest, b"")
+
+    def test_identical_searches_are_coalesced(self):
+        """Test that concurrent identical searches search once"""
+        search = _GatedSearch()
+
+        async def test(autocomplete, port):
+            requests = [
+                asyncio.create_task(_get(port, "/search?q=Va")) for _ in range(5)
+            ]
+            while ("Va", False) not in autocomplete.lookups or not search.calls:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            search.gate.set()
+            return await asyncio.gather(*requests), autocomplete.lookups
+
+        responses, lookups = _serve(test, search)
+        self.assertEqual(search.calls, ["Va"])
+        expected = _city_lines(search("Va"))
+        self.assertEqual([lines for _, _, lines in responses], [expected] * 5)
+        self.assertFalse(lookups)
+
+    def test_newer_search_of_session_cancels_stale_one(self):
+        """Test that a session's newer search replaces the pending one"""
+        search = _GatedSearch()
+
+        async def test(autocomplete, port):
+            stale = asyncio.create_task(_get(port, "/search?q=Va&session=s1"))
+            while not search.calls:
+                await asyncio.sleep(0.01)
+            # Waiting behind the first search in the worker thread
+            pending = asyncio.create_task(_get(port, "/search?q=Val&session=s1"))
+            await asyncio.sleep(0.05)
+            newest = asyncio.create_task(_get(port, "/search?q=Vale&session=s1"))
+            other = asyncio.create_task(_get(port, "/search?q=Val&session=s2"))
+            await asyncio.sleep(0.05)
+            search.gate.set()
+            responses = await asyncio.gather(stale, pending, newest, other)
+            return responses, autocomplete.sessions
+
+        responses, sessions = _serve(test, search)
+        stale, pending, newest, other = (lines for _, _, lines in responses)
+        self.assertEqual(stale, [{"cancelled": True}])
+        self.assertEqual(pending, [{"cancelled": True}])
+        self.assertEqual(newest, _city_lines(search("Vale")))
+        self.assertEqual(other, _city_lines(search("Val")))
+        self.assertFalse(sessions)
+
+    def test_cancelled_request_is_not_stale(self):
+        """Test that cancelling the request itself still cancels it"""
+        search = _GatedSearch()
+
+        async def test(autocomplete, _):
+            request = asyncio.create_task(
+                autocomplete.respond(_Writer(), "GET", "/search?q=Va&session=s1", False)
+            )
+            while not search.calls:
+                await asyncio.sleep(0.01)
+            request.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await request
+            search.gate.set()
+
+        _serve(test, search)
+
+    def test_replaced_search_is_not_run(self):
+        """Test that a search nobody waits for anymore never starts"""
+        search = _GatedSearch()
+
+        async def test(autocomplete, port):
+            first = asyncio.create_task(_get(port, "/search?q=Va&session=s1"))
+            while not search.calls:
+                await asyncio.sleep(0.01)
+            replaced = asyncio.create_task(_get(port, "/search?q=Val&session=s2"))
+            await asyncio.sleep(0.05)
+            newest = asyncio.create_task(_get(port, "/search?q=Vale&session=s2"))
+            await asyncio.sleep(0.05)
+            search.gate.set()
+            await asyncio.gather(first, replaced, newest)
+            return autocomplete.lookups
+
+        self.assertFalse(_serve(test, search))
+        self.assertEqual(search.calls, ["Va", "Vale"])
+
+    def test_large_results_are_streamed_in_chunks(self):
+        """Test a result bigger than one chunk"""
+        cities = [f"Town {number}" for number in range(server.STREAM_BATCH_SIZE * 3)]
+
+        async def test(_, port):
+            return await _get(port, "/search?q=To")
+
+        _, _, lines = _serve(test, lambda search_text, accent_insensitive: cities)
+        self.assertEqual(lines, _city_lines(cities))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,987 @@
+"""
+Shared engine for every version of the string calculator exercise from
+the tddmanifesto.com
+
+Each vN/string_calc.py used to carry its own copy of the delimiter parsing
+and validation helpers, so every fix had to be repeated eight times. Now
+they all build a Calculator with the requirements they implement and
+there's a single scanner to optimize.
+
+Requirements (https://tddmanifesto.com/exercises/, exercise 3):
+
+1. Up to two comma separated numbers
+2. Any amount of numbers
+3. Newlines work as separators too
+4. The input can't end with a separator
+5. Custom delimiter with a "//[delimiter]\\n" header
+6. Negative numbers aren't allowed
+7. Every error is reported, not just the first one
+8. Numbers bigger than 1000 are ignored
+"""
+
+import math
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, compress, count, islice, repeat
+from typing import NamedTuple, Optional, Tuple
+
+from tdd.string_calculator.shards import scan_shards, shard_bounds
+
+ALL_REQUIREMENTS = range(1, 9)
+
+# How many distinct custom delimiters keep their compiled scanner around
+DELIMITER_CACHE_SIZE = 64
+
+# Characters read at a time by add_stream
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Characters scanned by each worker of add_parallel
+DEFAULT_SHARD_SIZE = 1024 * 1024
+
+# The first 1/REPEAT_SAMPLE of the parts tell if a string repeats its numbers
+REPEAT_SAMPLE = 16
+# Sampled parts per distinct one above which the numbers are counted first
+REPEAT_RATIO = 4
+
+
+class _DelimiterSpec(NamedTuple):
+    """Compiled scanner for one set of separators, see _compile_delimiter"""
+
+    pattern: re.Pattern
+    separators: Tuple[str, ...]
+    stray_offsets: Tuple[int, ...]
+    # What str.split uses on the digits only fast path, None to always scan
+    split_on: Optional[str]
+
+
+# Numbers are whatever sits between the separators. A number swallows the
+# separator after it, so a separator matched on its own is an empty part.
+_COMMA_SPEC = _DelimiterSpec(re.compile(r"([^,]+),?|(,)"), (",",), (), ",")
+# Requirement 3: newlines work as separators too
+_COMMA_NEWLINE_SPEC = _DelimiterSpec(
+    re.compile(r"([^,\n]+)[,\n]?|([,\n])"), (",", "\n"), (), ","
+)
+_COMMA_NEWLINE = re.compile(r"[,\n]")
+
+# What int("") says, for the versions that still convert empty parts
+_EMPTY_PART_ERROR = "invalid literal for int() with base 10: ''"
+
+
+class CalculatorError(ValueError):
+    """
+    ValueError raised by Calculator, with what went wrong kept apart.
+
+    str() gives the same message as always, one line per error. The rest
+    is there so callers don't have to build and parse that message:
+
+    - delimiter_offsets: positions of the wrong separators reported
+    - negatives: negative numbers reported
+    - trailing_separator: True if the input ends with a separator
+    - truncated: True if there were more errors than max_errors allowed
+    """
+
+    def __init__(
+        self,
+        *messages,
+        delimiter_offsets=(),
+        negatives=(),
+        trailing_separator=False,
+        truncated=False,
+    ):
+        super().__init__(*messages)
+        self.delimiter_offsets = tuple(delimiter_offsets)
+        self.negatives = tuple(negatives)
+        self.trailing_separator = trailing_separator
+        self.truncated = truncated
+
+    def __str__(self):
+        return "\n".join(self.args)
+
+    @property
+    def messages(self):
+        """Every reported error message, in order."""
+        return self.args
+
+    @property
+    def counts(self):
+        """How many errors of each kind were reported."""
+        return {
+            "delimiter": len(self.delimiter_offsets),
+            "trailing": int(self.trailing_separator),
+            "negative": len(self.negatives),
+        }
+
+
+class _Found:
+    """
+    Everything the scans of consecutive pieces of the numbers string found.
+
+    errors holds (position, char) for every wrong separator, invalid
+    (position, message) for the first part int() rejected and empty_at the
+    position of the first empty part. offset is where the next piece
+    starts in the numbers string.
+
+    Once max_errors wrong separators are found nothing after them can be
+    reported anymore, truncated tells the scans to stop there.
+    """
+
+    __slots__ = (
+        "errors",
+        "negatives",
+        "total",
+        "invalid",
+        "empty_at",
+        "offset",
+        "max_errors",
+    )
+
+    def __init__(self, offset=0, max_errors=None):
+        self.errors = []
+        self.negatives = []
+        self.total = 0
+        self.invalid = None
+        self.empty_at = None
+        self.offset = offset
+        self.max_errors = max_errors
+
+    @property
+    def truncated(self):
+        """True once the wrong separators found fill the error budget."""
+        return self.max_errors is not None and len(self.errors) >= self.max_errors
+
+    def empty_part(self, position, stray_offsets):
+        """Note a separator that isn't right after a number."""
+        if self.empty_at is None:
+            self.empty_at = position
+        # A comma inside the delimiter itself is still a wrong separator
+        self.errors.extend((position + i, ",") for i in stray_offsets)
+
+    def merge(self, other):
+        """Add what was found in the piece right after this one."""
+        if self.truncated:
+            return  # The scan already stopped before that piece
+        self.errors.extend(other.errors)
+        self.negatives.extend(other.negatives)
+        self.total += other.total
+        if self.invalid is None:
+            self.invalid = other.invalid
+        if self.empty_at is None:
+            self.empty_at = other.empty_at
+        self.offset = other.offset
+        if self.truncated:
+            del self.errors[self.max_errors :]
+
+
+def _parse_custom_delimiter(numbers):
+    """
+    Extract custom delimiter and numbers from the input string.
+
+    Returns:
+        tuple: (delimiter, numbers_string)
+    """
+    newline_pos = numbers.find("\n")
+    if newline_pos == -1:
+        raise ValueError("Invalid format: missing newline after delimiter definition")
+
+    delimiter = numbers[2:newline_pos]
+    numbers_str = numbers[newline_pos + 1 :]
+    return delimiter, numbers_str
+
+
+def _header_complete(text):
+    """
+    Check if enough of the input arrived to split off the "//" header.
+    """
+    if text.startswith("//"):
+        return "\n" in text
+    # "" or "/" could still turn into a header
+    return not "//".startswith(text)
+
+
+def _delimiter_error(delimiter, char, position):
+    """
+    Build the message for a comma or newline used instead of the custom delimiter.
+    """
+    return f"'{delimiter}' expected but '{char}' found at position {position}."
+
+
+def _negatives_error(negatives):
+    """
+    Build the message listing the negative numbers.
+    """
+    neg_str = ", ".join(str(n) for n in negatives)
+    return f"Negative number(s) not allowed: {neg_str}"
+
+
+@lru_cache(maxsize=DELIMITER_CACHE_SIZE)
+def _compile_delimiter(delimiter):
+    """
+    Build the scanner that tokenizes a string using a custom delimiter.
+
+    Cached, so inputs that repeat a "//" header skip the regex construction.
+
+    Groups: 1 = number, 2 = a delimiter that isn't right after a number,
+    3 = wrong separator (comma or newline).
+
+    Numbers stop wherever the delimiter starts, so the delimiter is tried
+    before comma/newline exactly like str.replace did before. The delimiter
+    after a number is swallowed by the same match, unless it contains a
+    comma that still has to be reported.
+    """
+    # A comma inside the delimiter itself is still a wrong separator
+    stray_offsets = tuple(i for i, char in enumerate(delimiter) if char == ",")
+
+    escaped = re.escape(delimiter)
+    first = re.escape(delimiter[0])
+    if len(delimiter) == 1 or delimiter[0] == ",":
+        number = f"[^,\\n{first}]+"
+    else:
+        number = f"(?:[^,\\n{first}]|{first}(?!{re.escape(delimiter[1:])}))+"
+
+    if stray_offsets:
+        pattern = re.compile(f"({number})|({escaped})|([,\\n])")
+    else:
+        pattern = re.compile(f"({number})(?:{escaped})?|({escaped})|([,\\n])")
+
+    return _DelimiterSpec(
+        pattern, (delimiter,), stray_offsets, None if stray_offsets else delimiter
+    )
+
+
+def delimiter_cache_info():
+    """
+    Report how well the compiled delimiter cache is doing.
+
+    Returns:
+        CacheInfo: hits, misses, maxsize and currsize of the cache
+    """
+    return _compile_delimiter.cache_info()
+
+
+def clear_delimiter_cache():
+    """
+    Drop every compiled delimiter and reset the hit/miss counters.
+    """
+    _compile_delimiter.cache_clear()
+
+
+def _last_separator_end(numbers, separators, stop):
+    """
+    Find where the last separator that ends before stop ends.
+
+    Returns:
+        int: Position right after that separator, 0 if there is none
+    """
+    end = 0
+    for separator in separators:
+        position = numbers.rfind(separator, 0, stop)
+        if position != -1:
+            end = max(end, position + len(separator))
+    return end
+
+
+def _convert_parts(parts):
+    """
+    Convert every part int() takes, skipping the others.
+
+    The empty parts are left out up front. list.extend keeps what map gave
+    before int() failed, so the conversion goes on in C right after every
+    part it rejects.
+
+    Returns:
+        tuple: (the numbers, index of the first empty part, index of the
+               first other part int() rejected, its int() error message)
+    """
+    empty = parts.index("") if "" in parts else None
+    invalid = message = None
+    numbers = []
+    rejected = 0
+    remaining = filter(None, parts)
+    while True:
+        try:
+            numbers.extend(map(int, remaining))
+            return numbers, empty, invalid, message
+        except ValueError as e:
+            if invalid is None:
+                # Where the rejected part sits among all the parts
+                kept = len(numbers) + rejected
+                invalid = next(islice(compress(count(), parts), kept, None))
+                message = str(e)
+            rejected += 1
+
+
+def _repeats(parts):
+    """
+    Tell if the first 1/REPEAT_SAMPLE of the parts hold few enough distinct
+    ones to be worth counting, see Calculator._add_parts.
+    """
+    sample = len(parts) // REPEAT_SAMPLE
+    if sample < REPEAT_RATIO:
+        return False
+    return len(set(islice(parts, sample))) * REPEAT_RATIO <= sample
+
+
+def _part_start(parts, index, step):
+    """
+    Find where parts[index] starts in the string split into parts.
+
+    step is the length of the separator they were split on.
+    """
+    return sum(map(len, parts[:index])) + index * step
+
+
+def _is_shardable(delimiter):
+    """
+    Check if the input can be cut right after any separator str.find finds.
+
+    True for comma/newline and for custom delimiters without a comma that
+    can't overlap with themselves ("aa" can: "aaa" holds it twice).
+    """
+    if not delimiter:
+        return True
+    if "," in delimiter:
+        return False
+    return not any(delimiter[:k] == delimiter[-k:] for k in range(1, len(delimiter)))
+
+
+class _StreamScanner:
+    """
+    Runs a calculator over a numbers string that arrives in pieces.
+
+    Only the text that can still change meaning is kept between pieces:
+    the last number (which may continue in the next piece) and a possibly
+    incomplete delimiter. Everything before it is scanned once and folded
+    into the running results. Pieces without a separator character only
+    make the last number longer, so they are put aside until one arrives
+    instead of scanning that number again every time.
+    """
+
+    def __init__(self, calculator, delimiter):
+        self.calculator = calculator
+        self.delimiter = delimiter
+        self.found = calculator.new_found()
+        self._pending = []  # Pieces scanned again once a separator arrives
+        # What a wrong separator, a newline or the delimiter can be made of
+        self._separator_chars = frozenset(",\n" + (delimiter or ""))
+        self._separator_pending = False
+
+    def feed(self, text):
+        """Scan the next piece of the numbers string."""
+        if self.found.truncated:
+            return  # Nothing after this can be reported anymore
+        if not self._separator_pending and self._separator_chars.isdisjoint(text):
+            self._pending.append(text)  # Still the same number, nothing to scan
+            return
+        # A match this close to the end could still grow into a delimiter.
+        # What's kept also always covers the trailing separator check.
+        keep = len(self.delimiter) if self.delimiter else 1
+        self._pending.append(text)
+        pending = "".join(self._pending)
+        scanned = self.calculator.scan(
+            pending, self.delimiter, self.found, len(pending) - keep
+        )
+        pending = pending[scanned:]
+        self._pending = [pending]
+        self._separator_pending = not self._separator_chars.isdisjoint(pending)
+
+    def finish(self):
+        """
+        Scan what's left as the end of the numbers string.
+
+        Returns:
+            tuple: (total, error), error is a CalculatorError or None if valid
+        """
+        found = self.calculator.new_found(self.found.offset)
+        found.merge(self.found)
+        pending = "".join(self._pending)
+        self._pending = [pending]
+        if not found.truncated:
+            self.calculator.scan(pending, self.delimiter, found)
+        return self.calculator.conclude(found, pending, self.delimiter)
+
+
+class CalculatorSession:
+    """
+    Incremental add, for a numbers string that arrives in fragments.
+
+    feed() each fragment as it arrives, result() returns (or raises) what
+    add would for everything fed so far and can be called at any time.
+    Fragments are scanned once: only a "//" header until its newline
+    arrives and the end of the last number are held back, so each
+    fragment costs O(len(fragment)) however much came before.
+    """
+
+    def __init__(self, calculator=None):
+        self.calculator = Calculator() if calculator is None else calculator
+        self._head = []  # Fragments before scanning can start
+        self._scanner = None
+
+    @property
+    def truncated(self):
+        """True once max_errors is reached and more input can't change result()."""
+        return self._scanner is not None and self._scanner.found.truncated
+
+    def feed(self, fragment):
+        """Add the next fragment of the numbers string."""
+        if self._scanner is not None:
+            self._scanner.feed(fragment)
+            return
+
+        self._head.append(fragment)
+        requirements = self.calculator.requirements
+        if 2 not in requirements:
+            return  # Only two numbers ever count, nothing worth scanning early
+
+        head = "".join(self._head)
+        if not head or (5 in requirements and not _header_complete(head)):
+            self._head = [head]
+            return
+
+        # The header is complete, splitting it off can't fail anymore
+        (delimiter, numbers), _ = self.calculator.split_header(head)
+        self._head = []
+        self._scanner = _StreamScanner(self.calculator, delimiter)
+        self._scanner.feed(numbers)
+
+    def result(self):
+        """
+        Sum everything fed so far.
+
+        Raises:
+            CalculatorError: Same as Calculator.add
+        """
+        if self._scanner is None:
+            return self.calculator.add("".join(self._head))
+
+        total, error = self._scanner.finish()
+        if error is not None:
+            raise error
+        return total
+
+
+class Calculator:
+    """
+    String calculator for any set of the kata requirements.
+
+    requirements holds the requirement numbers (1 to 8) to implement, so
+    Calculator(range(1, 9)) behaves like v8 and Calculator(range(1, 5))
+    like v4. Requirement 1 is the base and always on.
+
+    With requirement 7, max_errors caps how many errors are reported (each
+    wrong separator, the trailing separator and each negative number count
+    as one). The scan stops as soon as the cap can't change anymore, so
+    max_errors=1 fails fast on hostile inputs. Before requirement 7 only
+    the first error is ever reported.
+    """
+
+    def __init__(self, requirements=ALL_REQUIREMENTS, max_errors=None):
+        requirements = frozenset(requirements) | {1}
+        unknown = requirements.difference(ALL_REQUIREMENTS)
+        if unknown:
+            raise ValueError(f"Unknown requirement(s): {sorted(unknown)}")
+        if max_errors is not None and max_errors < 1:
+            raise ValueError(f"max_errors must be at least 1, got {max_errors}")
+        self.requirements = requirements
+        self.max_errors = max_errors
+        self._spec = _COMMA_NEWLINE_SPEC if 3 in requirements else _COMMA_SPEC
+        # Requirement 8: Ignore numbers bigger than 1000
+        self._limit = 1000 if 8 in requirements else math.inf
+        # Without requirement 7 the first wrong separator is all that counts
+        self._budget = max_errors if 7 in requirements else 1
+
+    def __repr__(self):
+        if self.max_errors is None:
+            return f"Calculator(requirements={sorted(self.requirements)})"
+        return (
+            f"Calculator(requirements={sorted(self.requirements)},"
+            f" max_errors={self.max_errors})"
+        )
+
+    def add(self, numbers):
+        """
+        Take a string of numbers and return their sum.
+
+        Raises:
+            CalculatorError: If any validation errors occur. With requirement 7
+                       multiple errors are combined into a single message
+                       separated by newlines.
+        """
+        total, error = self.evaluate(numbers)
+        if error is not None:
+            raise error
+        return total
+
+    def add_many(self, batch):
+        """
+        Run add over a whole batch of strings in one call.
+
+        A bad string doesn't abort the batch: its slot in the result holds the
+        CalculatorError add would have raised, without raising it.
+
+        Strings of nothing but digits and separators are summed together:
+        they are joined, split and converted by one str.split and one
+        map(int) over the whole batch, and only the rest go through
+        evaluate one at a time. A number past the int string-digit limit
+        stops the bulk pass, the strings from there on go through evaluate
+        too.
+
+        Returns:
+            list: One int or CalculatorError per string, in the same order
+        """
+        batch = list(batch)
+        results = [None] * len(batch)
+        plain, rows = self._plain_rows(batch)
+        if rows:
+            numbers = map(int, ",".join(rows).split(","))
+            # Without requirement 8 filter(None) only drops zeros
+            limit = None if self._limit == math.inf else self._limit.__ge__
+            try:
+                for index, row in zip(plain, rows):
+                    count = row.count(",") + 1
+                    results[index] = sum(filter(limit, islice(numbers, count)))
+            except ValueError:
+                pass  # Too many digits for int(), evaluate says so from there on
+        for index, result in enumerate(results):
+            if result is None:
+                total, error = self.evaluate(batch[index])
+                results[index] = total if error is None else error
+        return results
+
+    def _plain_rows(self, batch):
+        """
+        Find the strings add_many can sum without evaluate: digits between
+        single commas (newlines too with requirement 3), nothing else. int()
+        takes any of them and nothing there needs validating.
+
+        Returns:
+            tuple: (indexes in the batch, strings with newlines made commas)
+        """
+        if 2 not in self.requirements:
+            return [], []  # Only the first two numbers count
+        rows = batch
+        if 3 in self.requirements:
+            rows = [numbers.replace("\n", ",") for numbers in batch]
+        plain = [
+            index
+            for index, row in enumerate(rows)
+            if row.replace(",", "").isdecimal()
+            and row[0] != ","
+            and row[-1] != ","
+            and ",," not in row
+        ]
+        return plain, [rows[index] for index in plain]
+
+    def add_stream(self, fileobj, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Same as add, but reads the input from a text file object.
+
+        The input is read in chunks of chunk_size characters and never held
+        in memory as a whole, numbers and delimiters split between two chunks
+        are joined back. Errors and positions are the same add would give
+        for the whole text (the error message itself still grows with the
+        number of errors found, up to max_errors). Reading stops once
+        max_errors is reached.
+
+        Raises:
+            CalculatorError: Same as add
+        """
+        session = CalculatorSession(self)
+        for chunk in iter(lambda: fileobj.read(chunk_size), ""):
+            session.feed(chunk)
+            if session.truncated:
+                break  # Nothing after this can be reported anymore
+        return session.result()
+
+    def add_parallel(
+        self, numbers, workers=None, shard_size=DEFAULT_SHARD_SIZE, executor=None
+    ):
+        """
+        Same as add, but large inputs are scanned by several processes.
+
+        The numbers string is cut after separators into pieces of about
+        shard_size characters, copied once into shared memory and scanned by
+        a ProcessPoolExecutor with the given number of workers (or by
+        executor, to reuse a pool between calls). The pieces are merged in
+        input order, so errors and positions are the same as add.
+
+        Inputs up to shard_size characters, and custom delimiters that can't
+        be cut safely (see _is_shardable), are scanned in this process.
+
+        Raises:
+            CalculatorError: Same as add
+        """
+        if len(numbers) <= shard_size or 2 not in self.requirements:
+            return self.add(numbers)
+
+        header, error = self.split_header(numbers)
+        if error is not None:
+            raise error
+        delimiter, numbers = header
+
+        if not _is_shardable(delimiter):
+            found = self.new_found()
+            self.scan(numbers, delimiter, found)
+        else:
+            separator = delimiter or ("," if 3 not in self.requirements else None)
+            bounds = shard_bounds(numbers, separator, shard_size)
+            if executor is None:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    found = scan_shards(self, numbers, delimiter, bounds, pool)
+            else:
+                found = scan_shards(self, numbers, delimiter, bounds, executor)
+
+        total, error = self.conclude(found, numbers, delimiter)
+        if error is not None:
+            raise error
+        return total
+
+    def evaluate(self, numbers):
+        """
+        Run every validation and the sum without raising.
+
+        Returns:
+            tuple: (total, error), error is a CalculatorError or None if valid
+        """
+        if numbers == "":
+            return 0, None
+
+        header, error = self.split_header(numbers)
+        if error is not None:
+            return 0, error
+        delimiter, numbers = header
+        numbers = self._two_parts(numbers)
+
+        # Single pass: delimiter usage, negatives and the sum together
+        found = self.new_found()
+        self.scan(numbers, delimiter, found)
+        return self.conclude(found, numbers, delimiter)
+
+    def new_found(self, offset=0):
+        """
+        Start collecting what the scans of one input find, see scan.
+
+        offset is where the first piece scanned starts in the input.
+        """
+        return _Found(offset, self._budget)
+
+    def scan(self, numbers, delimiter, found, stop=None):
+        """
+        Walk the numbers string once, adding what it holds to found.
+
+        Strings are split and converted by _scan_digits whenever their
+        separators allow it, the rest go through the token scanner of
+        _scan_tokens. Both scan the same text and find the same things.
+
+        When the string is only a piece of a longer input, stop leaves the
+        matches that could still change with more text unscanned.
+        found.offset shifts the reported positions to the whole input and
+        moves past the scanned text. The scan also stops right after the
+        error that fills the error budget, found.truncated is set then.
+
+        Returns:
+            int: How much of the string was scanned
+        """
+        spec = _compile_delimiter(delimiter) if delimiter else self._spec
+        scanned = self._scan_digits(numbers, spec, found, stop)
+        if scanned is None:
+            scanned = self._scan_tokens(numbers, spec, found, stop)
+        return scanned
+
+    def _scan_digits(self, numbers, spec, found, stop):
+        """
+        Fast path for strings split by the right separators only.
+
+        Splitting and converting happen inside str and int methods, so the
+        loop over the numbers runs in C instead of one regex match and one
+        int() call at a time. int() sees exactly the parts the token scanner
+        would give it; the empty and invalid ones are found again from where
+        they sit in the split. Python ints grow as needed, big sums just get
+        slower instead of overflowing.
+
+        Returns:
+            int: How much of the string was scanned, None if the string
+                 needs the token scanner
+        """
+        if spec.split_on is None:
+            return None
+        if spec.split_on != "," and ("," in numbers or "\n" in numbers):
+            return self._scan_wrong_separators(numbers, spec, found, stop)
+
+        end = len(numbers)
+        if stop is not None and stop < end:
+            if spec.split_on != "," and not _is_shardable(spec.split_on):
+                # "aaa" holds "aa" twice, the last one isn't where it splits
+                return None
+            # Only up to the last separator that fits before stop
+            end = _last_separator_end(numbers, spec.separators, stop)
+            if not end:
+                return None
+            numbers = numbers[:end]
+
+        if len(spec.separators) == 2:
+            numbers = numbers.replace("\n", ",")
+        parts = numbers.split(spec.split_on)
+        if not parts[-1]:
+            parts.pop()  # The separator at the end doesn't start a number
+
+        empty, invalid, message = self._add_parts(parts, found, "-" in numbers)
+        step = len(spec.split_on)
+        if empty is not None:
+            # A separator right after another one, or at the start
+            found.empty_part(found.offset + _part_start(parts, empty, step), ())
+        if invalid is not None and found.invalid is None:
+            start = _part_start(parts, invalid, step)
+            found.invalid = (found.offset + start, message)
+        found.offset += end
+        return end
+
+    def _scan_wrong_separators(self, numbers, spec, found, stop):
+        """
+        Fast path for a custom delimiter string with commas or newlines.
+
+        Once a wrong separator is found, only the wrong separators and the
+        negative numbers still count: they are what every error message is
+        made of, and they take precedence over empty and invalid parts. The
+        wrong separators are found by one regex search in C, the numbers
+        come from splitting on them and on the delimiter.
+
+        Returns:
+            int: How much of the string was scanned, None if the string
+                 needs the token scanner
+        """
+        if stop is not None:
+            return None  # Streams scan pieces, where an error can still move
+
+        errors = [
+            (found.offset + match.start(), match.group(), match.end())
+            for match in _COMMA_NEWLINE.finditer(numbers)
+        ]
+        end = len(numbers)
+        reported = len(found.errors) + len(errors)
+        if errors and found.max_errors is not None and reported >= found.max_errors:
+            # The scan stops right after the error that fills the budget
+            del errors[max(found.max_errors - len(found.errors), 1) :]
+            end = errors[-1][2]
+
+        segments = _COMMA_NEWLINE.split(numbers[:end])
+        parts = chain.from_iterable(map(str.split, segments, repeat(spec.split_on)))
+        self._add_parts(list(filter(None, parts)), found, "-" in numbers)
+        found.errors.extend((position, char) for position, char, _ in errors)
+        if found.truncated:
+            del found.errors[found.max_errors :]
+        found.offset += end
+        return end
+
+    def _add_parts(self, parts, found, negative):
+        """
+        Convert the parts with int() and add them to found.
+
+        All of them go through one map(int) in C, only if int() rejects one
+        does _convert_parts go over them again. negative tells if any part
+        may hold a negative number to collect.
+
+        int() is most of the cost, so a string whose first parts repeat each
+        number REPEAT_RATIO times or more is counted with Counter first and
+        every distinct part converted once. Strings that don't repeat
+        themselves skip the count, it would only add to int().
+
+        Returns:
+            tuple: (index of the first empty part, index of the first other
+                   part int() rejected, its int() error message), None for
+                   what there is none of
+        """
+        # Without requirement 8 filter(None) only drops zeros
+        limit = None if self._limit == math.inf else self._limit.__ge__
+        empty = invalid = message = None
+        try:
+            if not negative and _repeats(parts):
+                counts = Counter(parts)
+                found.total += sum(
+                    number * times
+                    for number, times in zip(map(int, counts), counts.values())
+                    if number <= self._limit
+                )
+                return empty, invalid, message
+            if not negative:
+                found.total += sum(filter(limit, map(int, parts)))
+                return empty, invalid, message
+            numbers = list(map(int, parts))
+        except ValueError:
+            numbers, empty, invalid, message = _convert_parts(parts)
+
+        negatives = list(filter((0).__gt__, numbers)) if negative else []
+        found.total += sum(filter(limit, numbers)) - sum(negatives)
+        found.negatives.extend(negatives)
+        return empty, invalid, message
+
+    def _scan_tokens(self, numbers, spec, found, stop):
+        """
+        Walk the numbers string once, token by token, adding to found.
+
+        A single regex pass yields every number and every wrong separator, so
+        the delimiter validation, the negative collection and the sum all
+        happen in the same traversal. Parts that can't be converted are
+        skipped, but the first one is remembered in case there is nothing
+        else to report.
+
+        Returns:
+            int: How much of the string was scanned
+        """
+        negatives = found.negatives
+        total = 0
+        invalid = found.invalid
+        offset = found.offset
+        limit = self._limit
+        if stop is None:
+            stop = len(numbers)
+
+        # Every character belongs to some match, so without a match past
+        # stop the whole string gets scanned
+        scanned = len(numbers)
+        for match in spec.pattern.finditer(numbers):
+            if match.end() > stop:
+                scanned = match.start()
+                break
+
+            if match.lastindex == 1:
+                try:
+                    num = int(match.group(1))
+                except ValueError as e:
+                    if invalid is None:
+                        invalid = (offset + match.start(), str(e))
+                else:
+                    if num < 0:
+                        negatives.append(num)
+                    elif num <= limit:
+                        total += num
+                continue
+
+            if match.lastindex == 2:
+                found.empty_part(offset + match.start(), spec.stray_offsets)
+            else:
+                found.errors.append((offset + match.start(), match.group()))
+            if found.truncated:
+                # Nothing after this error can be reported anymore
+                del found.errors[found.max_errors :]
+                scanned = match.end()
+                break
+
+        found.total += total
+        found.invalid = invalid
+        found.offset = offset + scanned
+        return scanned
+
+    def conclude(self, found, numbers_end, delimiter):
+        """
+        Turn what the scans found into the result or the error.
+
+        numbers_end only needs to hold the end of the numbers string, it's
+        used for the trailing separator check.
+
+        Returns:
+            tuple: (total, error), error is a CalculatorError or None if valid
+        """
+        separators = (delimiter,) if delimiter else self._spec.separators
+        trailing = numbers_end.endswith(separators)
+        if 7 in self.requirements:
+            error = self._all_errors(found, trailing, delimiter)
+        else:
+            error = self._first_error(found, trailing, not numbers_end, delimiter)
+        if error is not None:
+            return 0, error
+
+        if 6 not in self.requirements:
+            return found.total + sum(found.negatives), None
+        return found.total, None
+
+    def _all_errors(self, found, trailing, delimiter):
+        """
+        Requirement 7: Every error at once (up to max_errors), empty parts
+        are just skipped.
+        """
+        budget = found.max_errors or sys.maxsize
+        errors = found.errors[:budget]
+        messages = [_delimiter_error(delimiter, char, pos) for pos, char in errors]
+        hidden = len(found.errors) - len(errors)
+
+        trailing = 4 in self.requirements and trailing
+        if trailing and len(messages) == budget:
+            trailing, hidden = False, hidden + 1
+        if trailing:
+            messages.append("Input cannot end with a separator")
+
+        negatives = found.negatives if 6 in self.requirements else []
+        if len(negatives) > budget - len(messages):
+            hidden += len(negatives) - (budget - len(messages))
+            negatives = negatives[: budget - len(messages)]
+        if negatives:
+            messages.append(_negatives_error(negatives))
+
+        if messages:
+            return CalculatorError(
+                *messages,
+                delimiter_offsets=[pos for pos, _ in errors],
+                negatives=negatives,
+                trailing_separator=trailing,
+                truncated=found.truncated or hidden > 0,
+            )
+
+        # A part that isn't a number fails the same way int() always did
+        return CalculatorError(found.invalid[1]) if found.invalid is not None else None
+
+    def _first_error(self, found, trailing, empty, delimiter):
+        """
+        Before requirement 7 only the first error counts, in the order each
+        requirement used to check them.
+        """
+        if found.errors:
+            pos, char = found.errors[0]
+            return CalculatorError(
+                _delimiter_error(delimiter, char, pos), delimiter_offsets=[pos]
+            )
+        if 4 in self.requirements and trailing:
+            return CalculatorError(
+                "Input cannot end with a separator", trailing_separator=True
+            )
+
+        # Empty parts go through int() like any other part, and fail
+        invalid = [found.invalid] if found.invalid is not None else []
+        if found.empty_at is not None:
+            invalid.append((found.empty_at, _EMPTY_PART_ERROR))
+        elif trailing or empty:
+            invalid.append((math.inf, _EMPTY_PART_ERROR))
+        if invalid:
+            return CalculatorError(min(invalid)[1])
+
+        if 6 in self.requirements and found.negatives:
+            return CalculatorError(
+                _negatives_error(found.negatives), negatives=found.negatives
+            )
+        return None
+
+    def split_header(self, text):
+        """
+        Split the "//" header (requirement 5) from the start of the input.
+
+        Returns:
+            tuple: ((delimiter, numbers_string), error), error is a
+                   CalculatorError or None
+        """
+        if 5 in self.requirements and text.startswith("//"):
+            try:
+                return _parse_custom_delimiter(text), None
+            except ValueError as e:
+                # If we can't parse the delimiter, we can't proceed with validation
+                return None, CalculatorError(str(e))
+        return (None, text), None
+
+    def _two_parts(self, numbers):
+        """
+        Without requirement 2 only the first two comma separated parts count.
+        """
+        if 2 in self.requirements:
+            return numbers
+        return ",".join(numbers.split(",", 2)[:2])
@@ -0,0 +1,98 @@
+"""
+Process-pool sharding for Calculator.add_parallel
+
+The numbers string is cut right after separators into pieces of about
+shard_size characters, shared with the worker processes through shared
+memory and scanned there, one piece per task.
+"""
+
+import re
+from itertools import repeat
+from multiprocessing import shared_memory
+
+_COMMA_NEWLINE = re.compile(r"[,\n]")
+
+
+def shard_bounds(numbers, separator, shard_size):
+    """
+    Cut the numbers string into pieces of about shard_size characters.
+
+    Every cut is right after a separator, where the scan of the whole
+    string would start a new match as well. separator is the one string
+    that separates numbers, or None for comma and newline.
+
+    Returns:
+        list: (start, end) character positions of each piece
+    """
+    bounds = []
+    start = 0
+    while start < len(numbers):
+        end = len(numbers)
+        target = start + shard_size
+        if target < end:
+            if separator:
+                found = numbers.find(separator, target)
+                if found != -1:
+                    end = found + len(separator)
+            else:
+                match = _COMMA_NEWLINE.search(numbers, target)
+                if match:
+                    end = match.end()
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _scan_shard(calculator, shm_name, byte_bounds, found, delimiter):
+    """
+    Scan one piece of the UTF-8 numbers string held in shared memory.
+
+    Runs in the worker processes of Calculator.add_parallel, found starts
+    out empty at the offset of the piece.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        text = str(shm.buf[byte_bounds[0] : byte_bounds[1]], "utf-8")
+    finally:
+        shm.close()
+    calculator.scan(text, delimiter, found)
+    return found
+
+
+def scan_shards(calculator, numbers, delimiter, bounds, pool):
+    """
+    Scan every piece in the pool, sharing the text instead of pickling it.
+
+    Returns:
+        What the pieces found, merged in input order, see Calculator.new_found
+    """
+    encoded = numbers.encode("utf-8")
+    if numbers.isascii():
+        byte_bounds = bounds
+    else:
+        byte_bounds = []
+        position = 0
+        for start, end in bounds:
+            size = len(numbers[start:end].encode("utf-8"))
+            byte_bounds.append((position, position + size))
+            position += size
+
+    shm = shared_memory.SharedMemory(create=True, size=max(len(encoded), 1))
+    try:
+        shm.buf[: len(encoded)] = encoded
+        del encoded
+        pieces = pool.map(
+            _scan_shard,
+            repeat(calculator),
+            repeat(shm.name),
+            byte_bounds,
+            [calculator.new_found(start) for start, _ in bounds],
+            repeat(delimiter),
+        )
+        found = calculator.new_found()
+        for piece in pieces:
+            found.merge(piece)
+        return found
+    finally:
+        shm.close()
+        shm.unlink()
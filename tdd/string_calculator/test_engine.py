@@ -0,0 +1,320 @@
+"""
+shared string calculator engine testing script
+"""
+
+import io
+import pickle
+import unittest
+from unittest import mock
+
+from tdd.string_calculator.engine import (
+    Calculator,
+    CalculatorError,
+    CalculatorSession,
+)
+
+
+class TestCalculatorRequirements(unittest.TestCase):
+    """Calculator set up with different requirements
+    https://tddmanifesto.com/exercises/
+    """
+
+    def test_requirement_one_is_always_on(self):
+        """Test that requirement 1 is added even if not asked for"""
+        calculator = Calculator(requirements=[2, 3])
+        self.assertEqual(calculator.requirements, frozenset({1, 2, 3}))
+
+    def test_unknown_requirement_raises_error(self):
+        """Test that requirements outside 1 to 8 are rejected"""
+        with self.assertRaises(ValueError) as context:
+            Calculator(requirements=[1, 9])
+        self.assertEqual(str(context.exception), "Unknown requirement(s): [9]")
+
+    def test_default_is_every_requirement(self):
+        """Test that the default calculator implements requirements 1 to 8"""
+        self.assertEqual(Calculator().requirements, frozenset(range(1, 9)))
+
+    def test_repr_lists_requirements(self):
+        """Test the repr of a calculator"""
+        self.assertEqual(
+            repr(Calculator(requirements=range(1, 4))),
+            "Calculator(requirements=[1, 2, 3])",
+        )
+
+    def test_repr_shows_error_budget(self):
+        """Test the repr of a calculator with max_errors"""
+        self.assertEqual(
+            repr(Calculator(requirements=[1], max_errors=2)),
+            "Calculator(requirements=[1], max_errors=2)",
+        )
+
+    def test_requirement_one_only_adds_first_two_numbers(self):
+        """Test that without requirement 2 the rest of the numbers is ignored"""
+        calculator = Calculator(requirements=[1])
+        self.assertEqual(calculator.add("1,2,3"), 3)
+        self.assertEqual(calculator.add("1,2,x"), 3)
+
+    def test_newline_is_not_separator_without_requirement_three(self):
+        """Test that a newline is part of the number without requirement 3"""
+        calculator = Calculator(requirements=[1, 2])
+        with self.assertRaises(ValueError) as context:
+            calculator.add("1\n2")
+        self.assertEqual(
+            str(context.exception), "invalid literal for int() with base 10: '1\\n2'"
+        )
+
+    def test_trailing_separator_is_empty_number_without_requirement_four(self):
+        """Test that a trailing separator fails like int("") before requirement 4"""
+        calculator = Calculator(requirements=range(1, 4))
+        with self.assertRaises(ValueError) as context:
+            calculator.add("1,2,")
+        self.assertEqual(
+            str(context.exception), "invalid literal for int() with base 10: ''"
+        )
+
+    def test_header_is_a_number_without_requirement_five(self):
+        """Test that "//" is not a header before requirement 5"""
+        calculator = Calculator(requirements=range(1, 5))
+        with self.assertRaises(ValueError) as context:
+            calculator.add("//;\n1;2")
+        self.assertEqual(
+            str(context.exception), "invalid literal for int() with base 10: '//;'"
+        )
+
+    def test_negatives_are_added_without_requirement_six(self):
+        """Test that negative numbers count before requirement 6"""
+        calculator = Calculator(requirements=range(1, 6))
+        self.assertEqual(calculator.add("1,-2,3"), 2)
+
+    def test_only_first_error_without_requirement_seven(self):
+        """Test that only the first error is reported before requirement 7"""
+        calculator = Calculator(requirements=range(1, 7))
+        with self.assertRaises(ValueError) as context:
+            calculator.add("//|\n1|2,-3")
+        self.assertEqual(
+            str(context.exception), "'|' expected but ',' found at position 3."
+        )
+
+    def test_invalid_number_before_negatives_without_requirement_seven(self):
+        """Test that a part that isn't a number fails before the negatives"""
+        calculator = Calculator(requirements=range(1, 7))
+        with self.assertRaises(ValueError) as context:
+            calculator.add("-1,x")
+        self.assertEqual(
+            str(context.exception), "invalid literal for int() with base 10: 'x'"
+        )
+
+    def test_big_numbers_count_without_requirement_eight(self):
+        """Test that numbers bigger than 1000 are added before requirement 8"""
+        calculator = Calculator(requirements=range(1, 8))
+        self.assertEqual(calculator.add("2,1001"), 1003)
+
+    def test_requirements_combine_freely(self):
+        """Test requirement 8 without the error handling ones"""
+        calculator = Calculator(requirements=[1, 2, 8])
+        self.assertEqual(calculator.add("2,1001,-1"), 1)
+
+
+class TestDigitsFastPath(unittest.TestCase):
+    """Inputs split by their own separators skip the token scanner"""
+
+    def test_sum_beyond_machine_width(self):
+        """Test that sums past 64 bits stay exact"""
+        calculator = Calculator(requirements=range(1, 8))
+        big = 2**64
+        self.assertEqual(calculator.add(f"{big},{big}\n1"), 2 * big + 1)
+
+    def test_big_numbers_ignored_on_fast_path(self):
+        """Test that requirement 8 still drops numbers bigger than 1000"""
+        self.assertEqual(Calculator().add("1000,1001,2\n99999999999999999999"), 1002)
+
+    def test_repeated_numbers_counted_first(self):
+        """Test that long inputs repeating their numbers sum the same"""
+        numbers = ",".join(["7", "1001", "0", "1000"] * 400)
+        self.assertEqual(Calculator().add(numbers), 1007 * 400)
+        self.assertEqual(Calculator(requirements=range(1, 8)).add(numbers), 2008 * 400)
+        with self.assertRaises(ValueError) as context:
+            Calculator(requirements=range(1, 7)).add(numbers + ",x,,1")
+        self.assertEqual(
+            str(context.exception), "invalid literal for int() with base 10: 'x'"
+        )
+
+    def test_number_too_long_for_int(self):
+        """Test that a part int() refuses gets the same error as before"""
+        with self.assertRaises(ValueError) as context:
+            Calculator().add("1," + "9" * 5000)
+        self.assertIn("Exceeds the limit", str(context.exception))
+
+    def test_empty_part_fails_like_int(self):
+        """Test that an empty part still fails like int("") before requirement 7"""
+        with self.assertRaises(ValueError) as context:
+            Calculator(requirements=range(1, 4)).add("1,,2")
+        self.assertEqual(
+            str(context.exception), "invalid literal for int() with base 10: ''"
+        )
+
+    def test_wrong_separator_with_custom_delimiter(self):
+        """Test that a newline after a number is still a delimiter error"""
+        with self.assertRaises(ValueError) as context:
+            Calculator().add("//;\n1\n;2")
+        self.assertEqual(
+            str(context.exception), "';' expected but '\n' found at position 1."
+        )
+
+    def test_first_bad_part_wins_before_requirement_seven(self):
+        """Test that the empty or invalid part found first is the error"""
+        calculator = Calculator(requirements=range(1, 7))
+        for numbers, message in (("1,x,,2", "'x'"), ("1,,x,2", "''"), ("1, ", "' '")):
+            with self.subTest(numbers=numbers):
+                with self.assertRaises(ValueError) as context:
+                    calculator.add(numbers)
+                self.assertEqual(
+                    str(context.exception),
+                    f"invalid literal for int() with base 10: {message}",
+                )
+
+    def test_negatives_in_input_order(self):
+        """Test that the negatives are collected without the token scanner"""
+        with self.assertRaises(CalculatorError) as context:
+            Calculator().add("1,-2\n3,-4,1001,-5")
+        self.assertEqual(context.exception.negatives, (-2, -4, -5))
+        self.assertEqual(Calculator(requirements=range(1, 6)).add("1,-2\n3,-4"), -2)
+
+    def test_wrong_separators_match_token_scanner(self):
+        """Test the errors of wrong separators against a stream, which scans
+        them token by token"""
+        for max_errors in (None, 1, 2, 3):
+            calculator = Calculator(max_errors=max_errors)
+            for numbers in ("//;\n1,2\n-3;4,-5", "//**\n-1**2,\n*3", "//;\n,;-1,"):
+                with self.subTest(max_errors=max_errors, numbers=numbers):
+                    with self.assertRaises(CalculatorError) as expected:
+                        calculator.add_stream(io.StringIO(numbers), 1)
+                    with self.assertRaises(CalculatorError) as context:
+                        calculator.add(numbers)
+                    self.assertEqual(str(context.exception), str(expected.exception))
+                    self.assertEqual(
+                        context.exception.counts, expected.exception.counts
+                    )
+
+    def test_delimiter_with_digits(self):
+        """Test that a delimiter made of digits splits like str.replace did"""
+        self.assertEqual(Calculator().add("//1\n213"), 5)
+
+    def test_stream_with_digits_only(self):
+        """Test numbers split between chunks on the fast path"""
+        numbers = ",".join(str(n) for n in range(500)) + "\n1001"
+        for chunk_size in (1, 2, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    Calculator().add_stream(io.StringIO(numbers), chunk_size),
+                    sum(range(500)),
+                )
+
+
+class TestCalculatorError(unittest.TestCase):
+    """Structured errors of the calculator"""
+
+    def test_first_error_only_before_requirement_seven(self):
+        """Test that the legacy versions still report a single error"""
+        calculator = Calculator(requirements=range(1, 7), max_errors=5)
+        with self.assertRaises(CalculatorError) as context:
+            calculator.add("//;\n1,2,3")
+        self.assertEqual(context.exception.delimiter_offsets, (1,))
+        self.assertEqual(len(context.exception.messages), 1)
+
+    def test_survives_pickling(self):
+        """Test that errors can cross process boundaries intact"""
+        error = Calculator().add_many(["//;\n1,-2;"])[0]
+        copy = pickle.loads(pickle.dumps(error))
+        self.assertEqual(str(copy), str(error))
+        self.assertEqual(copy.counts, error.counts)
+
+
+class TestCalculatorEntryPoints(unittest.TestCase):
+    """The other entry points agree with add for every set of requirements"""
+
+    INPUTS = ["", "1", "1,2,3", "1\n2,3", "1,2,", "//;\n1;2", "-1,x", "2,1001"]
+
+    # Close to plain numbers, the bulk route of add_many must get them right
+    NEAR_PLAIN = [
+        ",1",
+        "1,,2",
+        "1\n",
+        " 1,2",
+        "+1,2",
+        "1_0,2",
+        "\u0661,\u0662",
+        "\u00b2",
+    ]
+
+    def test_add_many_matches_add(self):
+        """Test add_many against add for every version"""
+        for last in range(1, 9):
+            calculator = Calculator(requirements=range(1, last + 1))
+            for numbers, result in zip(self.INPUTS, calculator.add_many(self.INPUTS)):
+                with self.subTest(requirements=last, numbers=numbers):
+                    try:
+                        expected = calculator.add(numbers)
+                    except ValueError as e:
+                        self.assertEqual(str(result), str(e))
+                    else:
+                        self.assertEqual(result, expected)
+
+    def test_add_many_bulk_route_matches_add(self):
+        """Test add_many on plain and nearly plain strings in one batch"""
+        batch = [",".join(map(str, range(n, n + 3))) for n in range(0, 3000, 7)]
+        batch += self.NEAR_PLAIN + ["\n".join(batch[:3])]
+        for last in range(1, 9):
+            calculator = Calculator(requirements=range(1, last + 1))
+            for numbers, result in zip(batch, calculator.add_many(batch)):
+                with self.subTest(requirements=last, numbers=numbers):
+                    total, error = calculator.evaluate(numbers)
+                    self.assertEqual(
+                        str(result), str(total if error is None else error)
+                    )
+
+    def test_add_many_number_too_long_for_int(self):
+        """Test that a number past the int digit limit fails only its string"""
+        too_long = "9" * 5000
+        results = Calculator().add_many(["1,2", too_long, "3", "4,5"])
+        self.assertEqual(results[0], 3)
+        self.assertIsInstance(results[1], CalculatorError)
+        with self.assertRaises(ValueError) as context:
+            Calculator().add(too_long)
+        self.assertEqual(str(results[1]), str(context.exception))
+        self.assertEqual(results[2:], [3, 9])
+
+    def test_add_stream_matches_add(self):
+        """Test add_stream with tiny chunks against add for every version"""
+        for last in range(1, 9):
+            calculator = Calculator(requirements=range(1, last + 1))
+            for numbers in self.INPUTS:
+                with self.subTest(requirements=last, numbers=numbers):
+                    try:
+                        expected = calculator.add(numbers)
+                    except ValueError as e:
+                        with self.assertRaises(ValueError) as context:
+                            calculator.add_stream(io.StringIO(numbers), 1)
+                        self.assertEqual(str(context.exception), str(e))
+                    else:
+                        self.assertEqual(
+                            calculator.add_stream(io.StringIO(numbers), 1), expected
+                        )
+
+    def test_session_scans_a_number_once_it_ends(self):
+        """Test that fragments inside a number wait for the next separator"""
+        session = CalculatorSession()
+        session.feed("7,")
+        with mock.patch.object(
+            Calculator, "scan", autospec=True, side_effect=Calculator.scan
+        ) as scan:
+            for _ in range(1000):
+                session.feed("1")
+            self.assertEqual(scan.call_count, 1)  # Only for the "7," before
+            session.feed(",5")
+            self.assertEqual(scan.call_count, 2)
+        self.assertEqual(session.result(), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
 """
-Script that  implements the string calculator exercise from
+Script that implements the string calculator exercise from
 the tddmanifesto.com
+
+Thin wrapper over the shared Calculator in tdd.string_calculator.engine,
+set up with requirement 1 only.
 """
 
+from tdd.string_calculator.engine import Calculator
+
+_CALCULATOR = Calculator(requirements=range(1, 2))
+
 
 def add_strings(numbers):
     """
@@ -14,14 +21,4 @@ def add_strings(numbers):
 
     Exercise 2 (just until requirement 1)
     """
-    # If empty just return 0
-    if numbers == "":
-        return 0
-
-    # If just one number
-    if "," not in numbers:
-        return int(numbers)
-
-    # By this point we assume we have 2 numbers separated by commas
-    parts = numbers.split(",")  # So we split them
-    return int(parts[0]) + int(parts[1])  # and add them
+    return _CALCULATOR.add(numbers)
@@ -1,8 +1,15 @@
 """
 Script that implements the string calculator exercise from
 the tddmanifesto.com
+
+Thin wrapper over the shared Calculator in tdd.string_calculator.engine,
+set up with requirements 1 to 2.
 """
 
+from tdd.string_calculator.engine import Calculator
+
+_CALCULATOR = Calculator(requirements=range(1, 3))
+
 
 def add_strings(numbers):
     """
@@ -14,13 +21,4 @@ def add_strings(numbers):
 
     Exercise 2 (up to requirement 2)
     """
-    # If empty just return 0
-    if numbers == "":
-        return 0
-
-    # Split by comma and sum all numbers
-    parts = numbers.split(",")
-    total = 0
-    for part in parts:
-        total += int(part)
-    return total
+    return _CALCULATOR.add(numbers)
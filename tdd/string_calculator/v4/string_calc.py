@@ -1,8 +1,15 @@
 """
 Script that implements the string calculator exercise from
 the tddmanifesto.com
+
+Thin wrapper over the shared Calculator in tdd.string_calculator.engine,
+set up with requirements 1 to 4.
 """
 
+from tdd.string_calculator.engine import Calculator
+
+_CALCULATOR = Calculator(requirements=range(1, 5))
+
 
 def add_strings(numbers):
     """
@@ -17,20 +24,4 @@ def add_strings(numbers):
     Raises:
         ValueError: If the string ends with a separator (comma or newline)
     """
-    # If empty just return 0
-    if numbers == "":
-        return 0
-
-    # Check if string ends with a separator
-    if numbers.endswith(",") or numbers.endswith("\n"):
-        raise ValueError("Input cannot end with a separator")
-
-    # Replace newlines with commas to normalize separators
-    numbers = numbers.replace("\n", ",")
-
-    # Split by comma and sum all numbers
-    parts = numbers.split(",")
-    total = 0
-    for part in parts:
-        total += int(part)
-    return total
+    return _CALCULATOR.add(numbers)
@@ -1,8 +1,15 @@
 """
 Script that implements the string calculator exercise from
 the tddmanifesto.com
+
+Thin wrapper over the shared Calculator in tdd.string_calculator.engine,
+set up with requirements 1 to 5.
 """
 
+from tdd.string_calculator.engine import Calculator
+
+_CALCULATOR = Calculator(requirements=range(1, 6))
+
 
 def add_strings(numbers):
     """
@@ -18,51 +25,4 @@ def add_strings(numbers):
         ValueError: If the string ends with a separator (comma or newline)
                    or if wrong delimiter is used when custom delimiter is specified
     """
-    # If empty just return 0
-    if numbers == "":
-        return 0
-
-    # Check for custom delimiter
-    delimiter = None
-    if numbers.startswith("//"):
-        # Find the newline that separates delimiter definition from numbers
-        newline_pos = numbers.find("\n")
-        if newline_pos == -1:
-            raise ValueError(
-                "Invalid format: missing newline after delimiter definition"
-            )
-
-        # Extract the custom delimiter (everything between "//" and "\n")
-        delimiter = numbers[2:newline_pos]
-        # Extract the numbers part
-        numbers = numbers[newline_pos + 1 :]
-
-        # If custom delimiter is specified, validate that only this delimiter is used
-        if delimiter:
-            # Check for invalid delimiters (comma and newline should not appear)
-            for i, char in enumerate(numbers):
-                if char in (",", "\n"):
-                    raise ValueError(
-                        f"'{delimiter}' expected but '{char}' found at position {i}."
-                    )
-
-    # Check if string ends with a separator
-    if delimiter:
-        if numbers.endswith(delimiter):
-            raise ValueError("Input cannot end with a separator")
-    else:
-        if numbers.endswith(",") or numbers.endswith("\n"):
-            raise ValueError("Input cannot end with a separator")
-
-    # Replace separators with commas to normalize
-    if delimiter:
-        numbers = numbers.replace(delimiter, ",")
-    else:
-        numbers = numbers.replace("\n", ",")
-
-    # Split by comma and sum all numbers
-    parts = numbers.split(",")
-    total = 0
-    for part in parts:
-        total += int(part)
-    return total
+    return _CALCULATOR.add(numbers)
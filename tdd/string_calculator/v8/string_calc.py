@@ -2,165 +2,109 @@
 Script that implements the string calculator exercise from
 the tddmanifesto.com
 
+Thin wrapper over the shared Calculator in tdd.string_calculator.engine,
+set up with every requirement (1 to 8).
 
-Had to split the responsability into smaller functions because
-i got an error saying my code had too many branches, specifically:
-
-pylint R0912: Too many branches
-
-So it was either this or disabling the warning
+Every function takes max_errors to cap how many errors get reported, and
+stop scanning once the cap is reached (max_errors=1 fails fast). The
+ValueError raised is a CalculatorError, with the offsets and counts of
+the errors next to the message.
 
+For input that arrives in fragments, CalculatorSession().feed() each one
+and ask for result() whenever needed instead of calling add_strings on
+the whole text again.
 """
 
-# Necessary for splitting with RE for requirement 7
-import re
-
-
-def _parse_custom_delimiter(numbers):
+from functools import lru_cache
+
+from tdd.string_calculator.engine import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_SHARD_SIZE,
+    DELIMITER_CACHE_SIZE,
+    Calculator,
+    CalculatorError,
+    CalculatorSession,
+    clear_delimiter_cache,
+    delimiter_cache_info,
+)
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "DEFAULT_SHARD_SIZE",
+    "DELIMITER_CACHE_SIZE",
+    "CalculatorError",
+    "CalculatorSession",
+    "add_stream",
+    "add_strings",
+    "add_strings_many",
+    "add_strings_parallel",
+    "clear_delimiter_cache",
+    "delimiter_cache_info",
+]
+
+
+@lru_cache(maxsize=16)
+def _calculator(max_errors):
     """
-    Extract custom delimiter and numbers from the input string.
-
-    Returns:
-        tuple: (delimiter, numbers_string)
+    Get the calculator for every requirement with the given error budget.
     """
-    newline_pos = numbers.find("\n")
-    if newline_pos == -1:
-        raise ValueError("Invalid format: missing newline after delimiter definition")
+    return Calculator(requirements=range(1, 9), max_errors=max_errors)
 
-    delimiter = numbers[2:newline_pos]
-    numbers_str = numbers[newline_pos + 1 :]
-    return delimiter, numbers_str
 
-
-def _validate_custom_delimiter_usage(numbers, delimiter):
+def add_strings(numbers, max_errors=None):
     """
-    Validate that only the custom delimiter is used in the numbers string.
+    Simple string calculator that takes a string and returns an integer.
 
-    Returns:
-        list: List of error messages (empty if no errors)
-    """
-    errors = []
-    for i, char in enumerate(numbers):
-        if char in (",", "\n"):
-            errors.append(f"'{delimiter}' expected but '{char}' found at position {i}.")
-    return errors
+    For further info check
 
+    https://tddmanifesto.com/exercises/
 
-def _validate_no_trailing_separator(numbers, delimiter):
-    """
-    Check if string ends with a separator.
+    Exercise 3 (up to requirement 8)
 
-    Returns:
-        list: List of error messages (empty if no errors)
+    Raises:
+        CalculatorError: If any validation errors occur. Multiple errors are
+                   combined into a single message separated by newlines.
     """
-    if delimiter and numbers.endswith(delimiter):
-        return ["Input cannot end with a separator"]
-    if not delimiter and (numbers.endswith(",") or numbers.endswith("\n")):
-        return ["Input cannot end with a separator"]
-    return []
+    return _calculator(max_errors).add(numbers)
 
 
-def _extract_all_numbers(numbers, delimiter):
-    """
-    Extract all numbers from the string, handling both correct and incorrect delimiter usage.
-    This ensures we catch all negative numbers even when delimiter errors exist.
+def add_strings_many(batch, max_errors=None):
     """
-    numbers_list = []
-
-    # First, normalize the custom delimiter if it exists
-    working_str = numbers
-    if delimiter:
-        # Replace the custom delimiter with comma for parsing
-        working_str = working_str.replace(delimiter, ",")
-
-    # Now split by both comma and newline to catch all numbers
-    parts = re.split(r"[,\n]", working_str)
+    Run add_strings over a whole batch of strings in one call.
 
-    for part in parts:
-        if part:  # Only process non-empty parts
-            try:
-                numbers_list.append(int(part))
-            except ValueError:
-                # Skip parts that can't be converted (they're delimiter errors)
-                pass
-
-    return numbers_list
-
-
-def _validate_negative_numbers(numbers_list):
-    """
-    Check for negative numbers in the parsed list.
+    A bad string doesn't abort the batch: its slot in the result holds the
+    CalculatorError add_strings would have raised, without raising it.
+    Strings of plain numbers are summed in bulk, see Calculator.add_many.
 
     Returns:
-        list: List of error messages (empty if no errors)
+        list: One int or CalculatorError per string, in the same order
     """
-    negatives = [num for num in numbers_list if num < 0]
-    if negatives:
-        neg_str = ", ".join(str(n) for n in negatives)
-        return [f"Negative number(s) not allowed: {neg_str}"]
-    return []
+    return _calculator(max_errors).add_many(batch)
 
 
-def add_strings(numbers):
+def add_stream(fileobj, chunk_size=DEFAULT_CHUNK_SIZE, max_errors=None):
     """
-    Simple string calculator that takes a string and returns an integer.
+    Same as add_strings, but reads the input from a text file object in
+    chunks of chunk_size characters, see Calculator.add_stream.
 
-    For further info check
+    Raises:
+        CalculatorError: Same as add_strings
+    """
+    return _calculator(max_errors).add_stream(fileobj, chunk_size)
 
-    https://tddmanifesto.com/exercises/
 
-    Exercise 3 (up to requirement 8)
+def add_strings_parallel(
+    numbers,
+    workers=None,
+    shard_size=DEFAULT_SHARD_SIZE,
+    executor=None,
+    max_errors=None,
+):
+    """
+    Same as add_strings, but large inputs are scanned by several processes,
+    see Calculator.add_parallel.
 
     Raises:
-        ValueError: If any validation errors occur. Multiple errors are
-                   combined into a single message separated by newlines.
+        CalculatorError: Same as add_strings
     """
-    if numbers == "":
-        return 0
-
-    all_errors = []
-
-    # Check for custom delimiter
-    delimiter = None
-    if numbers.startswith("//"):
-        try:
-            delimiter, numbers = _parse_custom_delimiter(numbers)
-        except ValueError as e:
-            all_errors.append(str(e))
-            # If we can't parse the delimiter, we can't proceed with validation
-            if all_errors:
-                raise ValueError("\n".join(all_errors)) from e
-
-    # Run all validations and collect errors
-
-    # 1. Custom delimiter validation
-    if delimiter:
-        all_errors.extend(_validate_custom_delimiter_usage(numbers, delimiter))
-
-    # 2. Trailing separator validation
-    all_errors.extend(_validate_no_trailing_separator(numbers, delimiter))
-
-    # 3. Negative number validation (extract numbers even with delimiter errors)
-    numbers_list = _extract_all_numbers(numbers, delimiter)
-    all_errors.extend(_validate_negative_numbers(numbers_list))
-
-    # If there are any errors, raise them all together
-    if all_errors:
-        raise ValueError("\n".join(all_errors))
-
-    # If no errors, calculate the sum
-    if delimiter:
-        normalized = numbers.replace(delimiter, ",")
-    else:
-        normalized = numbers.replace("\n", ",")
-
-    parts = normalized.split(",")
-    total = 0
-    for part in parts:
-        if part:  # Skip empty parts
-            num = int(part)
-            # Requirement 8: Ignore numbers bigger than 1000
-            if num <= 1000:
-                total += num
-
-    return total
+    return _calculator(max_errors).add_parallel(numbers, workers, shard_size, executor)
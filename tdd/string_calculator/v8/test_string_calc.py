@@ -2,9 +2,22 @@
 string calculator testing script
 """
 
+import io
 import unittest
+from concurrent.futures import ProcessPoolExecutor
 
+from tdd.string_calculator.v8.string_calc import (
+    CalculatorError,
+    CalculatorSession,
+    add_stream,
+)
 from tdd.string_calculator.v8.string_calc import add_strings as add
+from tdd.string_calculator.v8.string_calc import (
+    add_strings_many,
+    add_strings_parallel,
+    clear_delimiter_cache,
+    delimiter_cache_info,
+)
 
 
 class TestStringCalculator(unittest.TestCase):
@@ -317,6 +330,365 @@ class TestStringCalculator(unittest.TestCase):
             add("1001,-1002,3")
         self.assertIn("Negative number(s) not allowed: -1002", str(context.exception))
 
+    # Tests for the single-pass scanner
+    def test_overlapping_multichar_delimiter(self):
+        """Test that the delimiter is matched left to right like str.replace"""
+        with self.assertRaises(ValueError) as context:
+            add("//aa\n1aaa2")
+        self.assertEqual(
+            str(context.exception), "invalid literal for int() with base 10: 'a2'"
+        )
+
+    def test_delimiter_containing_comma(self):
+        """Test that commas inside the custom delimiter are still reported"""
+        with self.assertRaises(ValueError) as context:
+            add("//,;\n1,;2")
+        self.assertEqual(
+            str(context.exception), "',;' expected but ',' found at position 1."
+        )
+
+    def test_wrong_separators_in_order(self):
+        """Test that every wrong separator is reported in position order"""
+        with self.assertRaises(ValueError) as context:
+            add("//;\n1\n2;3,4")
+        expected = (
+            "';' expected but '\n' found at position 1.\n"
+            "';' expected but ',' found at position 5."
+        )
+        self.assertEqual(str(context.exception), expected)
+
+    def test_large_input(self):
+        """Test a long input with numbers above 1000 mixed in"""
+        numbers = ",".join(["1000", "1001", "1"] * 10000)
+        self.assertEqual(add(numbers), 10010000)
+
+
+class TestAddStringsMany(unittest.TestCase):
+    """Batch entry point that returns errors instead of raising them"""
+
+    def test_empty_batch(self):
+        """Test that an empty batch returns an empty list"""
+        self.assertEqual(add_strings_many([]), [])
+
+    def test_valid_batch(self):
+        """Test that each string gets its own sum in order"""
+        result = add_strings_many(["", "1,2", "//;\n1;2;3", "1001,2"])
+        self.assertEqual(result, [0, 3, 6, 2])
+
+    def test_errors_do_not_abort_batch(self):
+        """Test that a bad string is reported in place and the rest still run"""
+        result = add_strings_many(["1,2", "1,-2", "4\n5"])
+        self.assertEqual(result[0], 3)
+        self.assertIsInstance(result[1], ValueError)
+        self.assertEqual(str(result[1]), "Negative number(s) not allowed: -2")
+        self.assertEqual(result[2], 9)
+
+    def test_errors_match_add_strings(self):
+        """Test that batch errors carry the same message add_strings raises"""
+        inputs = ["//|\n1|-2,", "//;", "1,2,", "1;2"]
+        for numbers, result in zip(inputs, add_strings_many(inputs)):
+            with self.assertRaises(ValueError) as context:
+                add(numbers)
+            self.assertEqual(str(result), str(context.exception))
+
+    def test_accepts_any_iterable(self):
+        """Test that a generator works as the batch"""
+        result = add_strings_many(str(n) for n in range(3))
+        self.assertEqual(result, [0, 1, 2])
+
+
+class TestDelimiterCache(unittest.TestCase):
+    """Compiled custom delimiter cache"""
+
+    def setUp(self):
+        clear_delimiter_cache()
+
+    def test_repeated_header_hits_cache(self):
+        """Test that a repeated header reuses the compiled scanner"""
+        add("//;\n1;2")
+        add("//;\n3;4")
+        info = delimiter_cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_default_delimiters_skip_cache(self):
+        """Test that inputs without a header never touch the cache"""
+        add("1,2\n3")
+        info = delimiter_cache_info()
+        self.assertEqual(info.hits + info.misses, 0)
+
+    def test_cache_is_bounded(self):
+        """Test that the cache never grows past its maximum size"""
+        info = delimiter_cache_info()
+        for i in range(info.maxsize + 10):
+            add(f"//d{i}\n1d{i}2")
+        self.assertEqual(delimiter_cache_info().currsize, info.maxsize)
+
+    def test_clear_resets_counters(self):
+        """Test that clearing the cache resets the counters"""
+        add("//|\n1|2")
+        clear_delimiter_cache()
+        info = delimiter_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (0, 0, 0))
+
+
+class TestAddStream(unittest.TestCase):
+    """Chunked reading from a file object"""
+
+    INPUTS = [
+        "",
+        "1,2\n3",
+        "1001,2,1000",
+        "//;\n1;2;3",
+        "//sep\n2sep5sep1001",
+        "//aa\n1aaa2",
+        "//|\n1|2,-3",
+        "//;\n-1,2;-3\n-4",
+        "//,;\n1,;2",
+        "1,-2,",
+        "//;\n1;2;",
+        "//;",
+        "1;2",
+    ]
+
+    def assert_same_as_add_strings(self, numbers, chunk_size):
+        """Check add_stream against add_strings for one input and chunk size"""
+        try:
+            expected = add(numbers)
+        except ValueError as e:
+            with self.assertRaises(ValueError) as context:
+                add_stream(io.StringIO(numbers), chunk_size)
+            self.assertEqual(str(context.exception), str(e))
+        else:
+            self.assertEqual(add_stream(io.StringIO(numbers), chunk_size), expected)
+
+    def test_matches_add_strings_for_every_chunk_size(self):
+        """Test every input split at every possible chunk size"""
+        for numbers in self.INPUTS:
+            for chunk_size in range(1, len(numbers) + 2):
+                with self.subTest(numbers=numbers, chunk_size=chunk_size):
+                    self.assert_same_as_add_strings(numbers, chunk_size)
+
+    def test_delimiter_split_between_chunks(self):
+        """Test a multi-character delimiter cut in half by the chunk size"""
+        self.assertEqual(add_stream(io.StringIO("//sep\n12sep34"), 8), 46)
+
+    def test_positions_are_absolute(self):
+        """Test that error positions count from the start of the numbers"""
+        numbers = "//;\n" + "1;" * 100 + "2,3"
+        with self.assertRaises(ValueError) as context:
+            add_stream(io.StringIO(numbers), 7)
+        self.assertEqual(
+            str(context.exception), "';' expected but ',' found at position 201."
+        )
+
+    def test_large_input(self):
+        """Test a long input read in small chunks"""
+        numbers = "//;;\n" + ";;".join(["999", "1001", "2"] * 10000)
+        self.assertEqual(add_stream(io.StringIO(numbers), 100), 10010000)
+
+
+class TestAddStringsParallel(unittest.TestCase):
+    """Process pool mode, shard sizes are tiny to force several pieces"""
+
+    INPUTS = TestAddStream.INPUTS + [
+        "//é\n1é2,3é-4",
+        "é1,2\n-3,é",
+        "//sep\n" + "sep".join(["1", "-2", "1001"] * 20),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def test_matches_add_strings(self):
+        """Test every input cut into pieces of different sizes"""
+        for numbers in self.INPUTS:
+            for shard_size in (1, 2, 5):
+                with self.subTest(numbers=numbers, shard_size=shard_size):
+                    try:
+                        expected = add(numbers)
+                    except ValueError as e:
+                        with self.assertRaises(ValueError) as context:
+                            add_strings_parallel(
+                                numbers, shard_size=shard_size, executor=self.pool
+                            )
+                        self.assertEqual(str(context.exception), str(e))
+                    else:
+                        result = add_strings_parallel(
+                            numbers, shard_size=shard_size, executor=self.pool
+                        )
+                        self.assertEqual(result, expected)
+
+    def test_own_pool(self):
+        """Test that a pool is created when no executor is given"""
+        numbers = ",".join(["1", "2", "1001"] * 100)
+        self.assertEqual(add_strings_parallel(numbers, workers=2, shard_size=50), 300)
+
+    def test_small_input_runs_serially(self):
+        """Test that inputs up to shard_size never need a pool"""
+        self.assertEqual(add_strings_parallel("1,2,3", executor=None), 6)
+
+
+class TestMaxErrors(unittest.TestCase):
+    """Error budget and the structured error"""
+
+    HOSTILE = "//;\n" + "1," * 1000 + "2"
+
+    def test_error_is_structured(self):
+        """Test the offsets and counts next to the usual message"""
+        with self.assertRaises(CalculatorError) as context:
+            add("//;\n1,2\n-3;-4;")
+        error = context.exception
+        self.assertEqual(error.delimiter_offsets, (1, 3))
+        self.assertEqual(error.negatives, (-3, -4))
+        self.assertTrue(error.trailing_separator)
+        self.assertFalse(error.truncated)
+        self.assertEqual(error.counts, {"delimiter": 2, "trailing": 1, "negative": 2})
+        self.assertEqual(str(error), "\n".join(error.messages))
+
+    def test_error_is_value_error(self):
+        """Test that callers catching ValueError keep working"""
+        with self.assertRaises(ValueError) as context:
+            add("1,-2")
+        self.assertEqual(str(context.exception), "Negative number(s) not allowed: -2")
+
+    def test_budget_caps_delimiter_errors(self):
+        """Test that only the first max_errors wrong separators are reported"""
+        with self.assertRaises(CalculatorError) as context:
+            add(self.HOSTILE, max_errors=3)
+        error = context.exception
+        self.assertEqual(error.delimiter_offsets, (1, 3, 5))
+        self.assertEqual(len(error.messages), 3)
+        self.assertTrue(error.truncated)
+
+    def test_fail_fast(self):
+        """Test that max_errors=1 reports only the first error"""
+        with self.assertRaises(CalculatorError) as context:
+            add(self.HOSTILE, max_errors=1)
+        self.assertEqual(
+            str(context.exception), "';' expected but ',' found at position 1."
+        )
+
+    def test_budget_left_for_negatives(self):
+        """Test that negatives fill whatever the budget has left"""
+        with self.assertRaises(CalculatorError) as context:
+            add("//;\n1,-2;-3;-4", max_errors=3)
+        error = context.exception
+        self.assertEqual(
+            str(error),
+            "';' expected but ',' found at position 1.\n"
+            "Negative number(s) not allowed: -2, -3",
+        )
+        self.assertEqual(error.counts, {"delimiter": 1, "trailing": 0, "negative": 2})
+        self.assertTrue(error.truncated)
+
+    def test_budget_not_reached(self):
+        """Test that a budget bigger than the errors changes nothing"""
+        with self.assertRaises(CalculatorError) as context:
+            add("//;\n1,2;-3", max_errors=10)
+        self.assertFalse(context.exception.truncated)
+        self.assertEqual(len(context.exception.messages), 2)
+
+    def test_invalid_budget(self):
+        """Test that a budget below 1 is rejected"""
+        with self.assertRaises(ValueError) as context:
+            add("1", max_errors=0)
+        self.assertEqual(str(context.exception), "max_errors must be at least 1, got 0")
+
+    def test_other_entry_points_share_budget(self):
+        """Test the budget in batches, streams and the process pool"""
+        result = add_strings_many([self.HOSTILE], max_errors=2)
+        self.assertEqual(result[0].delimiter_offsets, (1, 3))
+        with self.assertRaises(CalculatorError) as context:
+            add_stream(io.StringIO(self.HOSTILE), 7, max_errors=2)
+        self.assertEqual(context.exception.delimiter_offsets, (1, 3))
+        with self.assertRaises(CalculatorError) as context:
+            add_strings_parallel(self.HOSTILE, workers=2, shard_size=500, max_errors=2)
+        self.assertEqual(context.exception.delimiter_offsets, (1, 3))
+
+
+class TestCalculatorSession(unittest.TestCase):
+    """Numbers fed in fragments, with the result available at any time"""
+
+    def test_empty_session(self):
+        """Test that nothing fed sums to 0"""
+        self.assertEqual(CalculatorSession().result(), 0)
+
+    def test_result_after_each_fragment(self):
+        """Test the running sum as fragments arrive"""
+        session = CalculatorSession()
+        for fragment, total in [("1", 1), ("1,2", 13), ("\n3", 16)]:
+            session.feed(fragment)
+            with self.subTest(fragment=fragment):
+                self.assertEqual(session.result(), total)
+
+    def test_result_does_not_consume(self):
+        """Test that asking for the result twice gives it twice"""
+        session = CalculatorSession()
+        session.feed("4,5")
+        self.assertEqual(session.result(), 9)
+        self.assertEqual(session.result(), 9)
+        session.feed("6")
+        self.assertEqual(session.result(), 60)
+
+    def test_header_split_between_fragments(self):
+        """Test a custom delimiter header that arrives in pieces"""
+        session = CalculatorSession()
+        for fragment in ["/", "/", "se", "p\n1s", "ep2se", "p3"]:
+            session.feed(fragment)
+        self.assertEqual(session.result(), 6)
+
+    def test_incomplete_header(self):
+        """Test that a header without its newline fails like add_strings"""
+        session = CalculatorSession()
+        session.feed("//;")
+        with self.assertRaises(ValueError) as context:
+            session.result()
+        self.assertEqual(
+            str(context.exception),
+            "Invalid format: missing newline after delimiter definition",
+        )
+
+    def test_trailing_separator_until_more_arrives(self):
+        """Test that a separator at the end is an error only until a number follows"""
+        session = CalculatorSession()
+        session.feed("1,2,")
+        with self.assertRaises(ValueError):
+            session.result()
+        session.feed("3")
+        self.assertEqual(session.result(), 6)
+
+    def test_errors_positions_are_absolute(self):
+        """Test that errors in later fragments point into the whole input"""
+        session = CalculatorSession()
+        for fragment in ["//;\n1;2", ";3,4", ";-5"]:
+            session.feed(fragment)
+        with self.assertRaises(CalculatorError) as context:
+            session.result()
+        self.assertEqual(context.exception.delimiter_offsets, (5,))
+        self.assertEqual(context.exception.negatives, (-5,))
+
+    def test_matches_add_strings_on_every_prefix(self):
+        """Test the session against add_strings on the text fed so far"""
+        for numbers in TestAddStream.INPUTS:
+            session = CalculatorSession()
+            for end, char in enumerate(numbers, 1):
+                session.feed(char)
+                with self.subTest(numbers=numbers[:end]):
+                    try:
+                        expected = add(numbers[:end])
+                    except ValueError as e:
+                        with self.assertRaises(ValueError) as context:
+                            session.result()
+                        self.assertEqual(str(context.exception), str(e))
+                    else:
+                        self.assertEqual(session.result(), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -63,6 +63,16 @@ def check_number_status(number):
 
 
 # 2
+# An uppercase letter, a lowercase letter, a digit and a special character,
+# each looked for from the start. A negated class can't match the character
+# that ends it, so every lookahead stops at its first match without
+# backtracking, and one match() of this compiled pattern replaces four
+# re.search calls going through the re module cache.
+_PASSWORD_CHARACTERS = re.compile(
+    r"(?=[^A-Z]*[A-Z])(?=[^a-z]*[a-z])(?=\D*\d)(?=[^!@#$%&]*[!@#$%&])"
+)
+
+
 def validate_password(password):
     """
     Validates user passwords.
@@ -73,15 +83,7 @@ def validate_password(password):
 
     # Check for at least one uppercase letter, one lowercase letter,
     # one digit, and one special character.
-    if (
-        not re.search(r"[A-Z]", password)
-        or not re.search(r"[a-z]", password)
-        or not re.search(r"\d", password)
-        or not re.search(r"[!@#$%&]", password)
-    ):
-        return False
-
-    return True
+    return _PASSWORD_CHARACTERS.match(password) is not None
 
 
 # 3